@@ -0,0 +1,37 @@
+"""copy_variants_order_to_student_answers
+
+Revision ID: 03f0b34beb1c
+Revises: 071e3b80b133
+Create Date: 2026-10-19 00:47:12.583104
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "03f0b34beb1c"
+down_revision: Union[str, None] = "071e3b80b133"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "student_test_answers",
+        sa.Column("variant_questions_order", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE student_test_answers
+        SET variant_questions_order = test_variants.questions_order
+        FROM test_variants
+        WHERE student_test_answers.variant_id = test_variants.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("student_test_answers", "variant_questions_order")
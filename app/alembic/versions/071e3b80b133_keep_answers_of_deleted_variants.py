@@ -0,0 +1,40 @@
+"""keep_answers_of_deleted_variants
+
+Revision ID: 071e3b80b133
+Revises: 0f3141b1bcef
+Create Date: 2026-10-19 00:31:47.205916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "071e3b80b133"
+down_revision: Union[str, None] = "0f3141b1bcef"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("student_test_answers_variant_id_fkey", "student_test_answers", type_="foreignkey")
+    op.create_foreign_key(
+        "student_test_answers_variant_id_fkey",
+        "student_test_answers",
+        "test_variants",
+        ["variant_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("student_test_answers_variant_id_fkey", "student_test_answers", type_="foreignkey")
+    op.create_foreign_key(
+        "student_test_answers_variant_id_fkey",
+        "student_test_answers",
+        "test_variants",
+        ["variant_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
@@ -0,0 +1,69 @@
+"""store_test_variants_order
+
+Revision ID: 0f3141b1bcef
+Revises: 8b77c7423860
+Create Date: 2026-10-19 00:14:08.362798
+
+"""
+import json
+import random
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0f3141b1bcef"
+down_revision: Union[str, None] = "8b77c7423860"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def get_test_order(connection: sa.Connection, test_id: str) -> list[tuple[str, list[str]]]:
+    rows = connection.execute(
+        sa.text(
+            """
+            SELECT question.id, answer.id
+            FROM test_questions AS question
+            LEFT JOIN test_answers AS answer ON answer.question_id = question.id
+            WHERE question.test_id = :test_id
+            ORDER BY question.position_number, answer.position_number
+            """
+        ),
+        {"test_id": test_id},
+    )
+    test_order = {}
+    for question_id, answer_id in rows:
+        answers_ids = test_order.setdefault(str(question_id), [])
+        if answer_id is not None:
+            answers_ids.append(str(answer_id))
+    return list(test_order.items())
+
+
+def upgrade() -> None:
+    op.add_column("test_variants", sa.Column("questions_order", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    # The existing variants keep the order their seed gives for the current test, which they were scored with so far.
+    connection = op.get_bind()
+    tests_orders = {}
+    for variant_id, test_id, seed in connection.execute(sa.text("SELECT id, test_id, seed FROM test_variants")):
+        if test_id not in tests_orders:
+            tests_orders[test_id] = get_test_order(connection, test_id)
+        test_order = tests_orders[test_id]
+        generator = random.Random(seed)
+        shuffled_questions = generator.sample(test_order, len(test_order))
+        questions_order = [
+            (question_id, generator.sample(answers_ids, len(answers_ids)))
+            for question_id, answers_ids in shuffled_questions
+        ]
+        connection.execute(
+            sa.text("UPDATE test_variants SET questions_order = CAST(:questions_order AS jsonb) WHERE id = :id"),
+            {"questions_order": json.dumps(questions_order), "id": variant_id},
+        )
+
+    op.alter_column("test_variants", "questions_order", nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column("test_variants", "questions_order")
@@ -0,0 +1,36 @@
+"""cascade_test_deletes
+
+Revision ID: 16f2ec22abeb
+Revises: ec2e1cdacfc7
+Create Date: 2026-10-18 23:05:31.842610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "16f2ec22abeb"
+down_revision: Union[str, None] = "ec2e1cdacfc7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FOREIGN_KEYS = [
+    ("student_test_answers_test_id_fkey", "student_test_answers", "tests", "test_id"),
+    ("student_test_answers_variant_id_fkey", "student_test_answers", "test_variants", "variant_id"),
+    ("test_answers_question_id_fkey", "test_answers", "test_questions", "question_id"),
+    ("test_questions_test_id_fkey", "test_questions", "tests", "test_id"),
+    ("test_variants_test_id_fkey", "test_variants", "tests", "test_id"),
+]
+
+
+def upgrade() -> None:
+    for name, source_table, referent_table, column in FOREIGN_KEYS:
+        op.drop_constraint(name, source_table, type_="foreignkey")
+        op.create_foreign_key(name, source_table, referent_table, [column], ["id"], ondelete="CASCADE")
+
+
+def downgrade() -> None:
+    for name, source_table, referent_table, column in FOREIGN_KEYS:
+        op.drop_constraint(name, source_table, type_="foreignkey")
+        op.create_foreign_key(name, source_table, referent_table, [column], ["id"])
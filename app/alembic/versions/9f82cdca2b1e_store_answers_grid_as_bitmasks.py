@@ -0,0 +1,73 @@
+"""store_answers_grid_as_bitmasks
+
+Revision ID: 9f82cdca2b1e
+Revises: 58e72a5da869
+Create Date: 2026-10-18 20:31:07.254106
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9f82cdca2b1e"
+down_revision: Union[str, None] = "58e72a5da869"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("student_test_answers", sa.Column("answers_masks", postgresql.ARRAY(sa.BigInteger()), nullable=True))
+
+    op.execute(
+        """
+        UPDATE student_test_answers AS student_answer SET answers_masks = ARRAY(
+            SELECT coalesce(
+                bit_or(1::bigint << (answer.value::int - 1)) FILTER (WHERE answer.value::int BETWEEN 1 AND 63), 0
+            )
+            FROM generate_series(
+                1, (SELECT max(key::int) FROM jsonb_object_keys(student_answer.answers_grid) AS key)
+            ) AS question(number)
+            LEFT JOIN LATERAL jsonb_array_elements_text(
+                student_answer.answers_grid -> question.number::text
+            ) AS answer(value) ON true
+            GROUP BY question.number
+            ORDER BY question.number
+        )
+        WHERE answers_grid IS NOT NULL
+        """
+    )
+
+    op.drop_column("student_test_answers", "answers_grid")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "student_test_answers",
+        sa.Column("answers_grid", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+    op.execute(
+        """
+        UPDATE student_test_answers SET answers_grid = (
+            SELECT coalesce(
+                jsonb_object_agg(
+                    question.number,
+                    (
+                        SELECT jsonb_agg(bit.position)
+                        FROM generate_series(1, 63) AS bit(position)
+                        WHERE question.mask & (1::bigint << (bit.position - 1)) <> 0
+                    )
+                ),
+                '{}'::jsonb
+            )
+            FROM unnest(answers_masks) WITH ORDINALITY AS question(mask, number)
+            WHERE question.mask <> 0
+        )
+        WHERE answers_masks IS NOT NULL
+        """
+    )
+
+    op.drop_column("student_test_answers", "answers_masks")
@@ -0,0 +1,41 @@
+"""unique_student_answers_results_photo
+
+Revision ID: fac313c48a42
+Revises: 2c5a4a34b1ec
+Create Date: 2026-10-19 01:04:12.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "fac313c48a42"
+down_revision: Union[str, None] = "2c5a4a34b1ec"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Submissions recorded twice by a repeated finalize of one upload keep only the first of them.
+    op.execute(
+        """
+        DELETE FROM student_test_answers
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT
+                    id,
+                    row_number() OVER (PARTITION BY results_photo_url ORDER BY created_at, id) AS submission_number
+                FROM student_test_answers
+            ) AS submissions
+            WHERE submission_number > 1
+        )
+        """
+    )
+    op.create_unique_constraint(
+        "uix_student_test_answers_results_photo_url", "student_test_answers", ["results_photo_url"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uix_student_test_answers_results_photo_url", "student_test_answers", type_="unique")
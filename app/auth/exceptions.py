@@ -5,3 +5,8 @@ from starlette import status
 class InvalidJWTTokenException(HTTPException):
     def __init__(self, detail: str = "Invalid or absent authorization token.") -> None:
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+class PasswordHashingBusyException(HTTPException):
+    def __init__(self, detail: str = "Too many sign-ins are being processed right now, please retry later.") -> None:
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail, headers={"Retry-After": "1"})
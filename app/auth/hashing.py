@@ -0,0 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.auth.exceptions import PasswordHashingBusyException
+from app.common.services.executors import BoundedExecutor
+from app.core.config import settings
+
+# bcrypt releases the GIL while hashing, so a thread pool keeps a burst of logins from freezing the event loop.
+password_hashing_pool = BoundedExecutor(
+    name="password_hashing",
+    create_executor=partial(
+        ThreadPoolExecutor, max_workers=settings.password_hashing_threads, thread_name_prefix="password-hashing"
+    ),
+    max_workers=settings.password_hashing_threads,
+    max_queue_size=settings.password_hashing_max_queue_size,
+    busy_exception=PasswordHashingBusyException,
+)
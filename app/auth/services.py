@@ -1,20 +1,38 @@
+import asyncio
+import json
 from datetime import UTC, datetime, timedelta
+from typing import Any
 from uuid import UUID
 
 import jwt
 from passlib.context import CryptContext
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app.auth.constants import ENCODING_ALGORITHM
 from app.auth.exceptions import InvalidJWTTokenException
+from app.auth.hashing import password_hashing_pool
 from app.auth.types import JWTTokenPayload, JWTTokenType
-from app.common.services.db import quick_select
+from app.common.cache import (
+    LocalCache,
+    delete_cached_value,
+    get_cached_value,
+    set_cached_value,
+)
 from app.common.utilities import get_user_model
 from app.core.config import settings
 
 User = get_user_model()
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=settings.password_hashing_rounds
+)
+
+authenticated_users_cache = LocalCache(
+    max_size=settings.authenticated_user_cache_size, ttl_in_seconds=settings.authenticated_user_cache_ttl_in_seconds
+)
+pending_cache_invalidations: set[asyncio.Task] = set()
 
 
 def create_jwt_token(user_id: UUID, token_type: JWTTokenType) -> str:
@@ -40,12 +58,90 @@ def decode_jwt_token(token: str) -> JWTTokenPayload | None:
 async def validate_jwt_token_payload(session: AsyncSession, payload: JWTTokenPayload, token_type: JWTTokenType) -> User:
     if payload.token_type != token_type.name or payload.exp < datetime.now(UTC):
         raise InvalidJWTTokenException
-    user = (await quick_select(session=session, model=User, filters=[User.id == payload.user_id])).scalar()
+    user = await get_authenticated_user(session, payload.user_id)
     if user is None:
         raise InvalidJWTTokenException
     return user
 
 
+def get_authenticated_user_cache_key(user_id: UUID | str) -> str:
+    return f"authenticated-user:{user_id}"
+
+
+def build_authenticated_user(attributes: dict[str, Any]) -> User:
+    """
+    Rebuild the cached user as a detached instance. The password is never cached,
+    so it stays unloaded and reading it raises instead of returning an empty hash.
+    """
+    user = User(
+        id=UUID(attributes["id"]),
+        username=attributes["username"],
+        created_at=datetime.fromisoformat(attributes["created_at"]),
+    )
+    make_transient_to_detached(user)
+    return user
+
+
+async def get_authenticated_user(session: AsyncSession, user_id: str) -> User | None:
+    """
+    Look the user up in the in-process cache, then in the Redis cache shared by the workers,
+    and only then in the database, so that a warm request is authenticated without any query.
+    """
+    key = get_authenticated_user_cache_key(user_id)
+    attributes = authenticated_users_cache.get(key)
+    if attributes is None and settings.authenticated_user_shared_cache_enabled:
+        cached_attributes = await get_cached_value(key)
+        if cached_attributes is not None:
+            attributes = json.loads(cached_attributes)
+            authenticated_users_cache.set(key, attributes)
+    if attributes is not None:
+        return build_authenticated_user(attributes)
+
+    row = (await session.execute(select(User.id, User.username, User.created_at).where(User.id == user_id))).first()
+    if row is None:
+        return None
+    attributes = {"id": str(row.id), "username": row.username, "created_at": row.created_at.isoformat()}
+    authenticated_users_cache.set(key, attributes)
+    if settings.authenticated_user_shared_cache_enabled:
+        await set_cached_value(key, json.dumps(attributes), settings.authenticated_user_shared_cache_ttl_in_seconds)
+    return build_authenticated_user(attributes)
+
+
+async def invalidate_authenticated_user(user_id: UUID | str) -> None:
+    key = get_authenticated_user_cache_key(user_id)
+    authenticated_users_cache.delete(key)
+    if settings.authenticated_user_shared_cache_enabled:
+        await delete_cached_value(key)
+
+
+@event.listens_for(Session, "after_flush")
+def collect_changed_users(session: Session, _) -> None:
+    changed_user_ids = session.info.setdefault("changed_user_ids", set())
+    changed_user_ids.update(user.id for user in (*session.dirty, *session.deleted) if isinstance(user, User))
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_users(session: Session) -> None:
+    """
+    Drop the committed users from the caches, so that a changed or deleted user is not authenticated from them.
+    Other processes keep their in-process entries until the short time to live runs out.
+    """
+    for user_id in session.info.pop("changed_user_ids", ()):
+        authenticated_users_cache.delete(get_authenticated_user_cache_key(user_id))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            continue
+        task = loop.create_task(invalidate_authenticated_user(user_id))
+        pending_cache_invalidations.add(task)
+        task.add_done_callback(pending_cache_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_users(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
+
+
 def issue_access_token_by_refresh_token(refresh_token: str) -> str:
     payload = decode_jwt_token(refresh_token)
     if payload is None or payload.exp < datetime.now(UTC):
@@ -53,9 +149,9 @@ def issue_access_token_by_refresh_token(refresh_token: str) -> str:
     return create_jwt_token(user_id=UUID(payload.user_id), token_type=JWTTokenType.access)
 
 
-def hash_password(password: str) -> str:
-    return password_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await password_hashing_pool.run("hash", password_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return password_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hashing_pool.run("verify", password_context.verify, plain_password, hashed_password)
@@ -0,0 +1,99 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+redis_client = Redis.from_url(settings.redis_url)
+logger = logging.getLogger(__name__)
+
+# Keeps the stored value only if its version is newer, so a late writer can not bring back a stale version.
+set_if_newer_version = redis_client.register_script(
+    """
+    local current_version = redis.call("HGET", KEYS[1], "version")
+    if current_version and tonumber(current_version) >= tonumber(ARGV[1]) then
+        return 0
+    end
+    redis.call("HSET", KEYS[1], "version", ARGV[1], "value", ARGV[2])
+    redis.call("EXPIRE", KEYS[1], ARGV[3])
+    return 1
+    """
+)
+
+
+class LocalCache:
+    """
+    A bounded in-process LRU cache whose entries expire after the given time to live.
+    """
+
+    max_size: int
+    ttl_in_seconds: float
+
+    def __init__(self, max_size: int, ttl_in_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_in_seconds = ttl_in_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_in_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+async def get_cached_value(key: str) -> bytes | None:
+    try:
+        return await redis_client.get(key)
+    except RedisError as error:
+        logger.warning(f"Could not read {key} from Redis: {error}.")
+        return None
+
+
+async def set_cached_value(key: str, value: bytes | str, ttl_in_seconds: int) -> None:
+    try:
+        await redis_client.set(key, value, ex=ttl_in_seconds)
+    except RedisError as error:
+        logger.warning(f"Could not write {key} to Redis: {error}.")
+
+
+async def delete_cached_value(key: str) -> None:
+    try:
+        await redis_client.delete(key)
+    except RedisError as error:
+        logger.warning(f"Could not delete {key} from Redis: {error}.")
+
+
+async def get_cached_versioned_value(key: str) -> tuple[int, bytes] | None:
+    try:
+        version, value = await redis_client.hmget(key, ["version", "value"])
+    except RedisError as error:
+        logger.warning(f"Could not read {key} from Redis: {error}.")
+        return None
+    if version is None or value is None:
+        return None
+    return int(version), value
+
+
+async def set_cached_versioned_value(key: str, version: int, value: bytes | str, ttl_in_seconds: int) -> None:
+    try:
+        await set_if_newer_version(keys=[key], args=[version, value, ttl_in_seconds])
+    except RedisError as error:
+        logger.warning(f"Could not write {key} to Redis: {error}.")
@@ -1 +1,50 @@
 DEFAULT_EXPECTED_EXCEPTIONS = {}
+
+# Optical mark recognition of answer grid photos
+MAX_IMAGE_SIDE_PIXELS = 1200
+INK_WINDOW_PAGE_SHARE = 0.04
+INK_MIN_CONTRAST = 0.15
+GRID_LINE_PROFILE_RATIO = 0.6
+CELL_BORDER_MARGIN = 0.2
+CELL_SAMPLES_PER_SIDE = 8
+PAGE_HEIGHT_IN_MILLIMETERS = 297
+FIDUCIAL_MIN_PAGE_SHARE = 0.5
+FIDUCIAL_SOLID_WINDOW_RATIO = 0.8
+FIDUCIAL_SOLID_FILL = 0.95
+FIDUCIAL_SURROUNDING_WINDOW_FACTOR = 6
+FIDUCIAL_SURROUNDING_MAX_FILL = 0.4
+LAYOUT_HEADER_BIT_SAMPLES_PER_SIDE = 3
+
+# Answers grid layout, sizes are in millimeters
+GRID_CELL_SIZE = 10
+FIDUCIAL_SIZE = 6
+FIDUCIAL_GAP = 3
+LAYOUT_HEADER_MIN_WIDTH = 72
+LAYOUT_HEADER_BIT_HEIGHT = 3
+LAYOUT_HEADER_FIELDS_BITS = (10, 8, 6)
+LAYOUT_HEADER_CHECKSUM_BITS = 8
+LAYOUT_HEADER_CHECKSUM_POLYNOMIAL = 0x07
+GRID_LINE_WIDTH = 0.2
+GRID_LABEL_FONT_SIZE = 12
+# The label baseline is below the cell center by this share of the font size.
+GRID_LABEL_BASELINE_RATIO = 0.35
+
+# PDF rendering
+QUESTIONS_FONT_FAMILY = "Arimo"
+QUESTIONS_FONT_PATH = "app/common/fonts/Arimo-Regular.ttf"
+PDF_PAGE_WIDTH = 595.28
+PDF_PAGE_HEIGHT = 841.89
+POINTS_PER_MILLIMETER = 72 / 25.4
+
+# Class set answer sheets, sizes are in millimeters
+ANSWER_SHEET_MARGIN = 10
+ANSWER_SHEET_HEADER_HEIGHT = 50
+ANSWER_SHEET_QR_CODE_SIZE = 30
+QR_CODE_QUIET_ZONE_MODULES = 4
+
+# Submissions archives
+ZIP_ARCHIVE_SIGNATURE = b"PK\x03\x04"
+PDF_ARCHIVE_SIGNATURE = b"%PDF-"
+ARCHIVE_SIGNATURE_LENGTH = 5
+ARCHIVE_IGNORED_DIRECTORIES = ("__MACOSX",)
+ARCHIVE_ENTRY_READ_CHUNK_SIZE = 1024 * 1024
@@ -10,3 +10,23 @@ class BaseCustomException(Exception):
     @property
     def information(self) -> dict[str, str]:
         return {"description": self.description, "code": self.code}
+
+
+class RenderingPoolBusyException(BaseCustomException):
+    def __init__(self):
+        super().__init__(
+            description="Too many documents are being rendered right now, please retry later.",
+            code="rendering-pool-busy",
+        )
+
+
+class InvalidCursorException(BaseCustomException):
+    def __init__(self):
+        super().__init__(description="The page cursor is invalid.", code="invalid-cursor")
+
+
+class UnsupportedArchiveException(BaseCustomException):
+    def __init__(self):
+        super().__init__(
+            description="The archive must be a zip of results photos or a PDF document.", code="unsupported-archive"
+        )
@@ -1,7 +1,12 @@
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
 from typing import Any, Type
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import QueryableAttribute
+from sqlalchemy.sql.base import ExecutableOption
 from starlette import status
 
 from app.common.services.db import quick_select
@@ -20,9 +25,62 @@ async def get_object_or_404(
     return obj
 
 
-def check_if_object_belongs_to_user(object_user: User, access_user: User):
-    if object_user != access_user:
+async def get_user_object_or_404(
+    session: AsyncSession,
+    model: Type[DatabaseInstanceType],
+    user: User,
+    owner_id_attribute: QueryableAttribute,
+    relationship_path: list[QueryableAttribute] = None,
+    options: list[ExecutableOption] = None,
+    **filters: Any,
+) -> DatabaseInstanceType:
+    """
+    Fetch the object together with the id of its owner in one joined query, following the relationship path
+    from the model to the owner id column, like `[Answer.question, Question.test]` to `Test.teacher_id`.
+    The loader options, like `selectinload`, are applied to the object.
+    """
+    query = (
+        select(model, owner_id_attribute)
+        .where(*(getattr(model, name) == value for name, value in filters.items()))
+        .options(*(options or []))
+    )
+    for relationship_attribute in relationship_path or []:
+        query = query.join(relationship_attribute)
+    row = (await session.execute(query)).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+    obj, owner_id = row
+    if owner_id != user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="You don't have permission to access this object"
         )
-    return object_user
+    return obj
+
+
+def get_conditional_request_headers(etag: str, last_modified: datetime) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(tzinfo=UTC, microsecond=0), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """
+    Evaluate the conditional request headers, where If-None-Match takes precedence over If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        client_etags = {client_etag.strip().removeprefix("W/") for client_etag in if_none_match.split(",")}
+        return "*" in client_etags or etag in client_etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        modified_since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if modified_since.tzinfo is None:
+        modified_since = modified_since.replace(tzinfo=UTC)
+    return last_modified.replace(tzinfo=UTC, microsecond=0) <= modified_since
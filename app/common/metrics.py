@@ -0,0 +1,23 @@
+import time
+from typing import Any, Callable
+
+from prometheus_client import Counter, Gauge, Histogram
+
+EXECUTOR_WORKERS = Gauge("executor_workers", "Number of threads or processes of the executor.", ["executor"])
+EXECUTOR_BUSY_WORKERS = Gauge(
+    "executor_busy_workers", "Number of threads or processes of the executor that are running a job.", ["executor"]
+)
+EXECUTOR_QUEUED_JOBS = Gauge("executor_queued_jobs", "Number of jobs waiting for a free worker.", ["executor"])
+EXECUTOR_REJECTED_JOBS = Counter(
+    "executor_rejected_jobs", "Number of jobs rejected because the queue was full.", ["executor"]
+)
+EXECUTOR_JOB_SECONDS = Histogram(
+    "executor_job_seconds", "Time spent running one job inside a worker.", ["executor", "operation"]
+)
+EXECUTOR_WAIT_SECONDS = Histogram("executor_wait_seconds", "Time a job spent waiting for a free worker.", ["executor"])
+
+
+def call_timed(function: Callable, submitted_at: float, *args: Any) -> tuple[Any, float, float]:
+    started_at = time.time()
+    result = function(*args)
+    return result, started_at - submitted_at, time.time() - started_at
@@ -0,0 +1,42 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Type
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+
+from app.common.exceptions import InvalidCursorException
+from app.common.types import DatabaseInstanceType
+
+
+def encode_cursor(created_at: datetime, object_id: UUID) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at.isoformat(), str(object_id)]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, object_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), UUID(object_id)
+    except (ValueError, TypeError) as error:
+        raise InvalidCursorException() from error
+
+
+def paginate(query: Select, model: Type[DatabaseInstanceType], cursor: str | None, page_size: int) -> Select:
+    """
+    Order the query by the creation time, newest first, and select the page after the cursor.
+    The page is found by the (created_at, id) key instead of an offset, so every page costs the same.
+    One extra row is selected to tell whether there is a next page.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(page_size + 1)
+    if cursor is not None:
+        query = query.where(tuple_(model.created_at, model.id) < decode_cursor(cursor))
+    return query
+
+
+def get_page(objects: list[DatabaseInstanceType], page_size: int) -> dict[str, Any]:
+    next_cursor = None
+    if len(objects) > page_size:
+        objects = objects[:page_size]
+        next_cursor = encode_cursor(objects[-1].created_at, objects[-1].id)
+    return {"items": objects, "next_cursor": next_cursor}
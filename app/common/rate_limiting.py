@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    An asyncio token bucket that holds up to `capacity` tokens and refills them evenly over a minute.
+    """
+
+    capacity: int
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._refill_rate_per_second = capacity / 60
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self._refill_rate_per_second)
+        self._updated_at = now
+
+    async def acquire(self, amount: int = 1) -> None:
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self._refill_rate_per_second)
+                self._refill()
+            self._tokens -= amount
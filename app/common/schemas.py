@@ -0,0 +1,10 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+ItemSchemaType = TypeVar("ItemSchemaType", bound=BaseModel)
+
+
+class PageSchema(BaseModel, Generic[ItemSchemaType]):
+    items: list[ItemSchemaType]
+    next_cursor: str | None
@@ -0,0 +1,142 @@
+import logging
+import mimetypes
+import zipfile
+import zlib
+from collections.abc import Iterator
+from pathlib import PurePosixPath
+from typing import BinaryIO, NamedTuple
+
+from pypdf import PageObject, PdfReader
+from pypdf.errors import PyPdfError
+
+from app.common.constants import (
+    ARCHIVE_ENTRY_READ_CHUNK_SIZE,
+    ARCHIVE_IGNORED_DIRECTORIES,
+    ARCHIVE_SIGNATURE_LENGTH,
+    PDF_ARCHIVE_SIGNATURE,
+    ZIP_ARCHIVE_SIGNATURE,
+)
+from app.common.exceptions import UnsupportedArchiveException
+from app.common.types import ArchiveType
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ArchivePage(NamedTuple):
+    """
+    One page of a submissions archive, numbered from 1 in the archive order.
+    Zip pages are named by their entry path, PDF pages only have the number.
+    The data is None when the page has no photo to grade.
+    """
+
+    number: int
+    name: str | None
+    data: bytes | None
+    content_type: str | None
+
+    @property
+    def filename(self) -> str:
+        if self.name is not None:
+            return PurePosixPath(self.name).name
+        return f"page-{self.number}{mimetypes.guess_extension(self.content_type or '') or ''}"
+
+
+def get_archive_type(header: bytes) -> ArchiveType | None:
+    """
+    Recognize the archive by the signature at the start of the file, whatever its name or declared content type.
+    """
+    if header.startswith(ZIP_ARCHIVE_SIGNATURE):
+        return ArchiveType.zip
+    if header.startswith(PDF_ARCHIVE_SIGNATURE):
+        return ArchiveType.pdf
+    return None
+
+
+def is_photo_entry(entry: zipfile.ZipInfo) -> bool:
+    path = PurePosixPath(entry.filename)
+    content_type = mimetypes.guess_type(entry.filename)[0]
+    return (
+        not entry.is_dir()
+        and not path.name.startswith(".")
+        and not set(path.parts) & set(ARCHIVE_IGNORED_DIRECTORIES)
+        and content_type is not None
+        and content_type.startswith("image/")
+    )
+
+
+def get_page_photo(page: PageObject) -> tuple[bytes | None, str | None]:
+    """
+    Return the largest image of a scanned page with its content type, which is the scan itself
+    when the scanner adds small images like a logo or an OCR layer.
+    """
+    try:
+        images = list(page.images)
+    except (PyPdfError, OSError, ValueError) as error:
+        logger.warning(f"Could not extract the images of a PDF page: {error!r}.")
+        return None, None
+    if not images:
+        return None, None
+    photo = max(images, key=lambda image: len(image.data))
+    return photo.data, mimetypes.guess_type(photo.name)[0]
+
+
+class SubmissionsArchive:
+    """
+    A zip of results photos or a scanned PDF with a page per student, read from a seekable file page by page,
+    so that only the current page is held in memory.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        archive_type = get_archive_type(file.read(ARCHIVE_SIGNATURE_LENGTH))
+        file.seek(0)
+        self._zip_file: zipfile.ZipFile | None = None
+        self._pdf_reader: PdfReader | None = None
+        if archive_type == ArchiveType.zip:
+            self._zip_file = zipfile.ZipFile(file)
+            self._photo_entries = [entry for entry in self._zip_file.infolist() if is_photo_entry(entry)]
+        elif archive_type == ArchiveType.pdf:
+            self._pdf_reader = PdfReader(file)
+        else:
+            raise UnsupportedArchiveException()
+
+    @property
+    def pages_number(self) -> int:
+        if self._zip_file is not None:
+            return len(self._photo_entries)
+        return len(self._pdf_reader.pages)
+
+    def _read_entry(self, entry: zipfile.ZipInfo) -> bytes | None:
+        """
+        Read a zip entry in chunks and give up as soon as it grows over the size limit, because the size declared
+        in the archive can not be trusted and a small entry can decompress into gigabytes.
+        """
+        max_size = settings.submissions_archive_max_entry_size_in_bytes
+        if entry.file_size > max_size:
+            logger.warning(f"Skipped the archive entry {entry.filename} of {entry.file_size} bytes, over the limit.")
+            return None
+
+        data = bytearray()
+        try:
+            with self._zip_file.open(entry) as entry_file:
+                while chunk := entry_file.read(ARCHIVE_ENTRY_READ_CHUNK_SIZE):
+                    data += chunk
+                    if len(data) > max_size:
+                        logger.warning(
+                            f"Skipped the archive entry {entry.filename}, which decompresses over the limit."
+                        )
+                        return None
+        except (zipfile.BadZipFile, zlib.error, NotImplementedError) as error:
+            logger.warning(f"Could not read the archive entry {entry.filename}: {error!r}.")
+            return None
+        return bytes(data)
+
+    def iterate_pages(self) -> Iterator[ArchivePage]:
+        if self._zip_file is not None:
+            for number, entry in enumerate(self._photo_entries, start=1):
+                data = self._read_entry(entry)
+                yield ArchivePage(number, entry.filename, data, mimetypes.guess_type(entry.filename)[0])
+            return
+
+        for number, page in enumerate(self._pdf_reader.pages, start=1):
+            yield ArchivePage(number, None, *get_page_photo(page))
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable
+
+from app.common.metrics import (
+    EXECUTOR_BUSY_WORKERS,
+    EXECUTOR_JOB_SECONDS,
+    EXECUTOR_QUEUED_JOBS,
+    EXECUTOR_REJECTED_JOBS,
+    EXECUTOR_WAIT_SECONDS,
+    EXECUTOR_WORKERS,
+    call_timed,
+)
+
+
+class BoundedExecutor:
+    """
+    Runs blocking jobs in a thread or process pool, so that they keep the event loop free.
+    At most `max_queue_size` jobs wait for a free worker, the jobs above that are rejected right away
+    with `busy_exception`. The metrics of every executor are labelled by its name.
+    """
+
+    name: str
+    max_workers: int
+    max_queue_size: int
+
+    def __init__(
+        self,
+        name: str,
+        create_executor: Callable[[], Executor],
+        max_workers: int,
+        max_queue_size: int,
+        busy_exception: type[Exception],
+    ) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._create_executor = create_executor
+        self._busy_exception = busy_exception
+        self._executor: Executor | None = None
+        self._jobs_number = 0
+        EXECUTOR_WORKERS.labels(name).set(max_workers)
+
+    @property
+    def executor(self) -> Executor:
+        # Created on first use, so that a process pool does not start its processes when the module is imported.
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    def _update_utilization(self) -> None:
+        EXECUTOR_BUSY_WORKERS.labels(self.name).set(min(self._jobs_number, self.max_workers))
+        EXECUTOR_QUEUED_JOBS.labels(self.name).set(max(self._jobs_number - self.max_workers, 0))
+
+    def _finish_job(self) -> None:
+        self._jobs_number -= 1
+        self._update_utilization()
+
+    async def run(self, operation: str, function: Callable, *args: Any, reject_when_full: bool = True) -> Any:
+        """
+        Run the function in the pool. Jobs that continue already accepted work, like the next pages of a streamed
+        document, may pass `reject_when_full=False` to wait in the queue instead of failing the half-sent response.
+        """
+        if reject_when_full and self._jobs_number >= self.max_workers + self.max_queue_size:
+            EXECUTOR_REJECTED_JOBS.labels(self.name).inc()
+            raise self._busy_exception()
+
+        loop = asyncio.get_running_loop()
+        self._jobs_number += 1
+        self._update_utilization()
+        try:
+            job = self.executor.submit(call_timed, function, time.time(), *args)
+        except BaseException:
+            self._finish_job()
+            raise
+        # The job keeps its place until the worker is done with it, even when the awaiting request is cancelled.
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._finish_job))
+        result, wait_time, run_time = await asyncio.wrap_future(job)
+
+        EXECUTOR_WAIT_SECONDS.labels(self.name).observe(wait_time)
+        EXECUTOR_JOB_SECONDS.labels(self.name, operation).observe(run_time)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,118 @@
+from typing import NamedTuple
+
+from app.common.constants import (
+    FIDUCIAL_GAP,
+    FIDUCIAL_SIZE,
+    GRID_CELL_SIZE,
+    LAYOUT_HEADER_CHECKSUM_BITS,
+    LAYOUT_HEADER_CHECKSUM_POLYNOMIAL,
+    LAYOUT_HEADER_FIELDS_BITS,
+    LAYOUT_HEADER_MIN_WIDTH,
+)
+
+LAYOUT_HEADER_BITS_NUMBER = sum(LAYOUT_HEADER_FIELDS_BITS) + LAYOUT_HEADER_CHECKSUM_BITS
+
+
+def get_header_checksum(bits: list[bool]) -> int:
+    """
+    CRC-8 of the header fields bits, the same as over their bytes. Unlike a sum of the fields, it catches
+    every error of up to three bits and every burst of up to eight, including errors that cancel out in a sum.
+    """
+    checksum = 0
+    for bit in bits:
+        carry = bool(checksum >> (LAYOUT_HEADER_CHECKSUM_BITS - 1)) != bit
+        checksum = checksum << 1 & (2**LAYOUT_HEADER_CHECKSUM_BITS - 1)
+        if carry:
+            checksum ^= LAYOUT_HEADER_CHECKSUM_POLYNOMIAL
+    return checksum
+
+
+class GridLayout(NamedTuple):
+    """
+    Geometry of one printed answers grid, framed by four square fiducial markers.
+    Positions are in millimeters, relative to the center of the top left marker, with the y axis pointing down.
+    Between the top markers there is a binary header with the layout itself, so that a photo can be read
+    without knowing the test in advance.
+    """
+
+    first_question_number: int
+    rows_number: int
+    columns_number: int
+
+    @property
+    def grid_left(self) -> float:
+        return FIDUCIAL_SIZE / 2 + FIDUCIAL_GAP
+
+    @property
+    def grid_top(self) -> float:
+        return FIDUCIAL_SIZE / 2 + FIDUCIAL_GAP
+
+    @property
+    def grid_width(self) -> float:
+        return (self.columns_number + 1) * GRID_CELL_SIZE
+
+    @property
+    def grid_height(self) -> float:
+        return (self.rows_number + 1) * GRID_CELL_SIZE
+
+    @property
+    def frame_width(self) -> float:
+        return max(self.grid_width, LAYOUT_HEADER_MIN_WIDTH) + 2 * (FIDUCIAL_SIZE / 2 + FIDUCIAL_GAP)
+
+    @property
+    def frame_height(self) -> float:
+        return self.grid_height + 2 * (FIDUCIAL_SIZE / 2 + FIDUCIAL_GAP)
+
+    @property
+    def fiducials_centers(self) -> list[tuple[float, float]]:
+        return [(0, 0), (self.frame_width, 0), (0, self.frame_height), (self.frame_width, self.frame_height)]
+
+    @property
+    def header_bit_width(self) -> float:
+        return self.frame_width / (LAYOUT_HEADER_BITS_NUMBER + 3) / 2
+
+    @staticmethod
+    def get_header_bits_centers_ratios() -> list[float]:
+        """
+        Return the horizontal positions of the header bits as shares of the distance between the top markers,
+        which lets the header be read before the frame size is known.
+        """
+        return [(index + 2) / (LAYOUT_HEADER_BITS_NUMBER + 3) for index in range(LAYOUT_HEADER_BITS_NUMBER)]
+
+    @property
+    def header_bits_centers(self) -> list[float]:
+        return [ratio * self.frame_width for ratio in self.get_header_bits_centers_ratios()]
+
+    def encode_header(self) -> list[bool]:
+        fields = (self.first_question_number, self.rows_number, self.columns_number)
+        bits = [
+            bool(value >> shift & 1)
+            for value, size in zip(fields, LAYOUT_HEADER_FIELDS_BITS)
+            for shift in reversed(range(size))
+        ]
+        checksum = get_header_checksum(bits)
+        return bits + [bool(checksum >> shift & 1) for shift in reversed(range(LAYOUT_HEADER_CHECKSUM_BITS))]
+
+    @classmethod
+    def decode_header(cls, bits: list[bool]) -> "GridLayout | None":
+        values = []
+        position = 0
+        for size in [*LAYOUT_HEADER_FIELDS_BITS, LAYOUT_HEADER_CHECKSUM_BITS]:
+            values.append(int("".join("1" if bit else "0" for bit in bits[position : position + size]), 2))
+            position += size
+        *fields, checksum = values
+        if get_header_checksum(bits[: sum(LAYOUT_HEADER_FIELDS_BITS)]) != checksum or not all(fields):
+            return None
+        return cls(*fields)
+
+
+def get_grid_layouts(rows_number: int, columns_number: int, available_height: float) -> list[GridLayout]:
+    """
+    Split the answers grid into pages, where every framed grid fits into the available height in millimeters.
+    """
+    frame_margins = FIDUCIAL_SIZE + 2 * (FIDUCIAL_SIZE / 2 + FIDUCIAL_GAP)
+    rows_per_page = int((available_height - frame_margins) // GRID_CELL_SIZE) - 1
+    return [
+        GridLayout(first_row + 1, min(rows_per_page, rows_number - first_row), columns_number)
+        for first_row in range(0, max(rows_number, 1), rows_per_page)
+    ]
@@ -0,0 +1,235 @@
+import io
+import logging
+import math
+
+import numpy as np
+from PIL import Image, ImageFilter, ImageOps
+
+from app.common.constants import (
+    CELL_BORDER_MARGIN,
+    CELL_SAMPLES_PER_SIDE,
+    FIDUCIAL_MIN_PAGE_SHARE,
+    FIDUCIAL_SIZE,
+    FIDUCIAL_SOLID_FILL,
+    FIDUCIAL_SOLID_WINDOW_RATIO,
+    FIDUCIAL_SURROUNDING_MAX_FILL,
+    FIDUCIAL_SURROUNDING_WINDOW_FACTOR,
+    GRID_LINE_PROFILE_RATIO,
+    INK_MIN_CONTRAST,
+    INK_WINDOW_PAGE_SHARE,
+    LAYOUT_HEADER_BIT_SAMPLES_PER_SIDE,
+    MAX_IMAGE_SIDE_PIXELS,
+    PAGE_HEIGHT_IN_MILLIMETERS,
+)
+from app.common.services.grid_layout import LAYOUT_HEADER_BITS_NUMBER, GridLayout
+from app.common.storage import download_test_result
+from app.core.config import settings
+from app.student_tests.models import StudentTestAnswer
+
+logger = logging.getLogger(__name__)
+
+
+def load_grayscale_image(image_bytes: bytes) -> np.ndarray:
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        # JPEG photos are decoded right at a fraction of their size, as long as both sides stay at least
+        # the requested ones, so the request keeps the aspect ratio of the photo.
+        scale = MAX_IMAGE_SIDE_PIXELS / max(image.size)
+        image.draft("L", (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+        image = ImageOps.exif_transpose(image).convert("L")
+        image.thumbnail((MAX_IMAGE_SIDE_PIXELS, MAX_IMAGE_SIDE_PIXELS), Image.Resampling.BILINEAR)
+        return np.asarray(image, dtype=np.uint8)
+
+
+def get_windows_means(image: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    Return the mean of the odd-sized square window centered on every pixel of an 8-bit image,
+    with the image edges extended.
+    """
+    return np.asarray(Image.fromarray(image).filter(ImageFilter.BoxBlur(window_size // 2)))
+
+
+def get_ink_mask(grayscale_image: np.ndarray) -> np.ndarray:
+    """
+    Binarize the photo by the mean brightness of the window around every pixel, so that neither uneven lighting
+    of phone photos nor the table around the sheet matter. A global threshold splits such photos into the paper
+    and the table instead of the paper and the ink.
+    """
+    window_size = max(int(max(grayscale_image.shape) * INK_WINDOW_PAGE_SHARE), 3)
+    windows_means = get_windows_means(grayscale_image, window_size)
+    return grayscale_image < windows_means * (1 - INK_MIN_CONTRAST)
+
+
+def locate_grid(ink_mask: np.ndarray) -> tuple[int, int, int, int]:
+    """
+    Find the outer border of the answer grid by its long printed lines and return it as (top, bottom, left, right).
+    """
+    row_profile = ink_mask.sum(axis=1)
+    line_rows = np.flatnonzero(row_profile >= GRID_LINE_PROFILE_RATIO * row_profile.max())
+    top, bottom = int(line_rows[0]), int(line_rows[-1])
+
+    column_profile = ink_mask[top : bottom + 1].sum(axis=0)
+    line_columns = np.flatnonzero(column_profile >= GRID_LINE_PROFILE_RATIO * column_profile.max())
+    left, right = int(line_columns[0]), int(line_columns[-1])
+    return top, bottom, left, right
+
+
+def get_cells_samples(grid_box: tuple[float, float, float, float], rows_number: int, columns_number: int) -> np.ndarray:
+    """
+    Return the (x, y) points sampled inside every answer cell of the grid box (top, bottom, left, right)
+    as a (rows_number, columns_number, samples, 2) array.
+    The grid has one header row with answer letters and one header column with question numbers, which are skipped.
+    """
+    top, bottom, left, right = grid_box
+    cell_height = (bottom - top) / (rows_number + 1)
+    cell_width = (right - left) / (columns_number + 1)
+    offsets = np.linspace(CELL_BORDER_MARGIN, 1 - CELL_BORDER_MARGIN, CELL_SAMPLES_PER_SIDE)
+
+    ys = top + (np.arange(1, rows_number + 1)[:, None] + offsets[None, :]) * cell_height
+    xs = left + (np.arange(1, columns_number + 1)[:, None] + offsets[None, :]) * cell_width
+    samples = np.empty((rows_number, columns_number, CELL_SAMPLES_PER_SIDE, CELL_SAMPLES_PER_SIDE, 2))
+    samples[..., 0] = xs[None, :, None, :]
+    samples[..., 1] = ys[:, None, :, None]
+    return samples.reshape(rows_number, columns_number, -1, 2)
+
+
+def sample_ink_mask(ink_mask: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Return the ink mask values at the nearest pixels of the (x, y) points, which may lie outside the photo.
+    """
+    xs = np.clip(np.rint(points[..., 0]).astype(np.intp), 0, ink_mask.shape[1] - 1)
+    ys = np.clip(np.rint(points[..., 1]).astype(np.intp), 0, ink_mask.shape[0] - 1)
+    return ink_mask[ys, xs]
+
+
+def locate_fiducials(ink_mask: np.ndarray) -> np.ndarray | None:
+    """
+    Find the centers of the four square fiducial markers around the grid, as (x, y) points ordered
+    top left, top right, bottom left, bottom right.
+    A marker is a window that is solid ink while the much bigger window around it is mostly blank,
+    and the markers are the outermost such windows in the directions of the photo corners.
+    """
+    height, width = ink_mask.shape
+    smallest_marker_size = FIDUCIAL_SIZE * FIDUCIAL_MIN_PAGE_SHARE * max(height, width) / PAGE_HEIGHT_IN_MILLIMETERS
+    window_size = max(int(smallest_marker_size * FIDUCIAL_SOLID_WINDOW_RATIO), 3)
+    surrounding_size = window_size * FIDUCIAL_SURROUNDING_WINDOW_FACTOR
+    if surrounding_size >= min(height, width):
+        return None
+
+    ink_image = ink_mask.astype(np.uint8) * 255
+    solid = get_windows_means(ink_image, window_size) >= FIDUCIAL_SOLID_FILL * 255
+    surrounding_blank = get_windows_means(ink_image, surrounding_size) <= FIDUCIAL_SURROUNDING_MAX_FILL * 255
+    # Windows too close to the photo edges are rejected, because a dark background around the sheet is solid ink
+    # as well, and the edges are extended into the windows that go over them.
+    margin = surrounding_size // 2
+    surrounding_blank[:margin] = surrounding_blank[-margin:] = False
+    surrounding_blank[:, :margin] = surrounding_blank[:, -margin:] = False
+    ys, xs = np.nonzero(solid & surrounding_blank)
+    if xs.size == 0:
+        return None
+
+    centers = []
+    for x_direction, y_direction in ((-1, -1), (1, -1), (-1, 1), (1, 1)):
+        projection = x_direction * xs + y_direction * ys
+        outermost = int(np.argmax(projection))
+        # All the solid windows of one marker are within its size of each other.
+        nearby = np.hypot(xs - xs[outermost], ys - ys[outermost]) <= surrounding_size / 2
+        centers.append((xs[nearby].mean(), ys[nearby].mean()))
+
+    centers = np.array(centers)
+    if len({tuple(center) for center in np.round(centers).tolist()}) < 4:
+        return None
+    return centers
+
+
+def get_homography(source_points: np.ndarray, target_points: np.ndarray) -> np.ndarray:
+    """
+    Solve the perspective transform that maps four source points onto four target points.
+    """
+    equations = []
+    values = []
+    for (x, y), (u, v) in zip(source_points, target_points):
+        equations.append([x, y, 1, 0, 0, 0, -u * x, -u * y])
+        equations.append([0, 0, 0, x, y, 1, -v * x, -v * y])
+        values.extend((u, v))
+    return np.append(np.linalg.solve(np.array(equations), np.array(values)), 1).reshape(3, 3)
+
+
+def project_points(homography: np.ndarray, points: np.ndarray) -> np.ndarray:
+    projected = np.c_[points, np.ones(len(points))] @ homography.T
+    return projected[:, :2] / projected[:, 2:]
+
+
+def read_layout_header(ink_mask: np.ndarray, fiducials: np.ndarray) -> GridLayout | None:
+    """
+    Decode the layout header printed between the top markers, sampling it through the transform
+    from the unit square onto the markers, because the frame size is not known until the header is read.
+    """
+    unit_square = np.array([(0, 0), (1, 0), (0, 1), (1, 1)], dtype=np.float64)
+    homography = get_homography(unit_square, fiducials)
+    # A quarter of the header bit width as a share of the frame width, which is the same for all frames.
+    bit_quarter_width = 1 / (LAYOUT_HEADER_BITS_NUMBER + 3) / 8
+    offsets = np.linspace(-bit_quarter_width, bit_quarter_width, LAYOUT_HEADER_BIT_SAMPLES_PER_SIDE)
+    samples = np.array(
+        [(ratio + offset, 0) for ratio in GridLayout.get_header_bits_centers_ratios() for offset in offsets]
+    )
+    bits = sample_ink_mask(ink_mask, project_points(homography, samples))
+    bits = bits.reshape(-1, LAYOUT_HEADER_BIT_SAMPLES_PER_SIDE).mean(axis=1) >= 0.5
+    return GridLayout.decode_header(bits.tolist())
+
+
+def read_framed_grid(ink_mask: np.ndarray) -> tuple[GridLayout, np.ndarray] | None:
+    """
+    Read the cells fill of a grid printed with fiducial markers, projecting the cells samples from the grid plane
+    onto the photo.
+    """
+    fiducials = locate_fiducials(ink_mask)
+    if fiducials is None:
+        return None
+    layout = read_layout_header(ink_mask, fiducials)
+    if layout is None:
+        return None
+
+    homography = get_homography(np.array(layout.fiducials_centers), fiducials)
+    grid_box = (
+        layout.grid_top,
+        layout.grid_top + layout.grid_height,
+        layout.grid_left,
+        layout.grid_left + layout.grid_width,
+    )
+    samples = get_cells_samples(grid_box, layout.rows_number, layout.columns_number)
+    points = project_points(homography, samples.reshape(-1, 2)).reshape(samples.shape)
+    return layout, sample_ink_mask(ink_mask, points).mean(axis=2)
+
+
+def read_answer_grid(image_bytes: bytes, rows_number: int, columns_number: int) -> dict[int, list[int]]:
+    """
+    Read the marked cells from a photo of the grid generated by `create_grid_pdf`.
+    Questions and answer positions are numbered from 1, the same way the vision model reports them.
+    Grids printed with fiducial markers are read by their own layout header, older grids by the grid lines.
+    """
+    if rows_number == 0 or columns_number == 0:
+        return {}
+
+    ink_mask = get_ink_mask(load_grayscale_image(image_bytes))
+    framed_grid = read_framed_grid(ink_mask)
+    if framed_grid is not None:
+        layout, cells_fill = framed_grid
+        first_question_number = layout.first_question_number
+    else:
+        samples = get_cells_samples(locate_grid(ink_mask), rows_number, columns_number)
+        cells_fill = sample_ink_mask(ink_mask, samples).mean(axis=2)
+        first_question_number = 1
+    marked_rows, marked_columns = np.nonzero(cells_fill >= settings.omr_fill_threshold)
+
+    grid = {}
+    for row_index, column_index in zip(marked_rows.tolist(), marked_columns.tolist()):
+        grid.setdefault(first_question_number + row_index, []).append(column_index + 1)
+    return grid
+
+
+def get_student_answer_grid_locally(
+    student_answer: StudentTestAnswer, rows_number: int, columns_number: int
+) -> dict[int, list[int]]:
+    grid = read_answer_grid(download_test_result(student_answer.results_photo_url), rows_number, columns_number)
+    logger.info(f"Extracted such grid: {grid}")
+    return grid
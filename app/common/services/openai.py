@@ -1,16 +1,90 @@
+import asyncio
 import json
 import logging
+import math
+import random
+from typing import Any
 
 import openai
+from openai.types.chat import ChatCompletion
 
+from app.common.rate_limiting import TokenBucket
 from app.core.config import settings
 from app.student_tests.models import StudentTestAnswer
 
-client = openai.Client(api_key=settings.openai_api_key)
 logger = logging.getLogger(__name__)
 
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    TimeoutError,
+)
 
-def get_student_answer_grid(student_answer: StudentTestAnswer) -> dict[int, list[int]]:
+
+class AsyncVisionClient:
+    """
+    OpenAI chat completions client that bounds concurrent calls, keeps to the request and token per minute quotas,
+    enforces a deadline on every call and retries rate limit, server and timeout errors with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None = None,
+        max_concurrent_requests: int = settings.openai_max_concurrent_requests,
+        requests_per_minute: int = settings.openai_requests_per_minute,
+        tokens_per_minute: int = settings.openai_tokens_per_minute,
+        estimated_tokens_per_request: int = settings.openai_estimated_tokens_per_request,
+        deadline_in_seconds: float = settings.openai_deadline_in_seconds,
+        max_retries: int = settings.openai_max_retries,
+        backoff_base_in_seconds: float = settings.openai_backoff_base_in_seconds,
+        backoff_max_in_seconds: float = settings.openai_backoff_max_in_seconds,
+    ) -> None:
+        self.client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=deadline_in_seconds, max_retries=0)
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.requests_bucket = TokenBucket(requests_per_minute)
+        self.tokens_bucket = TokenBucket(tokens_per_minute)
+        self.estimated_tokens_per_request = estimated_tokens_per_request
+        self.deadline_in_seconds = deadline_in_seconds
+        self.max_retries = max_retries
+        self.backoff_base_in_seconds = backoff_base_in_seconds
+        self.backoff_max_in_seconds = backoff_max_in_seconds
+
+    def get_backoff_delay(self, attempt: int, error: Exception) -> float:
+        retry_after = getattr(getattr(error, "response", None), "headers", {}).get("retry-after")
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                pass
+            else:
+                # A misbehaving proxy may ask for hours, which would hold the grading worker, so the header is capped
+                # by the same maximum as the backoff.
+                if math.isfinite(delay):
+                    return min(max(delay, 0), self.backoff_max_in_seconds)
+        return random.uniform(0, min(self.backoff_max_in_seconds, self.backoff_base_in_seconds * 2**attempt))
+
+    async def create_chat_completion(self, **parameters: Any) -> ChatCompletion:
+        for attempt in range(self.max_retries + 1):
+            await self.requests_bucket.acquire()
+            await self.tokens_bucket.acquire(self.estimated_tokens_per_request)
+            try:
+                async with self.semaphore, asyncio.timeout(self.deadline_in_seconds):
+                    return await self.client.chat.completions.create(**parameters)
+            except RETRYABLE_ERRORS as error:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.get_backoff_delay(attempt, error)
+                logger.warning(f"OpenAI call failed with {error!r}, retrying in {delay:.2f} seconds.")
+                await asyncio.sleep(delay)
+
+
+client = AsyncVisionClient(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+
+
+async def get_student_answer_grid(student_answer: StudentTestAnswer) -> dict[int, list[int]]:
     prompt = (
         "I am a teacher grading a student's test. The student's answer is represented as a grid. "
         "In the grid, the left side contains the question numbers (e.g., 1, 2, 3), "
@@ -29,7 +103,7 @@ def get_student_answer_grid(student_answer: StudentTestAnswer) -> dict[int, list
         "Ensure that all keys and values are integers, and values are lists of integers."
     )
 
-    response = client.chat.completions.create(
+    response = await client.create_chat_completion(
         model="gpt-4o",
         n=1,
         messages=[
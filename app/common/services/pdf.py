@@ -1,55 +1,309 @@
+import copy
 import io
-import os
-import uuid
+import json
+import zlib
+from functools import cache
+from typing import NamedTuple
 
+from fontTools import ttLib
 from fpdf import FPDF
-from sqlalchemy.ext.asyncio import AsyncSession
+from fpdf.fonts import SubsetMap, TTFFont
+from reportlab.graphics.barcode import qrencoder
 
-from app.common.services.db import query_relationship
-from app.student_tests.models import Question
+from app.common.constants import (
+    ANSWER_SHEET_HEADER_HEIGHT,
+    ANSWER_SHEET_MARGIN,
+    ANSWER_SHEET_QR_CODE_SIZE,
+    FIDUCIAL_SIZE,
+    GRID_CELL_SIZE,
+    GRID_LABEL_BASELINE_RATIO,
+    GRID_LABEL_FONT_SIZE,
+    GRID_LINE_WIDTH,
+    LAYOUT_HEADER_BIT_HEIGHT,
+    PDF_PAGE_HEIGHT,
+    PDF_PAGE_WIDTH,
+    POINTS_PER_MILLIMETER,
+    QR_CODE_QUIET_ZONE_MODULES,
+    QUESTIONS_FONT_FAMILY,
+    QUESTIONS_FONT_PATH,
+)
+from app.common.services.grid_layout import GridLayout, get_grid_layouts
+from app.common.services.pdf_writer import EmbeddedFont, get_embedded_questions_font
 
 
-async def create_grid_pdf(session: AsyncSession, columns_number: int, rows_number: int, questions: list) -> io.BytesIO:
+@cache
+def read_questions_font_file() -> bytes:
+    with open(QUESTIONS_FONT_PATH, "rb") as file:
+        return file.read()
+
+
+@cache
+def get_parsed_questions_font() -> TTFFont:
+    pdf = FPDF()
+    pdf.add_font(QUESTIONS_FONT_FAMILY, "", QUESTIONS_FONT_PATH)
+    return pdf.fonts[QUESTIONS_FONT_FAMILY.lower()]
+
+
+def load_questions_fonts() -> None:
+    get_parsed_questions_font()
+    get_embedded_questions_font()
+
+
+def add_questions_font(pdf: FPDF) -> None:
+    """
+    Register the questions font parsed once per process. The glyph metrics are shared between documents,
+    while the font tables and the glyph subset are per document, because the PDF output subsets them in place.
+    This sets the font internals of fpdf2 2.8, as `add_font` only takes a font path, and the tests check
+    that the font is set up the same way `add_font` sets it up.
+    """
+    font = copy.copy(get_parsed_questions_font())
+    font.i = len(pdf.fonts) + 1
+    font.ttfont = ttLib.TTFont(io.BytesIO(read_questions_font_file()), recalcTimestamp=False, fontNumber=0, lazy=True)
+    reserved_characters = "\x00 \r\n"
+    if pdf.str_alias_nb_pages:
+        reserved_characters += "0123456789" + pdf.str_alias_nb_pages
+    font.subset = SubsetMap(font, [ord(char) for char in reserved_characters])
+    font.missing_glyphs = []
+    pdf.fonts[font.fontkey] = font
+
+
+class GridShapes(NamedTuple):
+    """
+    Everything printed for one framed grid, in millimeters from the top left marker center with the y axis pointing
+    down, so that the grid pages of `create_grid_pdf` and the answer sheets draw the same grid.
+    """
+
+    filled_rectangles: list[tuple[float, float, float, float]]
+    lines: list[tuple[float, float, float, float]]
+    labels: list[tuple[float, float, str]]
+
+
+def get_grid_shapes(layout: GridLayout) -> GridShapes:
+    """
+    Return the filled (x, y, width, height) rectangles of the fiducial markers and the layout header,
+    the (x1, y1, x2, y2) grid lines and the (x, y, text) labels of the answers and questions centered at their points.
+    """
+    filled_rectangles = [
+        (x - FIDUCIAL_SIZE / 2, y - FIDUCIAL_SIZE / 2, FIDUCIAL_SIZE, FIDUCIAL_SIZE)
+        for x, y in layout.fiducials_centers
+    ]
+    filled_rectangles += [
+        (
+            x - layout.header_bit_width / 2,
+            -LAYOUT_HEADER_BIT_HEIGHT / 2,
+            layout.header_bit_width,
+            LAYOUT_HEADER_BIT_HEIGHT,
+        )
+        for bit, x in zip(layout.encode_header(), layout.header_bits_centers)
+        if bit
+    ]
+
+    left, top = layout.grid_left, layout.grid_top
+    right, bottom = left + layout.grid_width, top + layout.grid_height
+    lines = [
+        (left, top + index * GRID_CELL_SIZE, right, top + index * GRID_CELL_SIZE)
+        for index in range(layout.rows_number + 2)
+    ]
+    lines += [
+        (left + index * GRID_CELL_SIZE, top, left + index * GRID_CELL_SIZE, bottom)
+        for index in range(layout.columns_number + 2)
+    ]
+
+    labels = [
+        (left + (column_index + 1.5) * GRID_CELL_SIZE, top + GRID_CELL_SIZE / 2, chr(65 + column_index))
+        for column_index in range(layout.columns_number)
+    ]
+    labels += [
+        (
+            left + GRID_CELL_SIZE / 2,
+            top + (row_index + 1.5) * GRID_CELL_SIZE,
+            str(layout.first_question_number + row_index),
+        )
+        for row_index in range(layout.rows_number)
+    ]
+    return GridShapes(filled_rectangles, lines, labels)
+
+
+def draw_framed_grid(pdf: FPDF, layout: GridLayout, origin_x: float, origin_y: float) -> None:
+    """
+    Draw the grid with its fiducial markers and layout header, where the origin is the top left marker center.
+    The questions font must be registered in the document.
+    """
+    shapes = get_grid_shapes(layout)
+    pdf.set_fill_color(0)
+    for x, y, width, height in shapes.filled_rectangles:
+        pdf.rect(origin_x + x, origin_y + y, width, height, "F")
+
+    pdf.set_line_width(GRID_LINE_WIDTH)
+    for x1, y1, x2, y2 in shapes.lines:
+        pdf.line(origin_x + x1, origin_y + y1, origin_x + x2, origin_y + y2)
+
+    pdf.set_font(QUESTIONS_FONT_FAMILY, size=GRID_LABEL_FONT_SIZE)
+    baseline_offset = GRID_LABEL_BASELINE_RATIO * GRID_LABEL_FONT_SIZE / POINTS_PER_MILLIMETER
+    for x, y, label in shapes.labels:
+        pdf.text(origin_x + x - pdf.get_string_width(label) / 2, origin_y + y + baseline_offset, label)
+
+
+def create_grid_pdf(
+    columns_number: int, rows_number: int, questions: list[tuple[str, list[str]]], title: str | None = None
+) -> bytes:
+    """
+    Render the test questions, given as pairs of the question content and its answers contents, and the answers grid.
+    The optional title, like the variant number, is printed above the questions.
+    """
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_font("Arimo", "", "app/common/fonts/Arimo-Regular.ttf", uni=True)
-    pdf.set_font("Arimo", size=12)
+    add_questions_font(pdf)
+    pdf.set_font(QUESTIONS_FONT_FAMILY, size=12)
     page_width = pdf.w - 2 * pdf.l_margin
 
     pdf.add_page()
-    for idx, question in enumerate(questions, start=1):
-        pdf.multi_cell(page_width, 10, f"{idx}. {question.content}")
+    if title is not None:
+        pdf.multi_cell(page_width, 10, title)
+        pdf.ln(5)
+    for idx, (question_content, answers_contents) in enumerate(questions, start=1):
+        pdf.multi_cell(page_width, 10, f"{idx}. {question_content}")
         pdf.set_x(pdf.l_margin)
 
-        answers = await query_relationship(session, question, [Question.answers])
-        for i, answer in enumerate(answers):
+        for i, answer_content in enumerate(answers_contents):
             answer_indent = 10
             pdf.set_x(pdf.get_x() + answer_indent)
-            pdf.cell(0, 10, f"{chr(97 + i)}) {answer.content}", ln=True)
+            pdf.cell(0, 10, f"{chr(97 + i)}) {answer_content}", ln=True)
 
         pdf.ln(5)
 
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 12)
+    pdf.set_auto_page_break(auto=False, margin=15)
+    available_height = pdf.h - pdf.t_margin - pdf.b_margin
+    for layout in get_grid_layouts(rows_number, columns_number, available_height):
+        pdf.add_page()
+        draw_framed_grid(pdf, layout, pdf.l_margin + FIDUCIAL_SIZE / 2, pdf.t_margin + FIDUCIAL_SIZE / 2)
+
+    return bytes(pdf.output())
+
+
+def draw_text(font: EmbeddedFont, x: float, y: float, size: float, text: str) -> bytes:
+    return b"BT /F1 %.2f Tf %.2f %.2f Td %s Tj ET\n" % (size, x, y, font.encode(text))
+
+
+def draw_qr_code(data: str, x: float, top: float, size: float) -> bytes:
+    qr_code = qrencoder.QRCode(None, qrencoder.QRErrorCorrectLevel.M)
+    qr_code.addData(data)
+    qr_code.version = qr_code.calculate_version()
+    # Any mask pattern gives a valid code, while scoring all eight of them to pick the best one is five times slower.
+    qr_code.makeImpl(False, 0)
+    modules_number = qr_code.getModuleCount()
+    module_size = size / (modules_number + 2 * QR_CODE_QUIET_ZONE_MODULES)
+
+    rectangles = []
+    for row in range(modules_number):
+        column = 0
+        while column < modules_number:
+            if not qr_code.isDark(row, column):
+                column += 1
+                continue
+            run_start = column
+            while column < modules_number and qr_code.isDark(row, column):
+                column += 1
+            rectangles.append(
+                b"%.2f %.2f %.2f %.2f re\n"
+                % (
+                    x + (QR_CODE_QUIET_ZONE_MODULES + run_start) * module_size,
+                    top - (QR_CODE_QUIET_ZONE_MODULES + row + 1) * module_size,
+                    (column - run_start) * module_size,
+                    module_size,
+                )
+            )
+    return b"".join(rectangles) + b"f\n"
+
+
+def draw_rectangle(origin_x: float, origin_y: float, x: float, y: float, width: float, height: float) -> bytes:
+    """
+    Add a rectangle given in millimeters from the origin, with the y axis pointing down, to the current path.
+    """
+    return b"%.2f %.2f %.2f %.2f re\n" % (
+        origin_x + x * POINTS_PER_MILLIMETER,
+        origin_y - (y + height) * POINTS_PER_MILLIMETER,
+        width * POINTS_PER_MILLIMETER,
+        height * POINTS_PER_MILLIMETER,
+    )
+
+
+def draw_answers_grid(font: EmbeddedFont, layout: GridLayout, origin_x: float, origin_y: float) -> bytes:
+    """
+    Draw the same framed grid as `draw_framed_grid` does for the grid page of `create_grid_pdf`.
+    The origin is the top left marker center in points.
+    """
+    shapes = get_grid_shapes(layout)
+    operations = [
+        draw_rectangle(origin_x, origin_y, x, y, width, height) for x, y, width, height in shapes.filled_rectangles
+    ]
+    operations.append(b"f\n")
+
+    operations.append(b"%.2f w\n" % (GRID_LINE_WIDTH * POINTS_PER_MILLIMETER))
+    for x1, y1, x2, y2 in shapes.lines:
+        operations.append(
+            b"%.2f %.2f m %.2f %.2f l\n"
+            % (
+                origin_x + x1 * POINTS_PER_MILLIMETER,
+                origin_y - y1 * POINTS_PER_MILLIMETER,
+                origin_x + x2 * POINTS_PER_MILLIMETER,
+                origin_y - y2 * POINTS_PER_MILLIMETER,
+            )
+        )
+    operations.append(b"S\n")
 
-    column_width = 10
-    row_height = 10
+    for x, y, label in shapes.labels:
+        operations.append(
+            draw_text(
+                font,
+                origin_x + x * POINTS_PER_MILLIMETER - font.get_text_width(label, GRID_LABEL_FONT_SIZE) / 2,
+                origin_y - y * POINTS_PER_MILLIMETER - GRID_LABEL_BASELINE_RATIO * GRID_LABEL_FONT_SIZE,
+                GRID_LABEL_FONT_SIZE,
+                label,
+            )
+        )
+    return b"".join(operations)
 
-    pdf.cell(column_width, row_height, "", border=1, align="C")
-    for column_index in range(columns_number):
-        pdf.cell(column_width, row_height, chr(65 + column_index), border=1, align="C")
-    pdf.ln()
 
-    for row_index in range(rows_number):
-        pdf.cell(column_width, row_height, str(row_index + 1), border=1, align="C")
-        for column_index in range(columns_number):
-            pdf.cell(column_width, row_height, "", border=1, align="C")
-        pdf.ln()
+def create_answer_sheets_contents(
+    test_id: str, test_name: str, rows_number: int, columns_number: int, students: list[tuple[str, str]]
+) -> list[bytes]:
+    """
+    Draw the personal answer sheets of the students, given as pairs of the username and the group,
+    and return the compressed content streams of their pages in order.
+    A student gets several pages if the grid does not fit on one, every page has its own QR code.
+    """
+    font = get_embedded_questions_font()
+    margin = ANSWER_SHEET_MARGIN * POINTS_PER_MILLIMETER
+    qr_code_size = ANSWER_SHEET_QR_CODE_SIZE * POINTS_PER_MILLIMETER
+    grid_origin_y = PDF_PAGE_HEIGHT - (ANSWER_SHEET_HEADER_HEIGHT + FIDUCIAL_SIZE / 2) * POINTS_PER_MILLIMETER
+    available_height = PDF_PAGE_HEIGHT / POINTS_PER_MILLIMETER - ANSWER_SHEET_HEADER_HEIGHT - ANSWER_SHEET_MARGIN
+    layouts = get_grid_layouts(rows_number, columns_number, available_height)
 
-    path = f"{uuid.uuid4()}.pdf"
-    pdf.output(path)
-    with open(path, "rb") as file:
-        output = io.BytesIO(file.read())
-    os.remove(path)
+    contents = []
+    for student_username, student_group in students:
+        for page_index, layout in enumerate(layouts):
+            identity = {
+                "test_id": test_id,
+                "student_username": student_username,
+                "student_group": student_group,
+                "first_question_number": layout.first_question_number,
+            }
 
-    return output
+            top = PDF_PAGE_HEIGHT - margin
+            content = [
+                draw_text(font, margin, top - 16, 16, test_name),
+                draw_text(font, margin, top - 40, 12, f"Student: {student_username}"),
+                draw_text(font, margin, top - 58, 12, f"Group: {student_group}"),
+                draw_qr_code(
+                    json.dumps(identity, ensure_ascii=False, separators=(",", ":")),
+                    PDF_PAGE_WIDTH - margin - qr_code_size,
+                    top,
+                    qr_code_size,
+                ),
+                draw_answers_grid(font, layout, margin + FIDUCIAL_SIZE / 2 * POINTS_PER_MILLIMETER, grid_origin_y),
+            ]
+            if len(layouts) > 1:
+                content.append(draw_text(font, margin, top - 76, 12, f"Page {page_index + 1} of {len(layouts)}"))
+            contents.append(zlib.compress(b"".join(content)))
+    return contents
@@ -0,0 +1,176 @@
+import zlib
+from functools import cache
+
+from fontTools import ttLib
+
+from app.common.constants import PDF_PAGE_HEIGHT, PDF_PAGE_WIDTH, QUESTIONS_FONT_PATH
+
+
+class EmbeddedFont:
+    """
+    A TrueType font embedded whole as a composite font, so that any text is written as glyph ids
+    and no per-document subset has to be built before the pages are sent.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            font_file = file.read()
+        self.font_file_length = len(font_file)
+        self.compressed_font_file = zlib.compress(font_file)
+        font = ttLib.TTFont(path, lazy=True)
+        scale = 1000 / font["head"].unitsPerEm
+        self.name = font["name"].getBestFullName().replace(" ", "")
+        self.glyph_ids = {code: font.getGlyphID(glyph_name) for code, glyph_name in font.getBestCmap().items()}
+        self.widths = [round(font["hmtx"].metrics[glyph_name][0] * scale) for glyph_name in font.getGlyphOrder()]
+        self.ascent = round(font["hhea"].ascent * scale)
+        self.descent = round(font["hhea"].descent * scale)
+        self.bounding_box = [
+            round(font["head"].xMin * scale),
+            round(font["head"].yMin * scale),
+            round(font["head"].xMax * scale),
+            round(font["head"].yMax * scale),
+        ]
+        self.compressed_to_unicode_map = zlib.compress(self.get_to_unicode_map())
+
+    def encode(self, text: str) -> bytes:
+        return b"<" + "".join(f"{self.glyph_ids.get(ord(char), 0):04X}" for char in text).encode() + b">"
+
+    def get_text_width(self, text: str, size: float) -> float:
+        return sum(self.widths[self.glyph_ids.get(ord(char), 0)] for char in text) * size / 1000
+
+    def get_to_unicode_map(self) -> bytes:
+        # Fonts map several code points to one glyph, like the space and the no-break space,
+        # so every glyph is extracted as its lowest code point, which is the plain character.
+        glyph_codes = {}
+        for code, glyph_id in sorted(self.glyph_ids.items()):
+            if code < 0x10000:
+                glyph_codes.setdefault(glyph_id, code)
+        mappings = [f"<{glyph_id:04X}> <{code:04X}>" for glyph_id, code in sorted(glyph_codes.items())]
+        blocks = [
+            f"{len(mappings[start:start + 100])} beginbfchar\n"
+            + "\n".join(mappings[start : start + 100])
+            + "\nendbfchar"
+            for start in range(0, len(mappings), 100)
+        ]
+        return (
+            "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+            "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+            "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+            + "\n".join(blocks)
+            + "\nendcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+        ).encode()
+
+
+@cache
+def get_embedded_questions_font() -> EmbeddedFont:
+    return EmbeddedFont(QUESTIONS_FONT_PATH)
+
+
+class StreamingPDFWriter:
+    """
+    Write a PDF document object by object, so that every page is sent as soon as it is drawn.
+    Only the object offsets and the page ids are kept until the document is finished.
+    All pages share one embedded font, available to the page contents as /F1.
+    """
+
+    def __init__(self, font: EmbeddedFont) -> None:
+        self.font = font
+        self._offsets: dict[int, int] = {}
+        self._position = 0
+        self._objects_number = 0
+        self._page_ids: list[int] = []
+        self._catalog_id = self._reserve_object_id()
+        self._pages_id = self._reserve_object_id()
+        self._font_id = self._reserve_object_id()
+
+    def _reserve_object_id(self) -> int:
+        self._objects_number += 1
+        return self._objects_number
+
+    def _write(self, data: bytes) -> bytes:
+        self._position += len(data)
+        return data
+
+    def _write_object(self, object_id: int, body: bytes) -> bytes:
+        self._offsets[object_id] = self._position
+        return self._write(b"%d 0 obj\n%s\nendobj\n" % (object_id, body))
+
+    def _write_stream(self, object_id: int, compressed_data: bytes, dictionary: bytes = b"") -> bytes:
+        return self._write_object(
+            object_id,
+            b"<< /Length %d /Filter /FlateDecode %s>>\nstream\n%s\nendstream"
+            % (len(compressed_data), dictionary, compressed_data),
+        )
+
+    def start(self) -> bytes:
+        return self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def add_page(self, compressed_content: bytes) -> bytes:
+        """
+        Add a page drawn by the zlib-compressed content stream.
+        """
+        content_id = self._reserve_object_id()
+        page_id = self._reserve_object_id()
+        self._page_ids.append(page_id)
+        page = b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] " % (
+            self._pages_id,
+            PDF_PAGE_WIDTH,
+            PDF_PAGE_HEIGHT,
+        ) + b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (self._font_id, content_id)
+        return self._write_stream(content_id, compressed_content) + self._write_object(page_id, page)
+
+    def _write_font(self) -> bytes:
+        descendant_font_id = self._reserve_object_id()
+        descriptor_id = self._reserve_object_id()
+        font_file_id = self._reserve_object_id()
+        to_unicode_id = self._reserve_object_id()
+        name = self.font.name.encode()
+        widths = b" ".join(b"%d" % width for width in self.font.widths)
+        bounding_box = b" ".join(b"%d" % value for value in self.font.bounding_box)
+
+        return (
+            self._write_object(
+                self._font_id,
+                b"<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H "
+                b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (name, descendant_font_id, to_unicode_id),
+            )
+            + self._write_object(
+                descendant_font_id,
+                b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /%s "
+                b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+                b"/FontDescriptor %d 0 R /W [0 [%s]] /CIDToGIDMap /Identity >>" % (name, descriptor_id, widths),
+            )
+            + self._write_object(
+                descriptor_id,
+                b"<< /Type /FontDescriptor /FontName /%s /Flags 32 /FontBBox [%s] /ItalicAngle 0 "
+                b"/Ascent %d /Descent %d /CapHeight %d /StemV 80 /FontFile2 %d 0 R >>"
+                % (name, bounding_box, self.font.ascent, self.font.descent, self.font.ascent, font_file_id),
+            )
+            + self._write_stream(
+                font_file_id, self.font.compressed_font_file, b"/Length1 %d " % self.font.font_file_length
+            )
+            + self._write_stream(to_unicode_id, self.font.compressed_to_unicode_map)
+        )
+
+    def finish(self) -> bytes:
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+        output = (
+            self._write_font()
+            + self._write_object(
+                self._pages_id, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids))
+            )
+            + self._write_object(self._catalog_id, b"<< /Type /Catalog /Pages %d 0 R >>" % self._pages_id)
+        )
+
+        cross_reference_offset = self._position
+        cross_reference = b"xref\n0 %d\n0000000000 65535 f \n" % (self._objects_number + 1)
+        cross_reference += b"".join(
+            b"%010d 00000 n \n" % self._offsets[object_id] for object_id in range(1, self._objects_number + 1)
+        )
+        trailer = b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            self._objects_number + 1,
+            self._catalog_id,
+            cross_reference_offset,
+        )
+        return output + self._write(cross_reference + trailer)
@@ -0,0 +1,54 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from app.common.exceptions import RenderingPoolBusyException
+from app.common.services.executors import BoundedExecutor
+from app.common.services.pdf import (
+    create_answer_sheets_contents,
+    create_grid_pdf,
+    load_questions_fonts,
+)
+from app.core.config import settings
+
+# A process pool keeps the event loop free while the documents are built. The processes are fresh interpreters,
+# so that no event loop, connection pool or thread of the application process is copied into them,
+# and the jobs get plain data only, because ORM objects can not cross the process boundary.
+pdf_rendering_pool = BoundedExecutor(
+    name="pdf_rendering",
+    create_executor=partial(
+        ProcessPoolExecutor,
+        max_workers=settings.pdf_rendering_processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=load_questions_fonts,
+    ),
+    max_workers=settings.pdf_rendering_processes,
+    max_queue_size=settings.pdf_rendering_max_queue_size,
+    busy_exception=RenderingPoolBusyException,
+)
+
+
+async def render_grid_pdf(
+    columns_number: int, rows_number: int, questions: list[tuple[str, list[str]]], title: str | None = None
+) -> bytes:
+    return await pdf_rendering_pool.run("grid_pdf", create_grid_pdf, columns_number, rows_number, questions, title)
+
+
+async def render_answer_sheets(
+    test_id: str,
+    test_name: str,
+    rows_number: int,
+    columns_number: int,
+    students: list[tuple[str, str]],
+    reject_when_full: bool = True,
+) -> list[bytes]:
+    return await pdf_rendering_pool.run(
+        "answer_sheets",
+        create_answer_sheets_contents,
+        test_id,
+        test_name,
+        rows_number,
+        columns_number,
+        students,
+        reject_when_full=reject_when_full,
+    )
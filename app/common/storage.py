@@ -1,6 +1,14 @@
+import asyncio
+import io
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, BinaryIO
+from uuid import UUID
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
 from fastapi import File, UploadFile
 
 from app.core.config import settings
@@ -13,6 +21,12 @@ client = session.client(
     aws_access_key_id=settings.bucket_access_key_id,
     aws_secret_access_key=settings.bucket_access_key,
 )
+upload_executor = ThreadPoolExecutor(max_workers=settings.storage_max_concurrent_uploads, thread_name_prefix="upload")
+transfer_config = TransferConfig(
+    multipart_threshold=settings.storage_multipart_chunk_size_in_bytes,
+    multipart_chunksize=settings.storage_multipart_chunk_size_in_bytes,
+    max_concurrency=settings.storage_multipart_concurrency,
+)
 
 
 class FileStorage:
@@ -22,13 +36,127 @@ class FileStorage:
         self.bucket_name = bucket_name
 
     async def upload(self, file: UploadFile = File(...)) -> str:
-        key = f"{file.filename}-{uuid.uuid4()}"
-        client.put_object(
-            Bucket=self.bucket_name, Key=key, Body=file.file, ACL="public-read", ContentType=file.content_type
+        """
+        Stream the file to the bucket from a bounded thread pool, in multipart chunks when it is large,
+        so the event loop is never blocked and the file is never read into memory as a whole.
+        """
+        return await self.upload_file_object(file.file, f"{file.filename}-{uuid.uuid4()}", file.content_type)
+
+    async def upload_file_object(
+        self, file_object: BinaryIO, key: str, content_type: str | None, public: bool = True
+    ) -> str:
+        extra_arguments = {"ACL": "public-read"} if public else {}
+        if content_type:
+            extra_arguments["ContentType"] = content_type
+        await asyncio.get_running_loop().run_in_executor(
+            upload_executor,
+            partial(
+                client.upload_fileobj,
+                file_object,
+                self.bucket_name,
+                key,
+                ExtraArgs=extra_arguments,
+                Config=transfer_config,
+            ),
         )
-        file_url = f"{settings.bucket_endpoint}/{self.bucket_name}/{key}"
-        return file_url
+        return self.get_file_url(key)
+
+    def get_file_url(self, key: str) -> str:
+        return f"{settings.bucket_endpoint}/{self.bucket_name}/{key}"
+
+    def generate_upload_form(self, key: str, content_type: str) -> dict[str, Any]:
+        """
+        Presign a POST form that lets a client upload the file straight to the bucket under the given key.
+        """
+        return client.generate_presigned_post(
+            Bucket=self.bucket_name,
+            Key=key,
+            Fields={"acl": "public-read", "Content-Type": content_type},
+            Conditions=[
+                {"acl": "public-read"},
+                {"Content-Type": content_type},
+                ["content-length-range", 1, settings.storage_max_upload_size_in_bytes],
+            ],
+            ExpiresIn=settings.storage_upload_form_expiration_in_seconds,
+        )
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                upload_executor, partial(client.head_object, Bucket=self.bucket_name, Key=key)
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def get_file_key(self, file_url: str) -> str:
+        return file_url.removeprefix(f"{settings.bucket_endpoint}/{self.bucket_name}/")
+
+    def download(self, file_url: str) -> bytes:
+        return client.get_object(Bucket=self.bucket_name, Key=self.get_file_key(file_url))["Body"].read()
+
+    def download_to_file(self, file_url: str, file_object: BinaryIO) -> None:
+        client.download_fileobj(self.bucket_name, self.get_file_key(file_url), file_object, Config=transfer_config)
+
+    def delete_many(self, file_urls: list[str]) -> None:
+        """
+        Delete the files with one request per batch, where a batch is at most the 1000 keys the API accepts.
+        """
+        keys = [self.get_file_key(file_url) for file_url in file_urls]
+        for start in range(0, len(keys), settings.storage_delete_batch_size):
+            client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={
+                    "Objects": [{"Key": key} for key in keys[start : start + settings.storage_delete_batch_size]],
+                    "Quiet": True,
+                },
+            )
 
 
 async def upload_test_result(results_photo: UploadFile) -> str:
     return await FileStorage(bucket_name=settings.test_results_bucket_name).upload(results_photo)
+
+
+def generate_test_result_upload_form(test_id: UUID, filename: str, content_type: str) -> dict[str, Any]:
+    key = f"{test_id}/{uuid.uuid4()}-{filename.rsplit('/', 1)[-1]}"
+    upload_form = FileStorage(bucket_name=settings.test_results_bucket_name).generate_upload_form(key, content_type)
+    return {**upload_form, "key": key}
+
+
+def get_test_result_url(key: str) -> str:
+    return FileStorage(bucket_name=settings.test_results_bucket_name).get_file_url(key)
+
+
+async def is_test_result_uploaded(key: str) -> bool:
+    return await FileStorage(bucket_name=settings.test_results_bucket_name).exists(key)
+
+
+def download_test_result(results_photo_url: str) -> bytes:
+    return FileStorage(bucket_name=settings.test_results_bucket_name).download(results_photo_url)
+
+
+async def upload_test_result_page(test_id: UUID, filename: str, data: bytes, content_type: str | None) -> str:
+    key = f"{test_id}/{uuid.uuid4()}-{filename}"
+    return await FileStorage(bucket_name=settings.test_results_bucket_name).upload_file_object(
+        io.BytesIO(data), key, content_type
+    )
+
+
+async def upload_submissions_archive(test_id: UUID, archive: UploadFile) -> str:
+    """
+    Stream the archive to the bucket as a private object, where the import job picks it up.
+    """
+    key = f"imports/{test_id}/{uuid.uuid4()}"
+    return await FileStorage(bucket_name=settings.test_results_bucket_name).upload_file_object(
+        archive.file, key, archive.content_type, public=False
+    )
+
+
+def download_submissions_archive(archive_url: str, file_object: BinaryIO) -> None:
+    FileStorage(bucket_name=settings.test_results_bucket_name).download_to_file(archive_url, file_object)
+
+
+def delete_test_results(results_photo_urls: list[str]) -> None:
+    FileStorage(bucket_name=settings.test_results_bucket_name).delete_many(results_photo_urls)
@@ -1,5 +1,11 @@
+from enum import Enum
 from typing import TypeVar
 
 from app.common.models import BaseDatabaseModel
 
 DatabaseInstanceType = TypeVar("DatabaseInstanceType", bound=BaseDatabaseModel)
+
+
+class ArchiveType(str, Enum):
+    zip = "zip"
+    pdf = "pdf"
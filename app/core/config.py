@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,17 +18,70 @@ class Settings(BaseSettings):
     refresh_token_expiration_time_in_days: int
     access_token_expiration_time_in_minutes: int
 
+    # Passwords
+    password_hashing_rounds: int = 12
+    password_hashing_threads: int = 4
+    password_hashing_max_queue_size: int = 64
+
     # DigitalOcean
     bucket_access_key: str
     bucket_access_key_id: str
     bucket_endpoint: str
     test_results_bucket_name: str
+    storage_max_concurrent_uploads: int = 16
+    storage_multipart_chunk_size_in_bytes: int = 8 * 1024 * 1024
+    storage_multipart_concurrency: int = 4
+    storage_max_upload_size_in_bytes: int = 25 * 1024 * 1024
+    storage_upload_form_expiration_in_seconds: int = 15 * 60
+    storage_delete_batch_size: int = 1000
 
     # Celery
     celery_broker_url: str
+    worker_database_pool_size: int = 10
+    worker_database_max_overflow: int = 5
 
     # OpenAI
     openai_api_key: str
+    openai_base_url: str | None = None
+    openai_max_concurrent_requests: int = 16
+    openai_requests_per_minute: int = 500
+    openai_tokens_per_minute: int = 30000
+    openai_estimated_tokens_per_request: int = 1500
+    openai_deadline_in_seconds: float = 60
+    openai_max_retries: int = 5
+    openai_backoff_base_in_seconds: float = 1
+    openai_backoff_max_in_seconds: float = 30
+
+    # Cache
+    cache_redis_url: str | None = None
+    answer_key_cache_size: int = 1024
+    answer_key_cache_ttl_in_seconds: int = 24 * 60 * 60
+    test_version_cache_ttl_in_seconds: int = 24 * 60 * 60
+    grid_pdf_cache_size: int = 64
+    grid_pdf_cache_ttl_in_seconds: int = 24 * 60 * 60
+    authenticated_user_cache_size: int = 4096
+    authenticated_user_cache_ttl_in_seconds: int = 30
+    authenticated_user_shared_cache_enabled: bool = True
+    authenticated_user_shared_cache_ttl_in_seconds: int = 5 * 60
+
+    # Rendering
+    pdf_rendering_processes: int = 2
+    pdf_rendering_max_queue_size: int = 32
+    answer_sheets_chunk_size: int = 50
+    answer_sheets_max_students: int = 1000
+
+    # Pagination
+    default_page_size: int = 50
+    max_page_size: int = 200
+    results_export_batch_size: int = 1000
+
+    # Grading
+    grading_engine: Literal["openai", "omr"] = "openai"
+    grading_concurrency: int = 8
+    omr_fill_threshold: float = 0.15
+    test_variants_max_number: int = 26
+    submissions_import_batch_size: int = 25
+    submissions_archive_max_entry_size_in_bytes: int = 25 * 1024 * 1024
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -38,5 +93,9 @@ class Settings(BaseSettings):
             f"{self.database_host}:{self.database_port}/{self.database_name}"
         )
 
+    @property
+    def redis_url(self) -> str:
+        return self.cache_redis_url or self.celery_broker_url
+
 
 settings = Settings()
@@ -1,9 +1,14 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.database_url)
+
+def create_database_engine(**options) -> AsyncEngine:
+    return create_async_engine(settings.database_url, pool_pre_ping=True, **options)
+
+
+engine = create_database_engine()
 
 SessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)  # noqa
 
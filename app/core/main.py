@@ -1,10 +1,23 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from prometheus_client import make_asgi_app
 from starlette.middleware.cors import CORSMiddleware
 
+from app.auth.hashing import password_hashing_pool
+from app.common.services.rendering import pdf_rendering_pool
 from app.student_tests.handlers import student_tests_router
 from app.users.handlers import users_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    pdf_rendering_pool.shutdown()
+    password_hashing_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,3 +29,4 @@ app.add_middleware(
 
 app.include_router(users_router, prefix="/users")
 app.include_router(student_tests_router, prefix="/tests")
+app.mount("/metrics", make_asgi_app())
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Coroutine, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import db
+from app.core.config import settings
+
+ResultType = TypeVar("ResultType")
+
+
+class WorkerRuntime:
+    """
+    The event loop and database engine of one Celery worker process.
+    Both are created after the prefork pool forks the process, so no connection is shared with the parent.
+    """
+
+    loop: asyncio.AbstractEventLoop | None = None
+    engine: AsyncEngine | None = None
+
+    def start(self) -> None:
+        db.engine.sync_engine.dispose(close=False)
+        self.engine = db.create_database_engine(
+            pool_size=settings.worker_database_pool_size, max_overflow=settings.worker_database_max_overflow
+        )
+        db.SessionLocal.configure(bind=self.engine)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def stop(self) -> None:
+        if self.loop is None:
+            return
+        self.loop.run_until_complete(self.engine.dispose())
+        self.loop.close()
+        self.loop = self.engine = None
+
+    def run(self, coroutine: Coroutine[Any, Any, ResultType]) -> ResultType:
+        if self.loop is None:
+            self.start()
+        return self.loop.run_until_complete(coroutine)
+
+
+worker_runtime = WorkerRuntime()
+
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs: Any) -> None:
+    worker_runtime.start()
+
+
+@worker_process_shutdown.connect
+def stop_worker_runtime(**kwargs: Any) -> None:
+    worker_runtime.stop()
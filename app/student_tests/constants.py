@@ -0,0 +1,12 @@
+MAX_ANSWERS_PER_QUESTION = 63
+DELETED_TEST_VERSION_MARKER = "deleted"
+RESULTS_EXPORT_COLUMNS = (
+    "id",
+    "created_at",
+    "student_username",
+    "student_group",
+    "variant_number",
+    "score",
+    "max_score",
+    "results_photo_url",
+)
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from app.common.exceptions import BaseCustomException
 
 
@@ -12,3 +14,48 @@ class InvalidRelationshipAttributeException(BaseCustomException):
             description=f"The relationship attribute {attribute_name} is invalid.",
             code="invalid-relationship-attribute",
         )
+
+
+class InvalidResultsPhotoKeyException(BaseCustomException):
+    def __init__(self, key: str):
+        super().__init__(
+            description=f"The results photo {key} was not issued for this test.", code="invalid-results-photo-key"
+        )
+
+
+class ResultsPhotoNotUploadedException(BaseCustomException):
+    def __init__(self, key: str):
+        super().__init__(
+            description=f"The results photo {key} has not been uploaded.", code="results-photo-not-uploaded"
+        )
+
+
+class InvalidStudentsListException(BaseCustomException):
+    def __init__(self):
+        super().__init__(
+            description="The students must be a JSON list of student_username and student_group objects, "
+            "given in the order of the pages of a PDF archive.",
+            code="invalid-students-list",
+        )
+
+
+class TestItemsNotFoundException(BaseCustomException):
+    def __init__(self, ids: list[UUID]):
+        super().__init__(
+            description=f"The questions or answers {', '.join(map(str, ids))} are not part of the test.",
+            code="test-items-not-found",
+        )
+
+
+class InvalidTestItemsOrderException(BaseCustomException):
+    def __init__(self):
+        super().__init__(
+            description="The new order must list every remaining question, or every remaining answer "
+            "of the question, exactly once.",
+            code="invalid-test-items-order",
+        )
+
+
+class TestVariantNotFoundException(BaseCustomException):
+    def __init__(self, number: int):
+        super().__init__(description=f"The test has no variant {number}.", code="test-variant-not-found")
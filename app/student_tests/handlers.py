@@ -1,48 +1,98 @@
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile
+from fastapi import APIRouter, Depends, File, Form, Query, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from starlette import status
-from starlette.responses import StreamingResponse
+from starlette.responses import Response, StreamingResponse
 
 from app.common.decorators import expects_exceptions
 from app.common.dependencies import get_db_session, get_http_authenticated_user
-from app.common.handlers import check_if_object_belongs_to_user, get_object_or_404
+from app.common.exceptions import (
+    InvalidCursorException,
+    RenderingPoolBusyException,
+    UnsupportedArchiveException,
+)
+from app.common.handlers import (
+    get_conditional_request_headers,
+    get_object_or_404,
+    get_user_object_or_404,
+    is_not_modified,
+)
+from app.common.schemas import PageSchema
 from app.common.services.db import query_relationship
-from app.common.storage import upload_test_result
+from app.common.storage import generate_test_result_upload_form, upload_test_result
 from app.common.utilities import get_user_model
-from app.student_tests.exceptions import DuplicateTestNameException
-from app.student_tests.models import Answer, Question, StudentTestAnswer, Test
+from app.core.config import settings
+from app.student_tests.exceptions import (
+    DuplicateTestNameException,
+    InvalidResultsPhotoKeyException,
+    InvalidStudentsListException,
+    InvalidTestItemsOrderException,
+    ResultsPhotoNotUploadedException,
+    TestItemsNotFoundException,
+    TestVariantNotFoundException,
+)
+from app.student_tests.models import (
+    Answer,
+    Question,
+    StudentTestAnswer,
+    SubmissionsImport,
+    Test,
+    TestVariant,
+)
 from app.student_tests.schemas import (
     AnswerCreateSchema,
     AnswerOutputSchema,
+    AnswerSheetsCreateSchema,
     AnswerUpdateSchema,
     QuestionCreateSchema,
     QuestionOutputSchema,
     QuestionUpdateSchema,
+    ResultsPhotoUploadInputSchema,
+    ResultsPhotoUploadOutputSchema,
+    StudentTestAnswerFinalizeSchema,
     StudentTestAnswerOutputSchema,
     StudentTestAnswerUpdateSchema,
+    SubmissionsImportOutputSchema,
+    TestBatchEditSchema,
     TestCreateSchema,
     TestOutputSchema,
     TestUpdateSchema,
+    TestVariantOutputSchema,
+    TestVariantsCreateSchema,
+    TestWithQuestionsOutputSchema,
 )
 from app.student_tests.services import (
     annotate_student_answer_with_test_info,
-    annotate_tests_with_questions_count,
     create_answer,
     create_question,
     create_student_answer,
+    create_submissions_import,
     create_test,
+    create_test_variants,
     delete_answer,
     delete_question,
     delete_test,
+    edit_test_content,
+    export_student_answers,
+    finalize_student_answer,
+    generate_answer_sheets,
     generate_test_answers_grid,
+    get_cached_test_answers_grid,
+    get_published_test_version,
     get_student_answers_with_test_info,
+    get_teacher_tests,
+    get_test_version,
+    publish_test_version,
+    regrade_student_answers,
     update_answer,
     update_question,
     update_student_test_answer_score,
     update_test,
 )
+from app.student_tests.types import ResultsExportFormat
 
 User = get_user_model()
 
@@ -66,8 +116,7 @@ async def create_question_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    test = await get_object_or_404(session, Test, id=test_id)
-    check_if_object_belongs_to_user(test.teacher, user)
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
 
     return await create_question(
         session=session,
@@ -84,8 +133,7 @@ async def get_questions_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    test = await get_object_or_404(session, Test, id=test_id)
-    check_if_object_belongs_to_user(test.teacher, user)
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
 
     return await query_relationship(session, test, [Test.questions])
 
@@ -97,13 +145,7 @@ async def create_answer_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    question = await get_object_or_404(session, Question, id=question_id)
-    check_if_object_belongs_to_user(
-        await query_relationship(
-            session=session, instance=question, relationship_attributes=[Question.test, Test.teacher]
-        ),
-        user,
-    )
+    question = await get_user_object_or_404(session, Question, user, Test.teacher_id, [Question.test], id=question_id)
 
     return await create_answer(
         session=session, question=question, content=answer_data.content, is_correct=answer_data.is_correct
@@ -116,25 +158,20 @@ async def get_answers_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    question = await get_object_or_404(session, Question, id=question_id)
-    check_if_object_belongs_to_user(
-        await query_relationship(
-            session=session, instance=question, relationship_attributes=[Question.test, Test.teacher]
-        ),
-        user,
-    )
+    question = await get_user_object_or_404(session, Question, user, Test.teacher_id, [Question.test], id=question_id)
 
     return await query_relationship(session, question, [Question.answers])
 
 
-@student_tests_router.get("/", response_model=list[TestOutputSchema])
+@student_tests_router.get("/", response_model=PageSchema[TestOutputSchema])
+@expects_exceptions({InvalidCursorException: status.HTTP_400_BAD_REQUEST})
 async def get_tests_route(
-    user: User = Depends(get_http_authenticated_user), session: AsyncSession = Depends(get_db_session)
+    cursor: str | None = None,
+    page_size: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
 ):
-    return await annotate_tests_with_questions_count(
-        session=session,
-        tests=await query_relationship(session=session, instance=user, relationship_attributes=[User.tests]),
-    )
+    return await get_teacher_tests(session=session, teacher=user, cursor=cursor, page_size=page_size)
 
 
 @student_tests_router.get("/{test_id}/", response_model=TestOutputSchema)
@@ -142,6 +179,22 @@ async def get_test_route(test_id: UUID, session: AsyncSession = Depends(get_db_s
     return await get_object_or_404(session, Test, id=test_id)
 
 
+@student_tests_router.get("/{test_id}/full/", response_model=TestWithQuestionsOutputSchema)
+async def get_test_with_questions_route(
+    test_id: UUID,
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    return await get_user_object_or_404(
+        session,
+        Test,
+        user,
+        Test.teacher_id,
+        options=[selectinload(Test.questions).selectinload(Question.answers)],
+        id=test_id,
+    )
+
+
 @student_tests_router.put("/{test_id}/", response_model=TestOutputSchema)
 async def update_test_route(
     test_id: UUID,
@@ -149,14 +202,31 @@ async def update_test_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    test = await get_object_or_404(session, Test, id=test_id)
-    check_if_object_belongs_to_user(test.teacher, user)
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
 
     await update_test(session=session, test=test, name=test_data.name, question_ids=test_data.question_ids)
 
     return test
 
 
+@student_tests_router.patch("/{test_id}/", response_model=TestWithQuestionsOutputSchema)
+@expects_exceptions(
+    {
+        TestItemsNotFoundException: status.HTTP_400_BAD_REQUEST,
+        InvalidTestItemsOrderException: status.HTTP_400_BAD_REQUEST,
+    }
+)
+async def edit_test_content_route(
+    test_id: UUID,
+    edit_data: TestBatchEditSchema,
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
+
+    return await edit_test_content(session=session, test=test, edit=edit_data)
+
+
 @student_tests_router.put("/questions/{question_id}/", response_model=QuestionOutputSchema)
 async def update_question_route(
     question_id: UUID,
@@ -164,13 +234,7 @@ async def update_question_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    question = await get_object_or_404(session, Question, id=question_id)
-    check_if_object_belongs_to_user(
-        await query_relationship(
-            session=session, instance=question, relationship_attributes=[Question.test, Test.teacher]
-        ),
-        user,
-    )
+    question = await get_user_object_or_404(session, Question, user, Test.teacher_id, [Question.test], id=question_id)
 
     return await update_question(
         session=session,
@@ -187,12 +251,8 @@ async def update_answer_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    answer = await get_object_or_404(session, Answer, id=answer_id)
-    check_if_object_belongs_to_user(
-        await query_relationship(
-            session=session, instance=answer, relationship_attributes=[Answer.question, Question.test, Test.teacher]
-        ),
-        user,
+    answer = await get_user_object_or_404(
+        session, Answer, user, Test.teacher_id, [Answer.question, Question.test], id=answer_id
     )
 
     return await update_answer(
@@ -204,8 +264,7 @@ async def update_answer_route(
 async def delete_test_route(
     test_id: UUID, user: User = Depends(get_http_authenticated_user), session: AsyncSession = Depends(get_db_session)
 ):
-    test = await get_object_or_404(session, Test, id=test_id)
-    check_if_object_belongs_to_user(test.teacher, user)
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
 
     await delete_test(session=session, test=test)
 
@@ -216,13 +275,7 @@ async def delete_question_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    question = await get_object_or_404(session, Question, id=question_id)
-    check_if_object_belongs_to_user(
-        await query_relationship(
-            session=session, instance=question, relationship_attributes=[Question.test, Test.teacher]
-        ),
-        user,
-    )
+    question = await get_user_object_or_404(session, Question, user, Test.teacher_id, [Question.test], id=question_id)
 
     await delete_question(session=session, question=question)
 
@@ -231,22 +284,20 @@ async def delete_question_route(
 async def delete_answer_route(
     answer_id: UUID, user: User = Depends(get_http_authenticated_user), session: AsyncSession = Depends(get_db_session)
 ):
-    answer = await get_object_or_404(session, Answer, id=answer_id)
-    check_if_object_belongs_to_user(
-        await query_relationship(
-            session=session, instance=answer, relationship_attributes=[Answer.question, Question.test, Test.teacher]
-        ),
-        user,
+    answer = await get_user_object_or_404(
+        session, Answer, user, Test.teacher_id, [Answer.question, Question.test], id=answer_id
     )
 
     await delete_answer(session=session, answer=answer)
 
 
 @student_tests_router.post("/{test_id}/submit/")
+@expects_exceptions({TestVariantNotFoundException: status.HTTP_400_BAD_REQUEST})
 async def submit_test_answer_route(
     test_id: UUID,
     student_username: str = Form(...),
     student_group: str = Form(...),
+    variant_number: int | None = Form(None),
     results_photo: UploadFile = File(...),
     session: AsyncSession = Depends(get_db_session),
 ):
@@ -257,29 +308,124 @@ async def submit_test_answer_route(
         student_username=student_username,
         results_url=await upload_test_result(results_photo),
         student_group=student_group,
+        variant_number=variant_number,
+    )
+
+
+@student_tests_router.post("/{test_id}/submit/upload-form/", response_model=ResultsPhotoUploadOutputSchema)
+async def get_results_photo_upload_form_route(
+    test_id: UUID, upload_data: ResultsPhotoUploadInputSchema, session: AsyncSession = Depends(get_db_session)
+):
+    test = await get_object_or_404(session, Test, id=test_id)
+    return generate_test_result_upload_form(test.id, upload_data.filename, upload_data.content_type)
+
+
+@student_tests_router.post("/{test_id}/submit/finalize/")
+@expects_exceptions(
+    {
+        InvalidResultsPhotoKeyException: status.HTTP_400_BAD_REQUEST,
+        ResultsPhotoNotUploadedException: status.HTTP_400_BAD_REQUEST,
+        TestVariantNotFoundException: status.HTTP_400_BAD_REQUEST,
+    }
+)
+async def finalize_test_answer_route(
+    test_id: UUID, answer_data: StudentTestAnswerFinalizeSchema, session: AsyncSession = Depends(get_db_session)
+):
+    test = await get_object_or_404(session, Test, id=test_id)
+    return await finalize_student_answer(
+        session=session,
+        test=test,
+        key=answer_data.key,
+        student_username=answer_data.student_username,
+        student_group=answer_data.student_group,
+        variant_number=answer_data.variant_number,
+    )
+
+
+@student_tests_router.post(
+    "/{test_id}/submit/bulk/", response_model=SubmissionsImportOutputSchema, status_code=status.HTTP_202_ACCEPTED
+)
+@expects_exceptions(
+    {
+        UnsupportedArchiveException: status.HTTP_400_BAD_REQUEST,
+        InvalidStudentsListException: status.HTTP_400_BAD_REQUEST,
+    }
+)
+async def submit_test_answers_in_bulk_route(
+    test_id: UUID,
+    archive: UploadFile = File(...),
+    student_group: str = Form(""),
+    students: str | None = Form(None),
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
+
+    return await create_submissions_import(
+        session=session, test=test, archive=archive, student_group=student_group, students=students
     )
 
 
-@student_tests_router.get("/{test_id}/student-answers/", response_model=list[StudentTestAnswerOutputSchema])
+@student_tests_router.get("/submission-imports/{import_id}/", response_model=SubmissionsImportOutputSchema)
+async def get_submissions_import_route(
+    import_id: UUID,
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    return await get_user_object_or_404(
+        session, SubmissionsImport, user, Test.teacher_id, [SubmissionsImport.test], id=import_id
+    )
+
+
+@student_tests_router.get("/{test_id}/student-answers/", response_model=PageSchema[StudentTestAnswerOutputSchema])
+@expects_exceptions({InvalidCursorException: status.HTTP_400_BAD_REQUEST})
 async def get_student_test_answers_route(
+    test_id: UUID,
+    cursor: str | None = None,
+    page_size: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
+
+    return await get_student_answers_with_test_info(session=session, test=test, cursor=cursor, page_size=page_size)
+
+
+@student_tests_router.get("/{test_id}/student-answers/export/")
+async def export_student_test_answers_route(
+    test_id: UUID,
+    export_format: ResultsExportFormat = Query(ResultsExportFormat.csv, alias="format"),
+    student_group: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
+
+    media_types = {ResultsExportFormat.csv: "text/csv", ResultsExportFormat.ndjson: "application/x-ndjson"}
+    return StreamingResponse(
+        export_student_answers(test, export_format, student_group, created_from, created_to),
+        media_type=media_types[export_format],
+        headers={"Content-Disposition": f'attachment; filename="results-{test_id}.{export_format.value}"'},
+    )
+
+
+@student_tests_router.post("/{test_id}/student-answers/regrade/")
+async def regrade_student_test_answers_route(
     test_id: UUID, user: User = Depends(get_http_authenticated_user), session: AsyncSession = Depends(get_db_session)
 ):
-    test = await get_object_or_404(session, Test, id=test_id)
-    check_if_object_belongs_to_user(test.teacher, user)
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
 
-    return await get_student_answers_with_test_info(session=session, test=test)
+    await regrade_student_answers(session=session, test=test)
 
 
 @student_tests_router.get("/student-answers/{answer_id}/", response_model=StudentTestAnswerOutputSchema)
 async def get_student_test_answer_by_id_route(
     answer_id: UUID, user: User = Depends(get_http_authenticated_user), session: AsyncSession = Depends(get_db_session)
 ):
-    answer = await get_object_or_404(session, StudentTestAnswer, id=answer_id)
-    check_if_object_belongs_to_user(
-        await query_relationship(
-            session=session, instance=answer, relationship_attributes=[StudentTestAnswer.test, Test.teacher]
-        ),
-        user,
+    answer = await get_user_object_or_404(
+        session, StudentTestAnswer, user, Test.teacher_id, [StudentTestAnswer.test], id=answer_id
     )
 
     return await annotate_student_answer_with_test_info(session, answer)
@@ -292,19 +438,87 @@ async def update_student_test_answer_route(
     user: User = Depends(get_http_authenticated_user),
     session: AsyncSession = Depends(get_db_session),
 ):
-    answer = await get_object_or_404(session, StudentTestAnswer, id=answer_id)
-    check_if_object_belongs_to_user(
-        await query_relationship(
-            session=session, instance=answer, relationship_attributes=[StudentTestAnswer.test, Test.teacher]
-        ),
-        user,
+    answer = await get_user_object_or_404(
+        session, StudentTestAnswer, user, Test.teacher_id, [StudentTestAnswer.test], id=answer_id
     )
     await update_student_test_answer_score(session, answer, answer_data.score)
     return await annotate_student_answer_with_test_info(session, answer)
 
 
 @student_tests_router.get("/{test_id}/grid/")
-async def get_test_grid_route(test_id: UUID, session: AsyncSession = Depends(get_db_session)):
+@expects_exceptions({RenderingPoolBusyException: status.HTTP_503_SERVICE_UNAVAILABLE})
+async def get_test_grid_route(test_id: UUID, request: Request, session: AsyncSession = Depends(get_db_session)):
+    test_version = await get_published_test_version(test_id)
+    grid_pdf = None
+    if test_version is not None:
+        headers = get_conditional_request_headers(test_version.etag, test_version.updated_at)
+        if is_not_modified(request, test_version.etag, test_version.updated_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        grid_pdf = await get_cached_test_answers_grid(test_version)
+
+    if grid_pdf is None:
+        test = await get_object_or_404(session, Test, id=test_id)
+        test_version = get_test_version(test)
+        await publish_test_version(test_version)
+        headers = get_conditional_request_headers(test_version.etag, test_version.updated_at)
+        if is_not_modified(request, test_version.etag, test_version.updated_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        grid_pdf = await generate_test_answers_grid(session, test)
+
+    return Response(grid_pdf, media_type="application/pdf", headers=headers)
+
+
+@student_tests_router.post("/{test_id}/variants/", response_model=list[TestVariantOutputSchema])
+async def create_test_variants_route(
+    test_id: UUID,
+    variants_data: TestVariantsCreateSchema,
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
+
+    return await create_test_variants(session=session, test=test, variants_number=variants_data.variants_number)
+
+
+@student_tests_router.get("/{test_id}/variants/", response_model=list[TestVariantOutputSchema])
+async def get_test_variants_route(
+    test_id: UUID, user: User = Depends(get_http_authenticated_user), session: AsyncSession = Depends(get_db_session)
+):
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
+
+    return await query_relationship(session, test, [Test.variants])
+
+
+@student_tests_router.get("/{test_id}/variants/{variant_number}/grid/")
+@expects_exceptions({RenderingPoolBusyException: status.HTTP_503_SERVICE_UNAVAILABLE})
+async def get_test_variant_grid_route(
+    test_id: UUID, variant_number: int, request: Request, session: AsyncSession = Depends(get_db_session)
+):
     test = await get_object_or_404(session, Test, id=test_id)
-    grid_pdf = await generate_test_answers_grid(session, test)
-    return StreamingResponse(grid_pdf, media_type="application/pdf")
+    variant = await get_object_or_404(session, TestVariant, test_id=test_id, number=variant_number)
+    test_version = get_test_version(test)
+    etag = test_version.get_variant_etag(variant.id)
+    headers = get_conditional_request_headers(etag, test_version.updated_at)
+    if is_not_modified(request, etag, test_version.updated_at):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    grid_pdf = await generate_test_answers_grid(session, test, variant)
+    return Response(grid_pdf, media_type="application/pdf", headers=headers)
+
+
+@student_tests_router.post("/{test_id}/answer-sheets/")
+@expects_exceptions({RenderingPoolBusyException: status.HTTP_503_SERVICE_UNAVAILABLE})
+async def create_answer_sheets_route(
+    test_id: UUID,
+    answer_sheets_data: AnswerSheetsCreateSchema,
+    user: User = Depends(get_http_authenticated_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    test = await get_user_object_or_404(session, Test, user, Test.teacher_id, id=test_id)
+
+    answer_sheets = await generate_answer_sheets(session, test, answer_sheets_data.students)
+    return StreamingResponse(
+        answer_sheets,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="answer-sheets-{test_id}.pdf"'},
+    )
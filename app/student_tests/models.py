@@ -1,16 +1,24 @@
+from datetime import UTC, datetime
+
 from sqlalchemy import (
     UUID,
+    BigInteger,
     Boolean,
     Column,
+    DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
+    func,
 )
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
 
 from app.common.models import BaseDatabaseModel
 from app.common.utilities import get_user_model
+from app.student_tests.types import SubmissionsImportStatus
 
 User = get_user_model()
 
@@ -20,24 +28,52 @@ class Test(BaseDatabaseModel):
 
     teacher_id = Column(UUID, ForeignKey(User.id), nullable=False)
     name = Column(String, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False, server_default=func.now())
+    # Totals of the questions, kept in step by the services that create, update and delete questions.
+    max_score = Column(Integer, nullable=False, default=0, server_default="0")
+    questions_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     teacher = relationship(User, foreign_keys=[teacher_id], back_populates="tests")
     questions = relationship(
-        "Question", back_populates="test", cascade="all, delete-orphan", order_by="Question.position_number"
+        "Question",
+        back_populates="test",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="Question.position_number",
+    )
+    student_test_answers = relationship(
+        "StudentTestAnswer", back_populates="test", cascade="all, delete-orphan", passive_deletes=True
+    )
+    variants = relationship(
+        "TestVariant",
+        back_populates="test",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="TestVariant.number",
     )
-    student_test_answers = relationship("StudentTestAnswer", back_populates="test", cascade="all, delete-orphan")
+    submissions_imports = relationship(
+        "SubmissionsImport", back_populates="test", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+Index("ix_tests_teacher_id_created_at_id", Test.teacher_id, Test.created_at.desc(), Test.id.desc())
 
 
 class Question(BaseDatabaseModel):
     __tablename__ = "test_questions"
-    test_id = Column(UUID, ForeignKey(Test.id), nullable=False)
+    test_id = Column(UUID, ForeignKey(Test.id, ondelete="CASCADE"), nullable=False)
     content = Column(String, nullable=False)
     position_number = Column(Integer, nullable=False)
     points = Column(Integer, nullable=False)
 
     test = relationship(Test, foreign_keys=[test_id], back_populates="questions")
     answers = relationship(
-        "Answer", back_populates="question", cascade="all, delete-orphan", order_by="Answer.position_number"
+        "Answer",
+        back_populates="question",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="Answer.position_number",
     )
 
     __table_args__ = (UniqueConstraint("test_id", "position_number", name="uix_test_questions_test_id_number"),)
@@ -46,7 +82,7 @@ class Question(BaseDatabaseModel):
 class Answer(BaseDatabaseModel):
     __tablename__ = "test_answers"
 
-    question_id = Column(UUID, ForeignKey(Question.id), nullable=False)
+    question_id = Column(UUID, ForeignKey(Question.id, ondelete="CASCADE"), nullable=False)
     content = Column(String, nullable=False)
     is_correct = Column(Boolean, nullable=False)
     position_number = Column(Integer, nullable=False)
@@ -56,14 +92,68 @@ class Answer(BaseDatabaseModel):
     __table_args__ = (UniqueConstraint("question_id", "position_number", name="uix_test_answers_question_id_number"),)
 
 
+class TestVariant(BaseDatabaseModel):
+    """
+    A shuffled version of a test. The order of the questions and of their answers is drawn from the seed once,
+    when the variant is created, and stored by their ids, so that editing the test does not reorder a printed variant.
+    """
+
+    __tablename__ = "test_variants"
+
+    test_id = Column(UUID, ForeignKey(Test.id, ondelete="CASCADE"), nullable=False)
+    number = Column(Integer, nullable=False)
+    seed = Column(BigInteger, nullable=False)
+    questions_order = Column(JSONB, nullable=False)
+
+    test = relationship(Test, foreign_keys=[test_id], back_populates="variants")
+
+    __table_args__ = (UniqueConstraint("test_id", "number", name="uix_test_variants_test_id_number"),)
+
+
 # TODO Add celery task for cleaning answers after 1 month
 class StudentTestAnswer(BaseDatabaseModel):
     __tablename__ = "student_test_answers"
+    # Every photo is uploaded under its own key, so one photo is one submission.
+    __table_args__ = (UniqueConstraint("results_photo_url", name="uix_student_test_answers_results_photo_url"),)
 
-    test_id = Column(UUID, ForeignKey(Test.id), nullable=False)
+    test_id = Column(UUID, ForeignKey(Test.id, ondelete="CASCADE"), nullable=False)
     student_username = Column(String, nullable=False)
     results_photo_url = Column(String, nullable=False)
     score = Column(Integer, nullable=True)
+    # A score set by the teacher, which grading and regrading leave as it is.
+    is_score_manual = Column(Boolean, nullable=False, default=False, server_default="false")
     student_group = Column(String, nullable=False)
+    answers_masks = Column(ARRAY(BigInteger), nullable=True)
+    variant_id = Column(UUID, ForeignKey(TestVariant.id, ondelete="SET NULL"), nullable=True)
+    # A copy of the variant order, which the submission is scored with even after its variant is deleted.
+    variant_questions_order = Column(JSONB, nullable=True)
 
     test = relationship(Test, foreign_keys=[test_id], back_populates="student_test_answers")
+    variant = relationship(TestVariant, foreign_keys=[variant_id])
+
+
+Index(
+    "ix_student_test_answers_test_id_created_at_id",
+    StudentTestAnswer.test_id,
+    StudentTestAnswer.created_at.desc(),
+    StudentTestAnswer.id.desc(),
+)
+
+
+class SubmissionsImport(BaseDatabaseModel):
+    """
+    A job that splits an uploaded archive of results photos into submissions.
+    The pages counters are moved on by the worker batch by batch, so the teacher can poll the progress.
+    """
+
+    __tablename__ = "submissions_imports"
+
+    test_id = Column(UUID, ForeignKey(Test.id, ondelete="CASCADE"), nullable=False)
+    archive_url = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=SubmissionsImportStatus.pending.value)
+    pages_number = Column(Integer, nullable=True)
+    imported_pages_number = Column(Integer, nullable=False, default=0, server_default="0")
+    failed_pages_number = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(String, nullable=True)
+
+    test = relationship(Test, foreign_keys=[test_id], back_populates="submissions_imports")
@@ -2,7 +2,10 @@ from datetime import datetime
 from typing import Annotated
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, StringConstraints
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+
+from app.core.config import settings
+from app.student_tests.types import SubmissionsImportStatus
 
 
 class AnswerOutputSchema(BaseModel):
@@ -26,11 +29,22 @@ class TestOutputSchema(BaseModel):
     id: UUID
     name: str
     created_at: datetime
-    questions_count: int | None = None
+    questions_count: int
+    max_score: int
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class QuestionWithAnswersOutputSchema(QuestionOutputSchema):
+    answers: list[AnswerOutputSchema]
+
+
+class TestWithQuestionsOutputSchema(TestOutputSchema):
+    version: int
+    updated_at: datetime
+    questions: list[QuestionWithAnswersOutputSchema]
+
+
 class AnswerCreateSchema(BaseModel):
     content: Annotated[str, StringConstraints(min_length=1)]
     is_correct: bool
@@ -62,6 +76,39 @@ class AnswerUpdateSchema(BaseModel):
     is_correct: bool
 
 
+class QuestionBatchUpdateSchema(QuestionUpdateSchema):
+    id: UUID
+
+
+class AnswerBatchCreateSchema(AnswerCreateSchema):
+    question_id: UUID
+
+
+class AnswerBatchUpdateSchema(AnswerUpdateSchema):
+    id: UUID
+
+
+class AnswersOrderSchema(BaseModel):
+    question_id: UUID
+    answer_ids: list[UUID]
+
+
+class TestBatchEditSchema(BaseModel):
+    """
+    A diff of the test content. Created questions and answers go after the existing ones,
+    `question_ids` and `answers_orders` give the new order of the questions and answers that remain.
+    """
+
+    created_questions: list[QuestionCreateSchema] = []
+    updated_questions: list[QuestionBatchUpdateSchema] = []
+    deleted_question_ids: list[UUID] = []
+    created_answers: list[AnswerBatchCreateSchema] = []
+    updated_answers: list[AnswerBatchUpdateSchema] = []
+    deleted_answer_ids: list[UUID] = []
+    question_ids: list[UUID] | None = None
+    answers_orders: list[AnswersOrderSchema] = []
+
+
 class StudentTestAnswerOutputSchema(BaseModel):
     id: UUID
     test_id: UUID
@@ -72,11 +119,66 @@ class StudentTestAnswerOutputSchema(BaseModel):
     test_name: str
     max_score: int
     score: int | None
+    is_score_manual: bool
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class TestVariantOutputSchema(BaseModel):
+    id: UUID
+    number: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TestVariantsCreateSchema(BaseModel):
+    variants_number: Annotated[int, Field(ge=1, le=settings.test_variants_max_number)]
+
+
 class StudentTestAnswerUpdateSchema(BaseModel):
     score: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ResultsPhotoUploadInputSchema(BaseModel):
+    filename: Annotated[str, StringConstraints(min_length=1)]
+    content_type: Annotated[str, StringConstraints(pattern=r"^image/")]
+
+
+class ResultsPhotoUploadOutputSchema(BaseModel):
+    url: str
+    fields: dict[str, str]
+    key: str
+
+
+class StudentTestAnswerFinalizeSchema(BaseModel):
+    key: str
+    student_username: str
+    student_group: str
+    variant_number: int | None = None
+
+
+class AnswerSheetStudentSchema(BaseModel):
+    student_username: Annotated[str, StringConstraints(min_length=1)]
+    student_group: str
+
+
+class AnswerSheetsCreateSchema(BaseModel):
+    students: Annotated[
+        list[AnswerSheetStudentSchema], Field(min_length=1, max_length=settings.answer_sheets_max_students)
+    ]
+
+
+class SubmissionsImportOutputSchema(BaseModel):
+    id: UUID
+    test_id: UUID
+    created_at: datetime
+    status: SubmissionsImportStatus
+    pages_number: int | None
+    imported_pages_number: int
+    failed_pages_number: int
+    error: str | None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,24 +1,134 @@
+import asyncio
+import csv
+import hashlib
 import io
+import json
+import logging
+import random
+import secrets
+import tempfile
 from collections import defaultdict
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime
+from itertools import islice
+from pathlib import PurePosixPath
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import distinct, func, select
+import numpy as np
+from fastapi import UploadFile
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import (
+    Boolean,
+    ColumnElement,
+    Integer,
+    Row,
+    String,
+    Subquery,
+    Uuid,
+    cast,
+    delete,
+    distinct,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.types import TypeEngine
 
-from app.common.services.db import (
-    move_row_values_to_attributes,
-    query_relationship,
-    quick_select,
+from app.common.cache import (
+    LocalCache,
+    get_cached_value,
+    get_cached_versioned_value,
+    set_cached_value,
+    set_cached_versioned_value,
+)
+from app.common.constants import ARCHIVE_SIGNATURE_LENGTH
+from app.common.exceptions import UnsupportedArchiveException
+from app.common.pagination import get_page, paginate
+from app.common.services.archives import (
+    ArchivePage,
+    SubmissionsArchive,
+    get_archive_type,
+)
+from app.common.services.db import query_relationship, quick_select
+from app.common.services.pdf_writer import (
+    StreamingPDFWriter,
+    get_embedded_questions_font,
+)
+from app.common.services.rendering import render_answer_sheets, render_grid_pdf
+from app.common.storage import (
+    delete_test_results,
+    download_submissions_archive,
+    get_test_result_url,
+    is_test_result_uploaded,
+    upload_submissions_archive,
+    upload_test_result_page,
 )
-from app.common.services.pdf import create_grid_pdf
+from app.common.types import ArchiveType
 from app.common.utilities import get_user_model
-from app.student_tests.exceptions import DuplicateTestNameException
-from app.student_tests.models import Answer, Question, StudentTestAnswer, Test
-from app.student_tests.schemas import AnswerCreateSchema, QuestionCreateSchema
-from app.student_tests.tasks import grade_test
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.student_tests.constants import (
+    DELETED_TEST_VERSION_MARKER,
+    MAX_ANSWERS_PER_QUESTION,
+    RESULTS_EXPORT_COLUMNS,
+)
+from app.student_tests.exceptions import (
+    DuplicateTestNameException,
+    InvalidResultsPhotoKeyException,
+    InvalidStudentsListException,
+    InvalidTestItemsOrderException,
+    ResultsPhotoNotUploadedException,
+    TestItemsNotFoundException,
+    TestVariantNotFoundException,
+)
+from app.student_tests.models import (
+    Answer,
+    Question,
+    StudentTestAnswer,
+    SubmissionsImport,
+    Test,
+    TestVariant,
+)
+from app.student_tests.schemas import (
+    AnswerCreateSchema,
+    AnswerSheetStudentSchema,
+    QuestionCreateSchema,
+    TestBatchEditSchema,
+)
+from app.student_tests.tasks import (
+    delete_results_photos,
+    grade_test,
+    grade_tests,
+    import_submissions,
+    regrade_test,
+)
+from app.student_tests.types import (
+    AnswerKey,
+    ResultsExportFormat,
+    SubmissionsImportStatus,
+    TestVersion,
+    VariantPermutation,
+)
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+students_list_adapter = TypeAdapter(list[AnswerSheetStudentSchema])
+
+answer_keys_cache = LocalCache(
+    max_size=settings.answer_key_cache_size, ttl_in_seconds=settings.answer_key_cache_ttl_in_seconds
+)
+grid_pdfs_cache = LocalCache(
+    max_size=settings.grid_pdf_cache_size, ttl_in_seconds=settings.grid_pdf_cache_ttl_in_seconds
+)
+
 
 async def create_test(session: AsyncSession, teacher: User, name: str, questions: list[QuestionCreateSchema]) -> Test:
     teacher_test_with_same_name = (
@@ -26,21 +136,60 @@ async def create_test(session: AsyncSession, teacher: User, name: str, questions
     ).scalar()
     if teacher_test_with_same_name is not None:
         raise DuplicateTestNameException(name)
-    test = Test(teacher_id=teacher.id, name=name)
+    test = Test(
+        teacher_id=teacher.id,
+        name=name,
+        max_score=sum(question.points for question in questions),
+        questions_count=len(questions),
+    )
     session.add(test)
+    await session.flush()
+
+    await bulk_create_questions(session=session, test=test, questions=questions)
     await session.commit()
 
-    for index, question in enumerate(questions, start=1):
-        await create_question(
-            session=session,
-            test=test,
-            position_number=index,
-            content=question.content,
-            answers=question.answers,
-            points=question.points,
+    return test
+
+
+async def bulk_create_questions(
+    session: AsyncSession, test: Test, questions: list[QuestionCreateSchema], first_position_number: int = 1
+) -> list[Question]:
+    """
+    Insert the questions and all of their answers with one multi-row INSERT ... RETURNING per table.
+    The caller owns the transaction, so nothing is committed here, and keeps the test totals up to date.
+    """
+    if not questions:
+        return []
+
+    created_questions = (
+        await session.scalars(
+            insert(Question).returning(Question, sort_by_parameter_order=True),
+            [
+                {
+                    "test_id": test.id,
+                    "content": question.content,
+                    "points": question.points,
+                    "position_number": position_number,
+                }
+                for position_number, question in enumerate(questions, start=first_position_number)
+            ],
         )
+    ).all()
 
-    return test
+    answers_values = [
+        {
+            "question_id": created_question.id,
+            "content": answer.content,
+            "is_correct": answer.is_correct,
+            "position_number": position_number,
+        }
+        for created_question, question in zip(created_questions, questions)
+        for position_number, answer in enumerate(question.answers, start=1)
+    ]
+    if answers_values:
+        await session.execute(insert(Answer).returning(Answer.id, sort_by_parameter_order=True), answers_values)
+
+    return created_questions
 
 
 async def create_question(
@@ -56,20 +205,16 @@ async def create_question(
             len(await query_relationship(session=session, instance=test, relationship_attributes=[Test.questions])) + 1
         )
 
-    question = Question(test_id=test.id, content=content, position_number=position_number, points=points)
-    session.add(question)
+    (question,) = await bulk_create_questions(
+        session=session,
+        test=test,
+        questions=[QuestionCreateSchema(content=content, points=points, answers=answers)],
+        first_position_number=position_number,
+    )
+    test_version = await bump_test_version(session, test.id, max_score_change=points, questions_count_change=1)
     await session.commit()
-    await session.refresh(question)
-
-    for index, answer in enumerate(answers, start=1):
-        await create_answer(
-            session=session,
-            question=question,
-            position_number=index,
-            content=answer.content,
-            is_correct=answer.is_correct,
-        )
-
+    await publish_test_version(test_version)
+    regrade_test.delay(test.id)
     return question
 
 
@@ -81,24 +226,62 @@ async def create_answer(
 
     answer = Answer(question_id=question.id, content=content, is_correct=is_correct, position_number=position_number)
     session.add(answer)
+    test_version = await bump_test_version(session, question.test_id)
     await session.commit()
     await session.refresh(answer)
+    await publish_test_version(test_version)
+    regrade_test.delay(question.test_id)
     return answer
 
 
+async def lock_test(session: AsyncSession, test_id: UUID) -> None:
+    """
+    Lock the test row until the end of the transaction. Concurrent changes of the test content wait for each other,
+    and a submission can not be added to the test until the transaction ends, because its foreign key check waits.
+    """
+    await session.execute(select(Test.id).where(Test.id == test_id).with_for_update())
+
+
 async def delete_test(session: AsyncSession, test: Test) -> None:
-    await session.delete(test)
+    """
+    Delete the test with its submissions, which return their results photo URLs, and then the test itself,
+    whose questions, answers and variants go with it by the database cascades. The test is locked first,
+    so that no submission is added in between and removed by the cascade with its photo left in the bucket.
+    The results photos are removed from the bucket afterwards by a background job.
+    """
+    await lock_test(session, test.id)
+    results_photo_urls = (
+        await session.scalars(
+            delete(StudentTestAnswer)
+            .where(StudentTestAnswer.test_id == test.id)
+            .returning(StudentTestAnswer.results_photo_url)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    deleted_version = (await session.execute(delete(Test).where(Test.id == test.id).returning(Test.version))).scalar()
     await session.commit()
+    if deleted_version is not None:
+        await unpublish_test_version(test.id, deleted_version)
+    if results_photo_urls:
+        delete_results_photos.delay(list(results_photo_urls))
 
 
 async def delete_question(session: AsyncSession, question: Question) -> None:
     await session.delete(question)
+    test_version = await bump_test_version(
+        session, question.test_id, max_score_change=-question.points, questions_count_change=-1
+    )
     await session.commit()
+    await publish_test_version(test_version)
+    regrade_test.delay(question.test_id)
 
 
 async def delete_answer(session: AsyncSession, answer: Answer) -> None:
     await session.delete(answer)
+    test_version = await bump_test_version(session, get_answer_test_id(answer))
     await session.commit()
+    await publish_test_version(test_version)
+    regrade_test.delay(test_version.test_id)
 
 
 async def update_test(session: AsyncSession, test: Test, name: str, question_ids: list[UUID]) -> Test:
@@ -118,32 +301,268 @@ async def update_test(session: AsyncSession, test: Test, name: str, question_ids
             ids_to_questions[question_id].position_number = index
 
     test.name = name
+    test_version = await bump_test_version(session, test.id)
     await session.commit()
     await session.refresh(test)
+    await publish_test_version(test_version)
+    if question_ids:
+        regrade_test.delay(test.id)
     return test
 
 
 async def update_question(session: AsyncSession, question: Question, content: str, points: int) -> Question:
+    max_score_change = points - question.points
     question.points = points
     question.content = content
+    test_version = await bump_test_version(session, question.test_id, max_score_change=max_score_change)
     await session.commit()
     await session.refresh(question)
+    await publish_test_version(test_version)
+    regrade_test.delay(question.test_id)
     return question
 
 
 async def update_answer(session: AsyncSession, answer: Answer, content: str, is_correct: bool) -> Answer:
     answer.content = content
     answer.is_correct = is_correct
+    test_version = await bump_test_version(session, get_answer_test_id(answer))
     await session.commit()
     await session.refresh(answer)
+    await publish_test_version(test_version)
+    regrade_test.delay(test_version.test_id)
     return answer
 
 
+def unnest_values(**columns: tuple[list[Any], type[TypeEngine]]) -> Subquery:
+    """
+    Turn parallel lists of values into a table of rows, which lets one UPDATE ... FROM set a different value per row.
+    """
+    return select(
+        *(func.unnest(cast(values, ARRAY(column_type))).label(name) for name, (values, column_type) in columns.items())
+    ).subquery()
+
+
+async def renumber_positions(session: AsyncSession, model: type[Question | Answer], positions: dict[UUID, int]) -> None:
+    """
+    Move the rows to their new position numbers with two statements. The rows pass through negative numbers,
+    because the unique position constraints are checked row by row, and swapping two rows in place would collide.
+    """
+    if not positions:
+        return
+    new_positions = unnest_values(id=(list(positions), Uuid), position_number=(list(positions.values()), Integer))
+    await session.execute(
+        update(model)
+        .where(model.id == new_positions.c.id)
+        .values(position_number=-new_positions.c.position_number)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(
+        update(model)
+        .where(model.id.in_(list(positions)))
+        .values(position_number=-model.position_number)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_new_order(current_ids: list[UUID], new_ids: list[UUID] | None) -> list[UUID]:
+    if new_ids is None:
+        return current_ids
+    if len(new_ids) != len(current_ids) or set(new_ids) != set(current_ids):
+        raise InvalidTestItemsOrderException()
+    return new_ids
+
+
+async def edit_test_content(session: AsyncSession, test: Test, edit: TestBatchEditSchema) -> Test:
+    """
+    Apply a diff of the questions and answers in one transaction, with one bulk statement per kind of change,
+    and return the test with its new content. The remaining questions and answers are numbered without gaps.
+    The test is locked first, so that concurrent edits renumber the questions and answers one after another.
+    """
+    await lock_test(session, test.id)
+    rows = (
+        await session.execute(
+            select(Question.id, Question.points, Question.position_number, Answer.id, Answer.position_number)
+            .outerjoin(Question.answers)
+            .where(Question.test_id == test.id)
+            .order_by(Question.position_number, Answer.position_number)
+        )
+    ).all()
+    questions_points: dict[UUID, int] = {}
+    questions_positions: dict[UUID, int] = {}
+    questions_answer_ids: dict[UUID, list[UUID]] = {}
+    answers_positions: dict[UUID, int] = {}
+    for question_id, points, question_position, answer_id, answer_position in rows:
+        questions_points[question_id] = points
+        questions_positions[question_id] = question_position
+        questions_answer_ids.setdefault(question_id, [])
+        if answer_id is not None:
+            questions_answer_ids[question_id].append(answer_id)
+            answers_positions[answer_id] = answer_position
+    answers_questions = {
+        answer_id: question_id for question_id, answer_ids in questions_answer_ids.items() for answer_id in answer_ids
+    }
+
+    deleted_question_ids = set(edit.deleted_question_ids)
+    deleted_answer_ids = set(edit.deleted_answer_ids)
+    updated_questions = {question.id: question for question in edit.updated_questions}
+    updated_answers = {answer.id: answer for answer in edit.updated_answers}
+    answers_orders = {order.question_id: order.answer_ids for order in edit.answers_orders}
+    remaining_question_ids = [
+        question_id for question_id in questions_points if question_id not in deleted_question_ids
+    ]
+    unknown_ids = [
+        *(deleted_question_ids - questions_points.keys()),
+        *(deleted_answer_ids - answers_questions.keys()),
+        *(updated_questions.keys() - set(remaining_question_ids)),
+        *(
+            answer_id
+            for answer_id in updated_answers
+            if answer_id in deleted_answer_ids or answers_questions.get(answer_id) not in remaining_question_ids
+        ),
+        *{answer.question_id for answer in edit.created_answers} - set(remaining_question_ids),
+        *(answers_orders.keys() - set(remaining_question_ids)),
+    ]
+    if unknown_ids:
+        raise TestItemsNotFoundException(unknown_ids)
+
+    questions_order = get_new_order(remaining_question_ids, edit.question_ids)
+    new_questions_positions = {
+        question_id: position_number
+        for position_number, question_id in enumerate(questions_order, start=1)
+        if questions_positions[question_id] != position_number
+    }
+    new_answers_positions = {}
+    next_answers_positions = {}
+    for question_id in remaining_question_ids:
+        answers_order = get_new_order(
+            [answer_id for answer_id in questions_answer_ids[question_id] if answer_id not in deleted_answer_ids],
+            answers_orders.get(question_id),
+        )
+        new_answers_positions.update(
+            {
+                answer_id: position_number
+                for position_number, answer_id in enumerate(answers_order, start=1)
+                if answers_positions[answer_id] != position_number
+            }
+        )
+        next_answers_positions[question_id] = len(answers_order) + 1
+    created_answers_values = []
+    for answer in edit.created_answers:
+        created_answers_values.append(
+            {
+                "question_id": answer.question_id,
+                "content": answer.content,
+                "is_correct": answer.is_correct,
+                "position_number": next_answers_positions[answer.question_id],
+            }
+        )
+        next_answers_positions[answer.question_id] += 1
+
+    if not any(
+        (
+            deleted_question_ids,
+            deleted_answer_ids,
+            new_questions_positions,
+            new_answers_positions,
+            updated_questions,
+            updated_answers,
+            edit.created_questions,
+            created_answers_values,
+        )
+    ):
+        return await get_test_with_questions(session, test.id)
+
+    if deleted_answer_ids:
+        await session.execute(
+            delete(Answer).where(Answer.id.in_(deleted_answer_ids)).execution_options(synchronize_session=False)
+        )
+    if deleted_question_ids:
+        await session.execute(
+            delete(Question).where(Question.id.in_(deleted_question_ids)).execution_options(synchronize_session=False)
+        )
+    await renumber_positions(session, Question, new_questions_positions)
+    await renumber_positions(session, Answer, new_answers_positions)
+    if updated_questions:
+        new_questions = unnest_values(
+            id=(list(updated_questions), Uuid),
+            content=([question.content for question in updated_questions.values()], String),
+            points=([question.points for question in updated_questions.values()], Integer),
+        )
+        await session.execute(
+            update(Question)
+            .where(Question.id == new_questions.c.id)
+            .values(content=new_questions.c.content, points=new_questions.c.points)
+            .execution_options(synchronize_session=False)
+        )
+    if updated_answers:
+        new_answers = unnest_values(
+            id=(list(updated_answers), Uuid),
+            content=([answer.content for answer in updated_answers.values()], String),
+            is_correct=([answer.is_correct for answer in updated_answers.values()], Boolean),
+        )
+        await session.execute(
+            update(Answer)
+            .where(Answer.id == new_answers.c.id)
+            .values(content=new_answers.c.content, is_correct=new_answers.c.is_correct)
+            .execution_options(synchronize_session=False)
+        )
+    await bulk_create_questions(
+        session=session, test=test, questions=edit.created_questions, first_position_number=len(questions_order) + 1
+    )
+    if created_answers_values:
+        await session.execute(insert(Answer).returning(Answer.id, sort_by_parameter_order=True), created_answers_values)
+
+    max_score_change = (
+        sum(question.points for question in edit.created_questions)
+        + sum(question.points - questions_points[question.id] for question in updated_questions.values())
+        - sum(questions_points[question_id] for question_id in deleted_question_ids)
+    )
+    test_version = await bump_test_version(
+        session,
+        test.id,
+        max_score_change=max_score_change,
+        questions_count_change=len(edit.created_questions) - len(deleted_question_ids),
+    )
+    await session.commit()
+    await publish_test_version(test_version)
+    regrade_test.delay(test.id)
+    return await get_test_with_questions(session, test.id)
+
+
+async def get_test_with_questions(session: AsyncSession, test_id: UUID) -> Test:
+    query = (
+        select(Test)
+        .options(selectinload(Test.questions).selectinload(Question.answers))
+        .where(Test.id == test_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await session.scalars(query)).one()
+
+
 async def create_student_answer(
-    session: AsyncSession, test: Test, student_username: str, results_url: str, student_group: str
+    session: AsyncSession,
+    test: Test,
+    student_username: str,
+    results_url: str,
+    student_group: str,
+    variant_number: int | None = None,
 ) -> StudentTestAnswer:
+    variant_id = None
+    variant_questions_order = None
+    if variant_number is not None:
+        variant = await get_test_variant(session, test, variant_number)
+        if variant is None:
+            raise TestVariantNotFoundException(variant_number)
+        variant_id = variant.id
+        variant_questions_order = variant.questions_order
+
     answer = StudentTestAnswer(
-        test_id=test.id, student_username=student_username, results_photo_url=results_url, student_group=student_group
+        test_id=test.id,
+        student_username=student_username,
+        results_photo_url=results_url,
+        student_group=student_group,
+        variant_id=variant_id,
+        variant_questions_order=variant_questions_order,
     )
     session.add(answer)
     await session.commit()
@@ -152,129 +571,730 @@ async def create_student_answer(
     return answer
 
 
+async def get_student_answer_by_results_url(
+    session: AsyncSession, test_id: UUID, results_url: str
+) -> StudentTestAnswer | None:
+    query = select(StudentTestAnswer).where(
+        StudentTestAnswer.test_id == test_id, StudentTestAnswer.results_photo_url == results_url
+    )
+    return (await session.scalars(query)).one_or_none()
+
+
+async def finalize_student_answer(
+    session: AsyncSession,
+    test: Test,
+    key: str,
+    student_username: str,
+    student_group: str,
+    variant_number: int | None = None,
+) -> StudentTestAnswer:
+    """
+    Record a submission whose results photo was uploaded straight to the bucket with a presigned form.
+    Every form has its own key, so a finalize that is retried, or sent twice at once, returns the submission
+    recorded by the first one instead of grading the photo again.
+    """
+    if not key.startswith(f"{test.id}/"):
+        raise InvalidResultsPhotoKeyException(key)
+    test_id = test.id
+    results_url = get_test_result_url(key)
+    answer = await get_student_answer_by_results_url(session, test_id, results_url)
+    if answer is not None:
+        return answer
+    if not await is_test_result_uploaded(key):
+        raise ResultsPhotoNotUploadedException(key)
+
+    try:
+        return await create_student_answer(
+            session=session,
+            test=test,
+            student_username=student_username,
+            results_url=results_url,
+            student_group=student_group,
+            variant_number=variant_number,
+        )
+    except IntegrityError:
+        # The rollback expires the test, so its id is kept from before.
+        await session.rollback()
+        answer = await get_student_answer_by_results_url(session, test_id, results_url)
+        if answer is None:
+            raise
+        return answer
+
+
+async def create_submissions_import(
+    session: AsyncSession, test: Test, archive: UploadFile, student_group: str, students: str | None
+) -> SubmissionsImport:
+    """
+    Stream the archive to the bucket and enqueue its import, the pages are split and graded by the worker.
+    A zip names the students by its entries, `[group/]username.jpg`, the group falling back to `student_group`.
+    A scanned PDF has a page per student in the order of `students`, a JSON list of usernames and groups.
+    """
+    archive_type = get_archive_type(await archive.read(ARCHIVE_SIGNATURE_LENGTH))
+    await archive.seek(0)
+    if archive_type is None:
+        raise UnsupportedArchiveException()
+
+    students_list = []
+    if students is not None:
+        try:
+            students_list = students_list_adapter.validate_json(students)
+        except ValidationError:
+            raise InvalidStudentsListException()
+    if archive_type == ArchiveType.pdf and not students_list:
+        raise InvalidStudentsListException()
+
+    submissions_import = SubmissionsImport(
+        test_id=test.id, archive_url=await upload_submissions_archive(test.id, archive)
+    )
+    session.add(submissions_import)
+    await session.commit()
+    import_submissions.delay(submissions_import.id, student_group, [student.model_dump() for student in students_list])
+    return submissions_import
+
+
+def get_archive_page_student(
+    page: ArchivePage, student_group: str, students: list[AnswerSheetStudentSchema]
+) -> tuple[str, str] | None:
+    if page.name is None:
+        if page.number > len(students):
+            return None
+        student = students[page.number - 1]
+        return student.student_username, student.student_group
+
+    path = PurePosixPath(page.name)
+    return path.stem, path.parent.name or student_group
+
+
+async def import_submissions_batch(
+    session: AsyncSession,
+    submissions_import: SubmissionsImport,
+    pages: list[ArchivePage],
+    student_group: str,
+    students: list[AnswerSheetStudentSchema],
+) -> None:
+    """
+    Upload the photos of the pages concurrently, insert their submissions with one statement
+    and enqueue their grading as one task. Pages without a photo or a student are counted as failed.
+    """
+    pages_students = [
+        (page, student)
+        for page in pages
+        if page.data is not None and (student := get_archive_page_student(page, student_group, students)) is not None
+    ]
+    results_urls = await asyncio.gather(
+        *(
+            upload_test_result_page(submissions_import.test_id, page.filename, page.data, page.content_type)
+            for page, _ in pages_students
+        ),
+        return_exceptions=True,
+    )
+
+    answers_values = []
+    for (page, (student_username, page_student_group)), results_url in zip(pages_students, results_urls):
+        if isinstance(results_url, Exception):
+            logger.error(
+                f"Could not upload the page {page.number} of the import {submissions_import.id}: {results_url!r}."
+            )
+            continue
+        answers_values.append(
+            {
+                "test_id": submissions_import.test_id,
+                "student_username": student_username,
+                "student_group": page_student_group,
+                "results_photo_url": results_url,
+            }
+        )
+
+    answer_ids = []
+    if answers_values:
+        answer_ids = (
+            await session.scalars(
+                insert(StudentTestAnswer).returning(StudentTestAnswer.id, sort_by_parameter_order=True), answers_values
+            )
+        ).all()
+    await session.execute(
+        update(SubmissionsImport)
+        .where(SubmissionsImport.id == submissions_import.id)
+        .values(
+            imported_pages_number=SubmissionsImport.imported_pages_number + len(answer_ids),
+            failed_pages_number=SubmissionsImport.failed_pages_number + len(pages) - len(answer_ids),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    if answer_ids:
+        grade_tests.delay(submissions_import.test_id, answer_ids)
+
+
+async def import_submissions_archive(
+    session: AsyncSession,
+    submissions_import: SubmissionsImport,
+    student_group: str,
+    students: list[AnswerSheetStudentSchema],
+) -> None:
+    """
+    Split the archive into submissions in batches, so that only one batch of pages is held in memory
+    and the teacher sees the progress of the import while it runs.
+    The archive is spooled to a temporary file, because zip and PDF readers need to seek.
+    """
+    import_id = submissions_import.id
+    archive_url = submissions_import.archive_url
+    try:
+        with tempfile.TemporaryFile() as archive_file:
+            await asyncio.to_thread(download_submissions_archive, archive_url, archive_file)
+            archive_file.seek(0)
+            archive = await asyncio.to_thread(SubmissionsArchive, archive_file)
+            submissions_import.status = SubmissionsImportStatus.running.value
+            submissions_import.pages_number = archive.pages_number
+            await session.commit()
+
+            pages = archive.iterate_pages()
+            while batch := await asyncio.to_thread(list, islice(pages, settings.submissions_import_batch_size)):
+                await import_submissions_batch(session, submissions_import, batch, student_group, students)
+        status_values = {"status": SubmissionsImportStatus.completed.value}
+    except Exception as error:
+        logger.exception(f"Could not import the submissions archive of the import {import_id}.")
+        await session.rollback()
+        status_values = {"status": SubmissionsImportStatus.failed.value, "error": str(error)}
+    finally:
+        await asyncio.to_thread(delete_test_results, [archive_url])
+
+    await session.execute(
+        update(SubmissionsImport)
+        .where(SubmissionsImport.id == import_id)
+        .values(**status_values)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+def shuffle_test_order(seed: int, test_order: list[tuple[str, list[str]]]) -> list[tuple[str, list[str]]]:
+    """
+    Shuffle the questions and the answers of every question, given as pairs of the question id and its answer ids
+    in the test order. The same seed and test always give the same order.
+    """
+    generator = random.Random(seed)
+    shuffled_questions = generator.sample(test_order, len(test_order))
+    return [
+        (question_id, generator.sample(answers_ids, len(answers_ids)))
+        for question_id, answers_ids in shuffled_questions
+    ]
+
+
+async def create_test_variants(session: AsyncSession, test: Test, variants_number: int) -> list[TestVariant]:
+    """
+    Add shuffled variants to the test, numbered after the existing ones.
+    """
+    last_number = (
+        await session.execute(
+            select(func.coalesce(func.max(TestVariant.number), 0)).where(TestVariant.test_id == test.id)
+        )
+    ).scalar()
+    test_answers_positions = await get_test_answers_positions(session, test)
+    test_order = [
+        (question_id, list(answers_positions)) for question_id, (_, answers_positions) in test_answers_positions.items()
+    ]
+    variants = []
+    for number in range(last_number + 1, last_number + variants_number + 1):
+        seed = secrets.randbits(63)
+        variants.append(
+            TestVariant(test_id=test.id, number=number, seed=seed, questions_order=shuffle_test_order(seed, test_order))
+        )
+    session.add_all(variants)
+    await session.commit()
+    return variants
+
+
+async def get_test_variant(session: AsyncSession, test: Test, number: int) -> TestVariant | None:
+    return (await quick_select(session, TestVariant, filter_by={"test_id": test.id, "number": number})).scalar()
+
+
+async def get_test_answers_positions(session: AsyncSession, test: Test) -> dict[str, tuple[int, dict[str, int]]]:
+    """
+    Return the position of every test question by its id in the test order, paired with the positions of its answers
+    by their ids.
+    """
+    query = (
+        select(Question.id, Question.position_number, Answer.id, Answer.position_number)
+        .select_from(Question)
+        .outerjoin(Answer)
+        .where(Question.test_id == test.id)
+        .order_by(Question.position_number, Answer.position_number)
+    )
+    answers_positions = {}
+    for question_id, question_position, answer_id, answer_position in await session.execute(query):
+        _, question_answers_positions = answers_positions.setdefault(str(question_id), (question_position, {}))
+        if answer_id is not None:
+            question_answers_positions[str(answer_id)] = answer_position
+    return answers_positions
+
+
 async def get_student_answers_with_test_info(
-    session: AsyncSession, test: Test
-) -> list[dict[StudentTestAnswer, str, str]]:
+    session: AsyncSession, test: Test, cursor: str | None, page_size: int
+) -> dict[str, Any]:
+    """
+    Return a page of the test submissions, newest first, annotated with the test name and the maximum score.
+    """
+    query = paginate(
+        select(StudentTestAnswer).where(StudentTestAnswer.test_id == test.id), StudentTestAnswer, cursor, page_size
+    )
+    student_answers = (await session.scalars(query)).all()
+    for student_answer in student_answers:
+        student_answer.test_name = test.name
+        student_answer.max_score = test.max_score
+    return get_page(student_answers, page_size)
+
+
+def encode_results_rows(rows: Sequence[Row], export_format: ResultsExportFormat, max_score: int) -> bytes:
+    records = [
+        (str(answer_id), created_at.isoformat(), username, group, variant_number, score, max_score, photo_url)
+        for answer_id, created_at, username, group, variant_number, score, photo_url in rows
+    ]
+    if export_format == ResultsExportFormat.csv:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(records)
+        return buffer.getvalue().encode()
+    return "".join(
+        json.dumps(dict(zip(RESULTS_EXPORT_COLUMNS, record)), ensure_ascii=False) + "\n" for record in records
+    ).encode()
+
+
+def export_student_answers(
+    test: Test,
+    export_format: ResultsExportFormat,
+    student_group: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream the test submissions, oldest first, as CSV or NDJSON in batches read through a server-side cursor,
+    so that the memory use does not depend on the number of submissions.
+    The rows are read as plain columns by a session of the stream itself, because the request session
+    is closed before a streamed response body is sent.
+    """
     query = (
         select(
-            StudentTestAnswer,
-            Test.name.label("test_name"),
-            func.coalesce(func.sum(Question.points).label("max_points"), 0),
-        )
-        .select_from(StudentTestAnswer)
-        .join(Test)
-        .outerjoin(Question)
-        .where(StudentTestAnswer.test_id == test.id)
-        .group_by(
             StudentTestAnswer.id,
-            Test.name,
+            StudentTestAnswer.created_at,
+            StudentTestAnswer.student_username,
+            StudentTestAnswer.student_group,
+            TestVariant.number,
+            StudentTestAnswer.score,
+            StudentTestAnswer.results_photo_url,
         )
-        .order_by(StudentTestAnswer.created_at.desc())
+        .outerjoin(TestVariant, StudentTestAnswer.variant_id == TestVariant.id)
+        .where(StudentTestAnswer.test_id == test.id)
+        .order_by(StudentTestAnswer.created_at, StudentTestAnswer.id)
+        .execution_options(yield_per=settings.results_export_batch_size)
     )
+    if student_group is not None:
+        query = query.where(StudentTestAnswer.student_group == student_group)
+    if created_from is not None:
+        query = query.where(StudentTestAnswer.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(StudentTestAnswer.created_at < created_to)
+    max_score = test.max_score
 
-    return move_row_values_to_attributes(
-        await session.execute(query),
-        (
-            "test_name",
-            "max_score",
-        ),
-    )
+    async def stream_results() -> AsyncIterator[bytes]:
+        if export_format == ResultsExportFormat.csv:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(RESULTS_EXPORT_COLUMNS)
+            yield buffer.getvalue().encode()
+        async with SessionLocal() as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield encode_results_rows(rows, export_format, max_score)
+
+    return stream_results()
 
 
 async def annotate_student_answer_with_test_info(
     session: AsyncSession, student_answer: StudentTestAnswer
 ) -> StudentTestAnswer:
+    query = select(Test.name, Test.max_score).where(Test.id == student_answer.test_id)
+    student_answer.test_name, student_answer.max_score = (await session.execute(query)).one()
+    return student_answer
+
+
+async def bump_test_version(
+    session: AsyncSession,
+    test_id: UUID | ColumnElement[UUID],
+    max_score_change: int = 0,
+    questions_count_change: int = 0,
+) -> TestVersion:
+    """
+    Mark the test content as changed, which makes every cached artifact of the previous version stale.
+    Must be called inside the transaction that changes the test, its questions or its answers,
+    and the returned version must be published with `publish_test_version` after the commit.
+    Changes of the questions points and count are applied to the test totals by the same statement.
+    """
     query = (
-        select(
-            StudentTestAnswer,
-            Test.name.label("test_name"),
-            func.coalesce(func.sum(Question.points).label("max_points"), 0),
-        )
-        .select_from(StudentTestAnswer)
-        .join(Test)
-        .outerjoin(Question)
-        .where(StudentTestAnswer.id == student_answer.id)
-        .group_by(
-            StudentTestAnswer.id,
-            Test.name,
+        update(Test)
+        .where(Test.id == test_id)
+        .values(
+            version=Test.version + 1,
+            updated_at=datetime.now(UTC),
+            max_score=Test.max_score + max_score_change,
+            questions_count=Test.questions_count + questions_count_change,
         )
+        .returning(Test.id, Test.version, Test.updated_at)
     )
+    return TestVersion(*(await session.execute(query)).one())
+
+
+def get_test_version(test: Test) -> TestVersion:
+    return TestVersion(test_id=test.id, version=test.version, updated_at=test.updated_at)
+
+
+def get_test_version_cache_key(test_id: UUID) -> str:
+    return f"test-version:{test_id}"
+
+
+async def publish_test_version(test_version: TestVersion) -> None:
+    await set_cached_versioned_value(
+        get_test_version_cache_key(test_version.test_id),
+        test_version.version,
+        test_version.updated_at.isoformat(),
+        settings.test_version_cache_ttl_in_seconds,
+    )
+
+
+async def unpublish_test_version(test_id: UUID, deleted_version: int) -> None:
+    """
+    Publish a deleted marker above the last version of a deleted test instead of removing the version.
+    A request that read the test before it was deleted can then not publish it again and serve its cached grid.
+    """
+    await set_cached_versioned_value(
+        get_test_version_cache_key(test_id),
+        deleted_version + 1,
+        DELETED_TEST_VERSION_MARKER,
+        settings.test_version_cache_ttl_in_seconds,
+    )
+
+
+async def get_published_test_version(test_id: UUID) -> TestVersion | None:
+    """
+    Return the latest test version known to Redis, which lets the test artifacts be served without the database.
+    """
+    cached_version = await get_cached_versioned_value(get_test_version_cache_key(test_id))
+    if cached_version is None:
+        return None
+    version, updated_at = cached_version
+    if updated_at == DELETED_TEST_VERSION_MARKER.encode():
+        return None
+    return TestVersion(test_id=test_id, version=version, updated_at=datetime.fromisoformat(updated_at.decode()))
 
-    stmt = await session.execute(query)
-    result = stmt.first()
-    answer, test_name, max_points = result
-    student_answer.test_name = test_name
-    student_answer.max_score = max_points
-    return student_answer
 
+def get_answer_test_id(answer: Answer) -> ColumnElement[UUID]:
+    return select(Question.test_id).where(Question.id == answer.question_id).scalar_subquery()
 
-async def calculate_score_by_answers_grid(session: AsyncSession, grid: dict[int, list[int]], test: Test) -> int:
+
+async def compile_answer_key(session: AsyncSession, test: Test) -> AnswerKey:
     answers_query = (
-        select(Answer, Question)
+        select(Question.position_number, Question.points, Answer.position_number)
         .select_from(Answer)
         .join(Question)
         .where(Question.test_id == test.id, Answer.is_correct.is_(True))
     )
 
-    results = list(await session.execute(answers_query))
-    question_position_to_question = {question.position_number: question for _, question in results}
-    correct_answers = defaultdict(list)
-    for answer, question in results:
-        correct_answers[question.position_number].append(answer.position_number)
+    correct_answers = defaultdict(set)
+    points = {}
+    for question_number, question_points, answer_number in await session.execute(answers_query):
+        correct_answers[question_number].add(answer_number)
+        points[question_number] = question_points
+
+    return AnswerKey(
+        test_id=test.id,
+        version=test.version,
+        correct_answers={number: frozenset(answers) for number, answers in correct_answers.items()},
+        points=points,
+    )
+
+
+async def compile_variant_answer_key(
+    session: AsyncSession, test: Test, variant_questions_order: list[list]
+) -> AnswerKey:
+    permutation = VariantPermutation.from_variant_order(
+        variant_questions_order, await get_test_answers_positions(session, test)
+    )
+    return (await get_answer_key(session, test)).permute(permutation)
+
+
+def get_answer_key_cache_key(test: Test, variant_questions_order: list[list] | None = None) -> str:
+    """
+    A variant key is cached by a digest of the variant order rather than by the variant number,
+    which a new variant takes over when the last one is deleted.
+    """
+    cache_key = f"answer-key:{test.id}:{test.version}"
+    if variant_questions_order is not None:
+        cache_key += f":{hashlib.sha256(json.dumps(variant_questions_order).encode()).hexdigest()[:16]}"
+    return cache_key
+
+
+async def get_answer_key(
+    session: AsyncSession, test: Test, variant_questions_order: list[list] | None = None
+) -> AnswerKey:
+    """
+    Get the compiled answer key of the current test version from the process cache, then Redis, then the database.
+    The key of a variant is the test key permuted once into the variant order, so that its grids are scored as fast.
+    """
+    cache_key = get_answer_key_cache_key(test, variant_questions_order)
+    answer_key = answer_keys_cache.get(cache_key)
+    if answer_key is not None:
+        return answer_key
+
+    cached_answer_key = await get_cached_value(cache_key)
+    if cached_answer_key is not None:
+        answer_key = AnswerKey.from_json(test.id, test.version, cached_answer_key)
+    elif variant_questions_order is not None:
+        answer_key = await compile_variant_answer_key(session, test, variant_questions_order)
+        await set_cached_value(cache_key, answer_key.to_json(), settings.answer_key_cache_ttl_in_seconds)
+    else:
+        answer_key = await compile_answer_key(session, test)
+        await set_cached_value(cache_key, answer_key.to_json(), settings.answer_key_cache_ttl_in_seconds)
+
+    answer_keys_cache.set(cache_key, answer_key)
+    return answer_key
+
+
+async def calculate_score_by_answers_grid(
+    session: AsyncSession, grid: dict[int, list[int]], test: Test, variant_questions_order: list[list] | None = None
+) -> int:
+    return (await get_answer_key(session, test, variant_questions_order)).score(grid)
 
-    score = 0
+
+def encode_answers_mask(answers: list[int] | frozenset[int]) -> int:
+    """
+    Encode answer positions as a bitmask, where answer position 1 is the lowest bit.
+    """
+    mask = 0
+    for answer_number in answers:
+        if 1 <= answer_number <= MAX_ANSWERS_PER_QUESTION:
+            mask |= 1 << (answer_number - 1)
+    return mask
+
+
+def encode_answers_grid(grid: dict[int, list[int]]) -> list[int]:
+    """
+    Encode an answers grid as a list of answer bitmasks, where the item at index 0 belongs to question 1.
+    """
+    answers_masks = [0] * max(grid, default=0)
     for question_number, answers in grid.items():
-        if correct_answers[question_number] == answers:
-            question = question_position_to_question.get(question_number)
-            score += question and question.points or 0
+        if question_number >= 1:
+            answers_masks[question_number - 1] = encode_answers_mask(answers)
+    return answers_masks
+
+
+def score_answers_masks(answer_key: AnswerKey, answers_masks: list[list[int]]) -> np.ndarray:
+    """
+    Score the encoded answers grids of many submissions of one test in one vectorized pass.
+    The result is the same as calling `AnswerKey.score` for every submission.
+    """
+    questions_number = max(answer_key.points, default=0)
+    key_masks = np.zeros(questions_number, dtype=np.int64)
+    points = np.zeros(questions_number, dtype=np.int64)
+    for question_number, answers in answer_key.correct_answers.items():
+        key_masks[question_number - 1] = encode_answers_mask(answers)
+        points[question_number - 1] = answer_key.points[question_number]
+
+    submissions_masks = np.zeros((len(answers_masks), questions_number), dtype=np.int64)
+    for row_index, masks in enumerate(answers_masks):
+        masks = masks[:questions_number]
+        submissions_masks[row_index, : len(masks)] = masks
+
+    return (submissions_masks == key_masks) @ points
 
-    return score
 
+async def regrade_student_answers(session: AsyncSession, test: Test) -> None:
+    """
+    Recompute the scores of all graded submissions of the test from their stored answers grids in one UPDATE.
+    The scores set by the teacher are kept.
+    The grids are stored as printed, so the submissions of every variant are scored with the variant key,
+    which is compiled from the variant order copied to the submission, whether the variant still exists or not.
+    """
+    stored_masks = (
+        await session.execute(
+            select(
+                StudentTestAnswer.id, StudentTestAnswer.variant_questions_order, StudentTestAnswer.answers_masks
+            ).where(
+                StudentTestAnswer.test_id == test.id,
+                StudentTestAnswer.answers_masks.is_not(None),
+                StudentTestAnswer.is_score_manual.is_(False),
+            )
+        )
+    ).all()
+    if not stored_masks:
+        return
+
+    variants_orders = {}
+    variants_masks = defaultdict(list)
+    for answer_id, variant_questions_order, answers_masks in stored_masks:
+        variant_order_key = json.dumps(variant_questions_order)
+        variants_orders[variant_order_key] = variant_questions_order
+        variants_masks[variant_order_key].append((answer_id, answers_masks))
+
+    answer_ids = []
+    scores = []
+    for variant_order_key, variant_masks in variants_masks.items():
+        answer_key = await get_answer_key(session, test, variants_orders[variant_order_key])
+        variant_answer_ids, answers_masks = zip(*variant_masks)
+        answer_ids.extend(variant_answer_ids)
+        scores.extend(score_answers_masks(answer_key, answers_masks).tolist())
+
+    new_scores = unnest_values(id=(list(answer_ids), Uuid), score=(scores, Integer))
+    await session.execute(
+        update(StudentTestAnswer)
+        .where(StudentTestAnswer.id == new_scores.c.id)
+        .values(score=new_scores.c.score)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
 
-async def generate_test_answers_grid(session: AsyncSession, test: Test) -> io.BytesIO:
+
+async def get_test_grid_dimensions(session: AsyncSession, test: Test) -> tuple[int, int]:
+    """
+    Return the number of rows (questions) and columns (the largest number of answers) of the test answers grid.
+    """
     subquery = (
         select(func.count(Answer.id)).where(Answer.question_id == Question.id).correlate(Question).scalar_subquery()
     )
 
     query = (
         select(func.count(distinct(Question.id)), func.max(subquery))
-        .select_from(Answer)
-        .join(Question)
+        .select_from(Question)
+        .outerjoin(Answer)
         .where(Question.test_id == test.id)
     )
     result = await session.execute(query)
-    max_answer_position, question_count = result.first()
-    return await create_grid_pdf(
-        session,
-        question_count or 0,
-        max_answer_position or 0,
-        await query_relationship(session, test, [Test.questions]),
+    question_count, max_answer_position = result.first()
+    return question_count or 0, max_answer_position or 0
+
+
+async def get_test_questions_with_answers(session: AsyncSession, test: Test) -> list[Question]:
+    query = (
+        select(Question)
+        .options(joinedload(Question.answers))
+        .where(Question.test_id == test.id)
+        .order_by(Question.position_number)
     )
+    return list((await session.scalars(query)).unique())
 
 
-async def annotate_tests_with_questions_count(session: AsyncSession, tests: list[Test]) -> list[Test]:
-    if not tests:
-        return []
+def get_test_answers_grid_cache_key(test_version: TestVersion, variant_id: UUID | None = None) -> str:
+    cache_key = f"grid-pdf:{test_version.test_id}:{test_version.version}"
+    if variant_id is not None:
+        cache_key += f":{variant_id}"
+    return cache_key
 
-    test_ids = [test.id for test in tests]
-    query = (
-        select(
-            Test,
-            func.count(Question.id).label("questions_count"),
-        )
-        .select_from(Test)
-        .join(Question)
-        .where(Test.id.in_(test_ids))
-        .group_by(Test.id)
+
+async def get_cached_test_answers_grid(test_version: TestVersion, variant_id: UUID | None = None) -> bytes | None:
+    cache_key = get_test_answers_grid_cache_key(test_version, variant_id)
+    grid_pdf = grid_pdfs_cache.get(cache_key)
+    if grid_pdf is None:
+        grid_pdf = await get_cached_value(cache_key)
+        if grid_pdf is not None:
+            grid_pdfs_cache.set(cache_key, grid_pdf)
+    return grid_pdf
+
+
+def get_variant_questions_contents(variant: TestVariant, test_questions: list[Question]) -> list[tuple[str, list[str]]]:
+    """
+    Return the contents of the test questions, with their answers loaded, and of their answers in the variant order.
+    """
+    permutation = VariantPermutation.from_variant_order(
+        variant.questions_order,
+        {
+            str(question.id): (
+                question.position_number,
+                {str(answer.id): answer.position_number for answer in question.answers},
+            )
+            for question in test_questions
+        },
     )
+    positions_to_questions = {question.position_number: question for question in test_questions}
+    questions = []
+    for question_position, answers_positions in zip(permutation.questions_positions, permutation.answers_positions):
+        question = positions_to_questions[question_position]
+        positions_to_answers = {answer.position_number: answer for answer in question.answers}
+        questions.append((question.content, [positions_to_answers[position].content for position in answers_positions]))
+    return questions
+
+
+async def generate_test_answers_grid(session: AsyncSession, test: Test, variant: TestVariant | None = None) -> bytes:
+    test_version = get_test_version(test)
+    variant_id = variant.id if variant is not None else None
+    grid_pdf = await get_cached_test_answers_grid(test_version, variant_id)
+    if grid_pdf is not None:
+        return grid_pdf
+
+    test_questions = await get_test_questions_with_answers(session, test)
+    title = None
+    if variant is not None:
+        questions = get_variant_questions_contents(variant, test_questions)
+        title = f"Variant {variant.number}"
+    else:
+        questions = [(question.content, [answer.content for answer in question.answers]) for question in test_questions]
+    columns_number = max((len(answers_contents) for _, answers_contents in questions), default=0)
+    grid_pdf = await render_grid_pdf(columns_number, len(questions), questions, title)
+
+    cache_key = get_test_answers_grid_cache_key(test_version, variant_id)
+    grid_pdfs_cache.set(cache_key, grid_pdf)
+    await set_cached_value(cache_key, grid_pdf, settings.grid_pdf_cache_ttl_in_seconds)
+    return grid_pdf
+
+
+async def generate_answer_sheets(
+    session: AsyncSession, test: Test, students: list[AnswerSheetStudentSchema]
+) -> AsyncIterator[bytes]:
+    """
+    Return the class set of personal answer sheets as PDF chunks, one page at a time.
+    The first pages are rendered before returning, so that a busy rendering pool is reported before the response starts,
+    and every next chunk of students is rendered while the previous one is being sent.
+    """
+    rows_number, columns_number = await get_test_grid_dimensions(session, test)
+    students_identities = [(student.student_username, student.student_group) for student in students]
+    chunk_size = settings.answer_sheets_chunk_size
+    chunks = [
+        students_identities[start : start + chunk_size] for start in range(0, len(students_identities), chunk_size)
+    ]
+    first_contents = await render_answer_sheets(str(test.id), test.name, rows_number, columns_number, chunks[0])
+
+    async def stream_answer_sheets() -> AsyncIterator[bytes]:
+        writer = StreamingPDFWriter(get_embedded_questions_font())
+        yield writer.start()
+        contents = first_contents
+        for chunk in chunks[1:]:
+            next_contents = asyncio.create_task(
+                render_answer_sheets(
+                    str(test.id), test.name, rows_number, columns_number, chunk, reject_when_full=False
+                )
+            )
+            try:
+                for content in contents:
+                    yield writer.add_page(content)
+            except BaseException:
+                next_contents.cancel()
+                raise
+            contents = await next_contents
+        for content in contents:
+            yield writer.add_page(content)
+        yield writer.finish()
+
+    return stream_answer_sheets()
+
 
-    results = await session.execute(query)
-    return move_row_values_to_attributes(results, ("questions_count",))
+async def get_teacher_tests(session: AsyncSession, teacher: User, cursor: str | None, page_size: int) -> dict[str, Any]:
+    """
+    Return a page of the teacher tests, newest first.
+    """
+    query = paginate(select(Test).where(Test.teacher_id == teacher.id), Test, cursor, page_size)
+    return get_page((await session.scalars(query)).all(), page_size)
 
 
 async def update_student_test_answer_score(
     session: AsyncSession, student_test_answer: StudentTestAnswer, points: int
 ) -> StudentTestAnswer:
     student_test_answer.score = points
+    student_test_answer.is_score_manual = True
     await session.commit()
     return student_test_answer
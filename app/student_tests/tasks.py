@@ -1,23 +1,115 @@
-from asyncio import get_event_loop
+import asyncio
+import logging
+
+from sqlalchemy import update
 
 from app.common.services.db import quick_select
+from app.common.services.omr import get_student_answer_grid_locally
 from app.common.services.openai import get_student_answer_grid
+from app.common.storage import delete_test_results
 from app.core.celery_app import celery_app
+from app.core.config import settings
 from app.core.db import SessionLocal
-from app.student_tests.models import StudentTestAnswer, Test
+from app.core.worker import worker_runtime
+from app.student_tests.models import StudentTestAnswer, SubmissionsImport, Test
+
+logger = logging.getLogger(__name__)
+
+
+async def grade_student_answer(test_id: str, answer_id: str) -> None:
+    from app.student_tests.services import (
+        calculate_score_by_answers_grid,
+        encode_answers_grid,
+        get_test_grid_dimensions,
+    )
+
+    async with SessionLocal() as session:
+        test = (await quick_select(session, Test, filter_by={"id": test_id})).scalar()
+        answer: StudentTestAnswer = (
+            await quick_select(session, StudentTestAnswer, filter_by={"id": answer_id})
+        ).scalar()
+        if settings.grading_engine == "omr":
+            rows_number, columns_number = await get_test_grid_dimensions(session, test)
+        # The connection goes back to the pool while the answers grid is being extracted.
+        await session.commit()
+
+        if settings.grading_engine == "omr":
+            answers_grid = await asyncio.to_thread(get_student_answer_grid_locally, answer, rows_number, columns_number)
+        else:
+            answers_grid = await get_student_answer_grid(answer)
+
+        answer.answers_masks = encode_answers_grid(answers_grid)
+        # The grid is stored as printed, a variant grid is scored with the variant key.
+        score = await calculate_score_by_answers_grid(
+            session=session, test=test, grid=answers_grid, variant_questions_order=answer.variant_questions_order
+        )
+        # The teacher may have set the score while the grid was being extracted.
+        await session.execute(
+            update(StudentTestAnswer)
+            .where(StudentTestAnswer.id == answer.id, StudentTestAnswer.is_score_manual.is_(False))
+            .values(score=score)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+
+async def grade_student_answers(test_id: str, answer_ids: list[str]) -> None:
+    semaphore = asyncio.Semaphore(settings.grading_concurrency)
+
+    async def grade(answer_id: str) -> None:
+        async with semaphore:
+            await grade_student_answer(test_id, answer_id)
+
+    results = await asyncio.gather(*(grade(answer_id) for answer_id in answer_ids), return_exceptions=True)
+    for answer_id, result in zip(answer_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f"Could not grade the student answer {answer_id}: {result!r}.")
+
+
+async def regrade_test_student_answers(test_id: str) -> None:
+    from app.student_tests.services import regrade_student_answers
+
+    async with SessionLocal() as session:
+        test = (await quick_select(session, Test, filter_by={"id": test_id})).scalar()
+        if test is not None:
+            await regrade_student_answers(session, test)
+
+
+async def import_test_submissions(import_id: str, student_group: str, students: list[dict[str, str]]) -> None:
+    from app.student_tests.schemas import AnswerSheetStudentSchema
+    from app.student_tests.services import import_submissions_archive
+
+    async with SessionLocal() as session:
+        submissions_import = (await quick_select(session, SubmissionsImport, filter_by={"id": import_id})).scalar()
+        if submissions_import is not None:
+            await import_submissions_archive(
+                session,
+                submissions_import,
+                student_group,
+                [AnswerSheetStudentSchema(**student) for student in students],
+            )
 
 
 @celery_app.task()
 def grade_test(test_id: str, answer_id: str) -> None:
-    from app.student_tests.services import calculate_score_by_answers_grid
-
-    loop = get_event_loop()
-    session = SessionLocal()
-    test = loop.run_until_complete(quick_select(session, Test, filter_by={"id": test_id})).scalar()
-    answer: StudentTestAnswer = loop.run_until_complete(
-        quick_select(session, StudentTestAnswer, filter_by={"id": answer_id})
-    ).scalar()
-    answers_grid = get_student_answer_grid(answer)
-    score = loop.run_until_complete(calculate_score_by_answers_grid(session=session, test=test, grid=answers_grid))
-    answer.score = score
-    loop.run_until_complete(session.commit())
+    worker_runtime.run(grade_student_answer(test_id, answer_id))
+
+
+@celery_app.task()
+def grade_tests(test_id: str, answer_ids: list[str]) -> None:
+    worker_runtime.run(grade_student_answers(test_id, answer_ids))
+
+
+@celery_app.task()
+def regrade_test(test_id: str) -> None:
+    worker_runtime.run(regrade_test_student_answers(test_id))
+
+
+@celery_app.task()
+def delete_results_photos(results_photo_urls: list[str]) -> None:
+    delete_test_results(results_photo_urls)
+
+
+@celery_app.task()
+def import_submissions(import_id: str, student_group: str, students: list[dict[str, str]]) -> None:
+    worker_runtime.run(import_test_submissions(import_id, student_group, students))
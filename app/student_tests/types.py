@@ -0,0 +1,129 @@
+import json
+from datetime import datetime
+from enum import Enum
+from typing import NamedTuple
+from uuid import UUID
+
+
+class ResultsExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class SubmissionsImportStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class AnswerKey(NamedTuple):
+    """
+    Correct answer positions and points of every question position of one test version.
+    Only questions with at least one correct answer are part of the key.
+    """
+
+    test_id: UUID
+    version: int
+    correct_answers: dict[int, frozenset[int]]
+    points: dict[int, int]
+
+    def score(self, grid: dict[int, list[int]]) -> int:
+        return sum(
+            self.points[question_number]
+            for question_number, answers in grid.items()
+            if question_number in self.correct_answers and frozenset(answers) == self.correct_answers[question_number]
+        )
+
+    def permute(self, permutation: "VariantPermutation") -> "AnswerKey":
+        """
+        Return the key of a test variant, numbered the way the questions and answers are printed on the variant.
+        """
+        correct_answers = {}
+        points = {}
+        for question_number, (question_position, answers_positions) in enumerate(
+            zip(permutation.questions_positions, permutation.answers_positions), start=1
+        ):
+            if question_position not in self.correct_answers:
+                continue
+            answers_numbers = {position: number for number, position in enumerate(answers_positions, start=1)}
+            correct_answers[question_number] = frozenset(
+                answers_numbers[position] for position in self.correct_answers[question_position]
+            )
+            points[question_number] = self.points[question_position]
+        return self._replace(correct_answers=correct_answers, points=points)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "correct_answers": {number: sorted(answers) for number, answers in self.correct_answers.items()},
+                "points": self.points,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, test_id: UUID, version: int, data: str | bytes) -> "AnswerKey":
+        content = json.loads(data)
+        return cls(
+            test_id=test_id,
+            version=version,
+            correct_answers={int(number): frozenset(answers) for number, answers in content["correct_answers"].items()},
+            points={int(number): points for number, points in content["points"].items()},
+        )
+
+
+class TestVersion(NamedTuple):
+    """
+    The content version of a test, which identifies every cached artifact rendered from it.
+    """
+
+    test_id: UUID
+    version: int
+    updated_at: datetime
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.test_id}-{self.version}"'
+
+    def get_variant_etag(self, variant_id: UUID) -> str:
+        return f'"{self.test_id}-{self.version}-{variant_id}"'
+
+
+class VariantPermutation(NamedTuple):
+    """
+    The order of the questions and answers of a test variant. The variant question at index i is the test question
+    at position `questions_positions[i]`, and its answer at index j is the answer at position `answers_positions[i][j]`.
+    """
+
+    questions_positions: list[int]
+    answers_positions: list[list[int]]
+
+    @classmethod
+    def from_variant_order(
+        cls, variant_order: list[list], test_answers_positions: dict[str, tuple[int, dict[str, int]]]
+    ) -> "VariantPermutation":
+        """
+        Lay the test out in the order stored with the variant as pairs of the question id and its answer ids,
+        given the position of every question id in the test order with the positions of its answer ids.
+        Questions and answers added after the variant was created follow the stored ones in the test order
+        and deleted ones are left out, so that editing the test never reorders a printed variant.
+        """
+        stored_answers_ids = {question_id: answers_ids for question_id, answers_ids in variant_order}
+        questions_ids = [question_id for question_id in stored_answers_ids if question_id in test_answers_positions]
+        questions_ids += [
+            question_id for question_id in test_answers_positions if question_id not in stored_answers_ids
+        ]
+
+        questions_positions = []
+        answers_positions = []
+        for question_id in questions_ids:
+            question_position, question_answers_positions = test_answers_positions[question_id]
+            answers_ids = [
+                answer_id
+                for answer_id in stored_answers_ids.get(question_id, [])
+                if answer_id in question_answers_positions
+            ]
+            answers_ids += [answer_id for answer_id in question_answers_positions if answer_id not in answers_ids]
+            questions_positions.append(question_position)
+            answers_positions.append([question_answers_positions[answer_id] for answer_id in answers_ids])
+        return cls(questions_positions=questions_positions, answers_positions=answers_positions)
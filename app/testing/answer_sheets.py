@@ -0,0 +1,121 @@
+"""
+Synthetic phone photos of the answers grids generated by `create_grid_pdf`, for the tests and benchmarks
+of the optical mark recognition.
+"""
+
+import io
+
+import numpy as np
+import pypdfium2
+from fpdf import FPDF
+from PIL import Image, ImageDraw
+
+from app.common.constants import FIDUCIAL_SIZE, GRID_CELL_SIZE
+from app.common.services.grid_layout import GridLayout, get_grid_layouts
+from app.common.services.omr import get_homography
+from app.common.services.pdf import create_grid_pdf
+
+PIXELS_PER_MILLIMETER = 8
+POINTS_PER_INCH = 72
+MILLIMETERS_PER_INCH = 25.4
+MARK_RADIUS = 3.5
+TABLE_SHADE = 200
+# The bottom margin of the answers grid pages in `create_grid_pdf`.
+GRID_PAGE_BOTTOM_MARGIN = 15
+
+
+def render_grid_page(rows_number: int, columns_number: int) -> Image.Image:
+    """
+    Render the last answers grid page of a test as a grayscale image.
+    """
+    questions = [
+        (f"Question {number}", [f"Answer {chr(65 + index)}" for index in range(columns_number)])
+        for number in range(1, rows_number + 1)
+    ]
+    document = pypdfium2.PdfDocument(create_grid_pdf(columns_number, rows_number, questions))
+    try:
+        page = document[len(document) - 1]
+        bitmap = page.render(scale=PIXELS_PER_MILLIMETER * MILLIMETERS_PER_INCH / POINTS_PER_INCH)
+        return bitmap.to_pil().convert("L")
+    finally:
+        document.close()
+
+
+def get_grid_page_layout(rows_number: int, columns_number: int) -> GridLayout:
+    """
+    Return the layout of the last answers grid page, split the same way `create_grid_pdf` splits the grid.
+    """
+    document = FPDF()
+    document.set_auto_page_break(auto=False, margin=GRID_PAGE_BOTTOM_MARGIN)
+    available_height = document.h - document.t_margin - document.b_margin
+    return get_grid_layouts(rows_number, columns_number, available_height)[-1]
+
+
+def get_page_point(x: float, y: float) -> tuple[float, float]:
+    """
+    Convert a grid layout position into pixels of the rendered page.
+    """
+    page_margin = FPDF().l_margin
+    return (
+        (page_margin + FIDUCIAL_SIZE / 2 + x) * PIXELS_PER_MILLIMETER,
+        (page_margin + FIDUCIAL_SIZE / 2 + y) * PIXELS_PER_MILLIMETER,
+    )
+
+
+def mark_cells(
+    page: Image.Image, layout: GridLayout, grid: dict[int, list[int]], radius: float = MARK_RADIUS
+) -> Image.Image:
+    """
+    Fill the answer cells of the grid, given the same way the reader returns them, with round pen marks.
+    """
+    page = page.copy()
+    draw = ImageDraw.Draw(page)
+    for question_number, answers_numbers in grid.items():
+        # The header row and column come before the first question and answer.
+        row_number = question_number - layout.first_question_number + 1
+        for answer_number in answers_numbers:
+            x = layout.grid_left + (answer_number + 0.5) * GRID_CELL_SIZE
+            y = layout.grid_top + (row_number + 0.5) * GRID_CELL_SIZE
+            left, top = get_page_point(x - radius, y - radius)
+            right, bottom = get_page_point(x + radius, y + radius)
+            draw.ellipse([left, top, right, bottom], fill=0)
+    return page
+
+
+def cover_fiducial(page: Image.Image, layout: GridLayout, index: int) -> Image.Image:
+    """
+    Paint over one of the fiducial markers, ordered the same way as `GridLayout.fiducials_centers`.
+    """
+    x, y = layout.fiducials_centers[index]
+    left, top = get_page_point(x - FIDUCIAL_SIZE, y - FIDUCIAL_SIZE)
+    right, bottom = get_page_point(x + FIDUCIAL_SIZE, y + FIDUCIAL_SIZE)
+    page = page.copy()
+    ImageDraw.Draw(page).rectangle([left, top, right, bottom], fill=255)
+    return page
+
+
+def take_photo(page: Image.Image, angle: float = 0, keystone: float = 0, seed: int = 0) -> bytes:
+    """
+    Turn the page into a JPEG photo of it lying on a table, rotated by the angle in degrees,
+    with the top edge narrower by the keystone share of the width, uneven lighting and sensor noise.
+    """
+    photo = page.rotate(angle, resample=Image.Resampling.BILINEAR, expand=True, fillcolor=TABLE_SHADE)
+    width, height = photo.size
+    inset = keystone * width / 2
+    corners = np.array([(0, 0), (width, 0), (0, height), (width, height)], dtype=np.float64)
+    photographed_corners = np.array([(inset, 0), (width - inset, 0), (0, height), (width, height)])
+    homography = get_homography(photographed_corners, corners)
+    photo = photo.transform(
+        photo.size,
+        Image.Transform.PERSPECTIVE,
+        (homography.ravel() / homography[2, 2])[:8].tolist(),
+        resample=Image.Resampling.BILINEAR,
+        fillcolor=TABLE_SHADE,
+    )
+
+    generator = np.random.default_rng(seed)
+    lighting = np.linspace(0.8, 1, width)[None, :] * np.linspace(0.9, 1, height)[:, None]
+    pixels = np.asarray(photo, dtype=np.float64) * lighting + generator.normal(0, 8, (height, width))
+    output = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(output, format="JPEG", quality=85)
+    return output.getvalue()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import uvicorn
+
+CHAT_COMPLETION = {
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "{}"}, "finish_reason": "stop"}],
+}
+
+
+class OpenAIStub:
+    """
+    A local stand-in for the chat completions API. It answers after `delay_in_seconds`, fails the first calls
+    with the queued `failures` status codes and records when every call came and how many were in flight at once.
+    """
+
+    def __init__(
+        self, delay_in_seconds: float = 0.0, failures: list[int] | None = None, retry_after: str | None = None
+    ) -> None:
+        self.delay_in_seconds = delay_in_seconds
+        self.failures = list(failures or [])
+        self.retry_after = retry_after
+        self.calls_times: list[float] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def calls_number(self) -> int:
+        return len(self.calls_times)
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        while (await receive())["more_body"]:
+            pass
+        self.calls_times.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay_in_seconds)
+        finally:
+            self.in_flight -= 1
+
+        headers = [(b"content-type", b"application/json")]
+        if self.failures:
+            status = self.failures.pop(0)
+            body = {"error": {"message": "Stubbed failure.", "type": "stub", "code": None}}
+            if self.retry_after is not None:
+                headers.append((b"retry-after", self.retry_after.encode()))
+        else:
+            status, body = 200, CHAT_COMPLETION
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+
+@contextmanager
+def run_openai_stub(stub: OpenAIStub) -> Iterator[str]:
+    """
+    Serve the stub on a free local port in a background thread and yield its base URL.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=port, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join()
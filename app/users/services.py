@@ -19,7 +19,7 @@ async def create_user(session: AsyncSession, username: str, password: str) -> Us
     from app.auth.services import hash_password
 
     try:
-        user = User(username=username, password=hash_password(password))
+        user = User(username=username, password=await hash_password(password))
         session.add(user)
         await session.commit()
         await session.refresh(user)
@@ -40,7 +40,7 @@ async def login_user(session: AsyncSession, username: str, password: str) -> Use
     ).scalar()
     if user is None:
         raise UserDoesNotExistException(username=username)
-    if not verify_user_password(user, password):
+    if not await verify_user_password(user, password):
         raise InvalidUserCredentialsException
     return UserLoginOutputSchema(
         access_token=create_jwt_token(user_id=user.id, token_type=JWTTokenType.access),
@@ -48,5 +48,5 @@ async def login_user(session: AsyncSession, username: str, password: str) -> Use
     )
 
 
-def verify_user_password(user: User, plain_password: str) -> bool:
-    return verify_password(plain_password, user.password)
+async def verify_user_password(user: User, plain_password: str) -> bool:
+    return await verify_password(plain_password, user.password)
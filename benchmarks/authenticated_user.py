@@ -0,0 +1,68 @@
+"""
+Database round trips and latency of an authenticated request, when the user is looked up in the database,
+in the cache shared by the workers and in the cache of the worker itself.
+
+    poetry run python -m benchmarks.authenticated_user
+"""
+
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import event
+
+from app.auth.services import (
+    authenticated_users_cache,
+    create_jwt_token,
+    get_authenticated_user_cache_key,
+)
+from app.auth.types import JWTTokenType
+from app.common.cache import delete_cached_value
+from app.core.db import SessionLocal, engine
+from app.core.main import app
+from app.users.models import User
+
+REQUESTS_NUMBER = 200
+LOOKUPS = ("database", "shared cache", "worker cache")
+
+
+async def forget_user(key: str, lookup: str) -> None:
+    """
+    Drop the user from the caches that come before the measured lookup.
+    """
+    if lookup != "worker cache":
+        authenticated_users_cache.delete(key)
+    if lookup == "database":
+        await delete_cached_value(key)
+
+
+async def main() -> None:
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *_: statements.append(None))
+    async with SessionLocal() as session:
+        user = User(username=f"benchmark-{uuid.uuid4().hex[:8]}", password="unused")
+        session.add(user)
+        await session.commit()
+    key = get_authenticated_user_cache_key(user.id)
+    headers = {"Authorization": f"Bearer {create_jwt_token(user.id, JWTTokenType.access)}"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        for lookup in LOOKUPS:
+            await client.get("/users/self/", headers=headers)
+            statements.clear()
+            elapsed_time = 0.0
+            for _ in range(REQUESTS_NUMBER):
+                await forget_user(key, lookup)
+                started_at = time.perf_counter()
+                response = await client.get("/users/self/", headers=headers)
+                elapsed_time += time.perf_counter() - started_at
+                response.raise_for_status()
+            print(
+                f"{lookup:>12}: {len(statements) / REQUESTS_NUMBER:.1f} statements, "
+                f"{elapsed_time / REQUESTS_NUMBER * 1000:5.2f} ms a request"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+Database round trips and time of creating a test with five answers a question, by the number of questions.
+
+    poetry run python -m benchmarks.create_test
+"""
+
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import event
+
+from app.core.db import SessionLocal, engine
+from app.student_tests.schemas import AnswerCreateSchema, QuestionCreateSchema
+from app.student_tests.services import create_test
+from app.users.models import User
+
+QUESTIONS_NUMBERS = (1, 10, 40, 200)
+
+
+async def main() -> None:
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *_: statements.append(None))
+    async with SessionLocal() as session:
+        teacher = User(username=f"benchmark-{uuid.uuid4().hex[:8]}", password="unused")
+        session.add(teacher)
+        await session.commit()
+        for questions_number in QUESTIONS_NUMBERS:
+            questions = [
+                QuestionCreateSchema(
+                    content=f"Question {number}",
+                    points=2,
+                    answers=[
+                        AnswerCreateSchema(content=f"Answer {letter}", is_correct=letter == "A") for letter in "ABCDE"
+                    ],
+                )
+                for number in range(questions_number)
+            ]
+            statements.clear()
+            started_at = time.perf_counter()
+            await create_test(session, teacher, f"Benchmark {uuid.uuid4().hex[:8]}", questions)
+            elapsed_time = time.perf_counter() - started_at
+            print(f"{questions_number:>4} questions: {len(statements):>3} statements, {elapsed_time * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
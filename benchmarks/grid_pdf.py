@@ -0,0 +1,114 @@
+"""
+Time of GET /tests/{id}/grid/ on a 100 question test when the PDF is rendered and when it is cached,
+and of rendering the PDF with the shared parsed questions font against parsing the font file for every document.
+
+    poetry run python -m benchmarks.grid_pdf
+"""
+
+import asyncio
+import time
+import uuid
+from collections.abc import Callable
+
+import httpx
+from fpdf import FPDF
+
+from app.common.cache import delete_cached_value
+from app.common.constants import QUESTIONS_FONT_FAMILY, QUESTIONS_FONT_PATH
+from app.common.services import pdf
+from app.common.services.pdf import create_grid_pdf, load_questions_fonts
+from app.core.db import SessionLocal
+from app.core.main import app, lifespan
+from app.student_tests.schemas import AnswerCreateSchema, QuestionCreateSchema
+from app.student_tests.services import (
+    create_test,
+    get_test_answers_grid_cache_key,
+    get_test_version,
+    grid_pdfs_cache,
+)
+from app.users.models import User
+
+QUESTIONS_NUMBER = 100
+REQUESTS_NUMBER = 20
+
+
+def build_questions() -> list[QuestionCreateSchema]:
+    return [
+        QuestionCreateSchema(
+            content=f"Питання {number}: скільки буде {number} + {number}?",
+            points=1,
+            answers=[
+                AnswerCreateSchema(content=str(number * factor), is_correct=factor == 2) for factor in range(1, 5)
+            ],
+        )
+        for number in range(1, QUESTIONS_NUMBER + 1)
+    ]
+
+
+def add_questions_font_from_file(document: FPDF) -> None:
+    document.add_font(QUESTIONS_FONT_FAMILY, "", QUESTIONS_FONT_PATH)
+
+
+def measure_rendering_time(add_questions_font: Callable[[FPDF], None], questions: list[tuple[str, list[str]]]) -> float:
+    pdf.add_questions_font = add_questions_font
+    started_at = time.perf_counter()
+    for _ in range(REQUESTS_NUMBER):
+        create_grid_pdf(4, len(questions), questions)
+    return (time.perf_counter() - started_at) / REQUESTS_NUMBER
+
+
+def measure_font_registration_time(add_questions_font: Callable[[FPDF], None]) -> float:
+    started_at = time.perf_counter()
+    for _ in range(REQUESTS_NUMBER):
+        add_questions_font(FPDF())
+    return (time.perf_counter() - started_at) / REQUESTS_NUMBER
+
+
+async def measure_request_time(client: httpx.AsyncClient, test_id: uuid.UUID, cache_key: str | None) -> float:
+    elapsed_time = 0.0
+    for _ in range(REQUESTS_NUMBER):
+        if cache_key is not None:
+            grid_pdfs_cache.delete(cache_key)
+            await delete_cached_value(cache_key)
+        started_at = time.perf_counter()
+        response = await client.get(f"/tests/{test_id}/grid/")
+        elapsed_time += time.perf_counter() - started_at
+        response.raise_for_status()
+    return elapsed_time / REQUESTS_NUMBER
+
+
+async def main() -> None:
+    async with SessionLocal() as session:
+        teacher = User(username=f"benchmark-{uuid.uuid4().hex[:8]}", password="unused")
+        session.add(teacher)
+        await session.commit()
+        questions = build_questions()
+        test = await create_test(session, teacher, f"Benchmark {uuid.uuid4().hex[:8]}", questions)
+    cache_key = get_test_answers_grid_cache_key(get_test_version(test))
+
+    async with lifespan(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+    ) as client:
+        await measure_request_time(client, test.id, cache_key)
+        rendered_time = await measure_request_time(client, test.id, cache_key)
+        cached_time = await measure_request_time(client, test.id, None)
+    print(f"GET /tests/{{id}}/grid/, {QUESTIONS_NUMBER} questions:")
+    print(f"rendered {rendered_time * 1000:7.1f} ms")
+    print(f"cached   {cached_time * 1000:7.1f} ms")
+
+    load_questions_fonts()
+    rendered_questions = [(question.content, [answer.content for answer in question.answers]) for question in questions]
+    for label, add_questions_font in (
+        ("shared parsed font", pdf.add_questions_font),
+        ("font file parsed per document", add_questions_font_from_file),
+    ):
+        registration_time = measure_font_registration_time(add_questions_font)
+        rendering_time = measure_rendering_time(add_questions_font, rendered_questions)
+        print(
+            f"{label:<30} font registration {registration_time * 1000:6.2f} ms, "
+            f"create_grid_pdf {rendering_time * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Time of reading the marked cells from a synthetic phone photo of the answers grid with the local OMR engine,
+by the grid size and by the reading stage.
+
+    poetry run python -m benchmarks.omr
+"""
+
+import random
+import time
+from collections.abc import Callable
+
+from app.common.services.omr import (
+    get_ink_mask,
+    load_grayscale_image,
+    locate_fiducials,
+    read_answer_grid,
+    read_framed_grid,
+)
+from app.testing.answer_sheets import (
+    get_grid_page_layout,
+    mark_cells,
+    render_grid_page,
+    take_photo,
+)
+
+GRID_SIZES = [(10, 4), (23, 5), (23, 8)]
+READS_NUMBER = 20
+
+
+def measure_time(function: Callable, *args) -> float:
+    started_at = time.perf_counter()
+    for _ in range(READS_NUMBER):
+        function(*args)
+    return (time.perf_counter() - started_at) / READS_NUMBER
+
+
+def main() -> None:
+    generator = random.Random(0)
+    for rows_number, columns_number in GRID_SIZES:
+        layout = get_grid_page_layout(rows_number, columns_number)
+        grid = {
+            question_number: [generator.randint(1, columns_number)]
+            for question_number in range(layout.first_question_number, layout.first_question_number + rows_number)
+        }
+        photo = take_photo(mark_cells(render_grid_page(rows_number, columns_number), layout, grid), 6, 0.05)
+        assert read_answer_grid(photo, rows_number, columns_number) == grid
+
+        grayscale_image = load_grayscale_image(photo)
+        ink_mask = get_ink_mask(grayscale_image)
+        print(f"{rows_number}x{columns_number} grid, {len(photo) // 1024} KiB photo:")
+        print(f"read_answer_grid  {measure_time(read_answer_grid, photo, rows_number, columns_number) * 1000:6.1f} ms")
+        print(f"  decoding        {measure_time(load_grayscale_image, photo) * 1000:6.1f} ms")
+        print(f"  binarization    {measure_time(get_ink_mask, grayscale_image) * 1000:6.1f} ms")
+        print(f"  fiducials       {measure_time(locate_fiducials, ink_mask) * 1000:6.1f} ms")
+        print(f"  fiducials, header and cells {measure_time(read_framed_grid, ink_mask) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
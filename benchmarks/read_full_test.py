@@ -0,0 +1,76 @@
+"""
+Database round trips and latency of reading a test with its questions and answers, with one request
+to `/tests/{id}/full/` against a request for the questions and one more for the answers of every question.
+
+    poetry run python -m benchmarks.read_full_test
+"""
+
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import event
+
+from app.auth.services import create_jwt_token
+from app.auth.types import JWTTokenType
+from app.core.db import SessionLocal, engine
+from app.core.main import app
+from app.student_tests.schemas import AnswerCreateSchema, QuestionCreateSchema
+from app.student_tests.services import create_test
+from app.users.models import User
+
+QUESTIONS_NUMBERS = (1, 10, 40, 200)
+REPEATS_NUMBER = 20
+
+
+async def read_full_test(client: httpx.AsyncClient, test_id: uuid.UUID, headers: dict[str, str]) -> None:
+    (await client.get(f"/tests/{test_id}/full/", headers=headers)).raise_for_status()
+
+
+async def read_questions_one_by_one(client: httpx.AsyncClient, test_id: uuid.UUID, headers: dict[str, str]) -> None:
+    response = await client.get(f"/tests/{test_id}/questions/", headers=headers)
+    response.raise_for_status()
+    for question in response.json():
+        (await client.get(f"/tests/questions/{question['id']}/answers/", headers=headers)).raise_for_status()
+
+
+async def main() -> None:
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *_: statements.append(None))
+    async with SessionLocal() as session:
+        teacher = User(username=f"benchmark-{uuid.uuid4().hex[:8]}", password="unused")
+        session.add(teacher)
+        await session.commit()
+        tests = []
+        for questions_number in QUESTIONS_NUMBERS:
+            questions = [
+                QuestionCreateSchema(
+                    content=f"Question {number}",
+                    points=2,
+                    answers=[
+                        AnswerCreateSchema(content=f"Answer {letter}", is_correct=letter == "A") for letter in "ABCDE"
+                    ],
+                )
+                for number in range(questions_number)
+            ]
+            tests.append(await create_test(session, teacher, f"Benchmark {uuid.uuid4().hex[:8]}", questions))
+    headers = {"Authorization": f"Bearer {create_jwt_token(teacher.id, JWTTokenType.access)}"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        await client.get("/tests/", headers=headers)
+        for questions_number, test in zip(QUESTIONS_NUMBERS, tests):
+            for pattern, read in (("full", read_full_test), ("one by one", read_questions_one_by_one)):
+                statements.clear()
+                started_at = time.perf_counter()
+                for _ in range(REPEATS_NUMBER):
+                    await read(client, test.id, headers)
+                elapsed_time = (time.perf_counter() - started_at) / REPEATS_NUMBER
+                print(
+                    f"{questions_number:>4} questions, {pattern:>10}: "
+                    f"{len(statements) / REPEATS_NUMBER:>5.0f} statements, {elapsed_time * 1000:7.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""
+Scoring 10k submissions of a 100 question test in one vectorized pass against scoring them one by one.
+
+    poetry run python -m benchmarks.score_answers
+"""
+
+import random
+import time
+import uuid
+
+from app.student_tests.services import encode_answers_grid, score_answers_masks
+from app.student_tests.types import AnswerKey
+
+SUBMISSIONS_NUMBER = 10_000
+QUESTIONS_NUMBER = 100
+ANSWERS_PER_QUESTION = 5
+
+
+def generate_answer_key() -> AnswerKey:
+    positions = range(1, QUESTIONS_NUMBER + 1)
+    return AnswerKey(
+        test_id=uuid.uuid4(),
+        version=1,
+        correct_answers={
+            position: frozenset(random.sample(range(1, ANSWERS_PER_QUESTION + 1), random.choice((1, 1, 2))))
+            for position in positions
+        },
+        points={position: random.randint(1, 5) for position in positions},
+    )
+
+
+def generate_grid(answer_key: AnswerKey) -> dict[int, list[int]]:
+    """
+    A submission that gets about half of the questions right, skips some and marks extra answers on others.
+    """
+    grid = {}
+    for position, correct_answers in answer_key.correct_answers.items():
+        chance = random.random()
+        if chance < 0.05:
+            continue
+        if chance < 0.55:
+            grid[position] = sorted(correct_answers)
+        else:
+            grid[position] = random.sample(range(1, ANSWERS_PER_QUESTION + 1), random.choice((1, 2)))
+    return grid
+
+
+def main() -> None:
+    random.seed(0)
+    answer_key = generate_answer_key()
+    grids = [generate_grid(answer_key) for _ in range(SUBMISSIONS_NUMBER)]
+    answers_masks = [encode_answers_grid(grid) for grid in grids]
+
+    started_at = time.perf_counter()
+    scores = score_answers_masks(answer_key, answers_masks)
+    vectorized_time = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    reference_scores = [answer_key.score(grid) for grid in grids]
+    loop_time = time.perf_counter() - started_at
+
+    assert scores.tolist() == reference_scores
+    print(f"{SUBMISSIONS_NUMBER} submissions x {QUESTIONS_NUMBER} questions:")
+    print(f"vectorized pass {vectorized_time * 1000:7.1f} ms")
+    print(f"one by one      {loop_time * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Latency of a cheap request while large results photos are uploaded, to check the uploads do not block the event loop.
+Run it against a local S3 stand-in with the bucket endpoint pointing to it, for example `moto_server -p 9000`
+or MinIO, and an existing results bucket.
+
+    poetry run python -m benchmarks.upload_latency
+"""
+
+import asyncio
+import io
+import os
+import time
+from collections.abc import Awaitable
+
+import httpx
+from starlette.datastructures import Headers, UploadFile
+
+from app.common.storage import client, upload_test_result
+from app.core.config import settings
+from app.core.main import app
+
+UPLOADS_NUMBER = 4
+PHOTO_SIZE_IN_BYTES = 20 * 1024 * 1024
+PROBE_INTERVAL_IN_SECONDS = 0.01
+
+
+async def probe_latency(client: httpx.AsyncClient, latencies: list[float], stop: asyncio.Event) -> None:
+    """
+    Send a request every probe interval and time it from when it was due,
+    so that the time the event loop was blocked before it could be sent is counted too.
+    """
+    while not stop.is_set():
+        due_at = time.perf_counter() + PROBE_INTERVAL_IN_SECONDS
+        await asyncio.sleep(PROBE_INTERVAL_IN_SECONDS)
+        await client.get("/metrics/")
+        latencies.append(time.perf_counter() - due_at)
+
+
+async def measure_latency(client: httpx.AsyncClient, work: Awaitable) -> tuple[list[float], float]:
+    latencies = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_latency(client, latencies, stop))
+    await asyncio.sleep(0)
+    started_at = time.perf_counter()
+    await work
+    elapsed_time = time.perf_counter() - started_at
+    stop.set()
+    await probe
+    return latencies, elapsed_time
+
+
+async def upload_on_the_event_loop(photos: list[UploadFile]) -> None:
+    """
+    The synchronous `put_object` call that uploads used to make, for reference.
+    """
+    for photo in photos:
+        photo.file.seek(0)
+        client.put_object(Bucket=settings.test_results_bucket_name, Key=photo.filename, Body=photo.file.read())
+
+
+def print_latencies(label: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p50, p99 = (latencies[int(percentile * (len(latencies) - 1))] for percentile in (0.5, 0.99))
+    print(
+        f"{label:<28} {len(latencies):>4} requests, p50 {p50 * 1000:7.1f} ms, "
+        f"p99 {p99 * 1000:7.1f} ms, max {latencies[-1] * 1000:7.1f} ms"
+    )
+
+
+async def main() -> None:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as api_client:
+        latencies, _ = await measure_latency(api_client, asyncio.sleep(2))
+        print_latencies("idle", latencies)
+        photos = [
+            UploadFile(
+                io.BytesIO(os.urandom(PHOTO_SIZE_IN_BYTES)),
+                filename=f"photo-{number}.jpg",
+                headers=Headers({"content-type": "image/jpeg"}),
+            )
+            for number in range(UPLOADS_NUMBER)
+        ]
+        latencies, elapsed_time = await measure_latency(
+            api_client, asyncio.gather(*(upload_test_result(photo) for photo in photos))
+        )
+        print_latencies(f"{UPLOADS_NUMBER} x 20 MB uploads", latencies)
+        print(f"uploads took {elapsed_time:.2f} s")
+        latencies, elapsed_time = await measure_latency(api_client, upload_on_the_event_loop(photos))
+        print_latencies(f"{UPLOADS_NUMBER} x 20 MB put_object", latencies)
+        print(f"uploads took {elapsed_time:.2f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""
+Throughput of the vision client against a local stub that answers every call in 200 ms, by concurrency limit.
+
+    poetry run python -m benchmarks.vision_client
+"""
+
+import asyncio
+import time
+
+from app.common.services.openai import AsyncVisionClient
+from app.testing.openai_stub import OpenAIStub, run_openai_stub
+
+CALLS_NUMBER = 128
+CONCURRENCY_LIMITS = (1, 4, 16, 64)
+
+
+async def measure_throughput(base_url: str, max_concurrent_requests: int) -> float:
+    client = AsyncVisionClient(
+        api_key="benchmark",
+        base_url=base_url,
+        max_concurrent_requests=max_concurrent_requests,
+        requests_per_minute=100_000,
+        tokens_per_minute=100_000_000,
+    )
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client.create_chat_completion(model="gpt-4o", messages=[{"role": "user", "content": "Grade it."}])
+            for _ in range(CALLS_NUMBER)
+        )
+    )
+    throughput = CALLS_NUMBER / (time.perf_counter() - started_at)
+    await client.client.close()
+    return throughput
+
+
+def main() -> None:
+    stub = OpenAIStub(delay_in_seconds=0.2)
+    with run_openai_stub(stub) as base_url:
+        for max_concurrent_requests in CONCURRENCY_LIMITS:
+            throughput = asyncio.run(measure_throughput(base_url, max_concurrent_requests))
+            print(f"concurrency {max_concurrent_requests:>3}: {throughput:7.1f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+from unittest import mock
+
+import httpx
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.services import create_jwt_token
+from app.auth.types import JWTTokenType
+from app.common.cache import redis_client
+from app.core.db import SessionLocal, engine
+from app.core.main import app
+from app.users.models import User
+
+QUEUED_TASKS = ("delete_results_photos", "grade_test", "grade_tests", "import_submissions", "regrade_test")
+
+
+class StatementsCounter:
+    """
+    Counts the statements sent to the database while it is listening to the engine.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_: Any) -> None:
+        self.count += 1
+
+    def reset(self) -> None:
+        self.count = 0
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def connections(anyio_backend: str) -> AsyncIterator[None]:
+    # A session scoped async fixture keeps one event loop for all the tests, which the pooled connections belong to.
+    yield
+    await engine.dispose()
+    await redis_client.aclose()
+
+
+@pytest.fixture
+async def session() -> AsyncIterator[AsyncSession]:
+    async with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def statements_counter() -> Iterator[StatementsCounter]:
+    counter = StatementsCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture(autouse=True)
+def queued_tasks() -> Iterator[dict[str, mock.MagicMock]]:
+    with mock.patch.multiple("app.student_tests.services", **{name: mock.DEFAULT for name in QUEUED_TASKS}) as tasks:
+        yield tasks
+
+
+@pytest.fixture
+async def teacher(session: AsyncSession) -> User:
+    user = User(username=f"teacher-{uuid.uuid4().hex[:8]}", password="unused")
+    session.add(user)
+    await session.commit()
+    return user
+
+
+@pytest.fixture
+def teacher_headers(teacher: User) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_jwt_token(teacher.id, JWTTokenType.access)}"}
+
+
+@pytest.fixture
+async def api_client() -> AsyncIterator[httpx.AsyncClient]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+        yield client
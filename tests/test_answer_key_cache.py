@@ -0,0 +1,88 @@
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.student_tests import schemas
+from app.student_tests.models import Test
+from app.student_tests.services import (
+    answer_keys_cache,
+    calculate_score_by_answers_grid,
+    create_test,
+    delete_test,
+    get_answer_key_cache_key,
+    get_published_test_version,
+    get_test_questions_with_answers,
+    get_test_version,
+    publish_test_version,
+    update_answer,
+)
+from app.users.models import User
+from tests.conftest import StatementsCounter
+
+pytestmark = pytest.mark.anyio
+
+
+def build_question(number: int, points: int) -> schemas.QuestionCreateSchema:
+    return schemas.QuestionCreateSchema(
+        content=f"Question {number}",
+        points=points,
+        answers=[
+            schemas.AnswerCreateSchema(content=f"Answer {number}{letter}", is_correct=letter == "A") for letter in "ABC"
+        ],
+    )
+
+
+async def create_cached_test(session: AsyncSession, teacher: User) -> Test:
+    return await create_test(
+        session,
+        teacher,
+        f"Answer key {uuid.uuid4().hex[:8]}",
+        [build_question(1, 2), build_question(2, 3), build_question(3, 1)],
+    )
+
+
+async def test_answer_key_is_compiled_once_per_test_version(
+    session: AsyncSession, teacher: User, statements_counter: StatementsCounter
+):
+    test = await create_cached_test(session, teacher)
+    grids = [{1: [1], 2: [1], 3: [1]}, {1: [1], 2: [2]}, {1: [1, 2], 3: [1]}, {}]
+
+    statements_counter.reset()
+    scores = [await calculate_score_by_answers_grid(session, grid, test) for grid in grids * 75]
+    assert scores == [6, 2, 1, 0] * 75
+    assert statements_counter.count == 1
+
+    # Another worker has nothing in its own cache, but finds the key in the shared one.
+    answer_keys_cache.delete(get_answer_key_cache_key(test))
+    statements_counter.reset()
+    assert await calculate_score_by_answers_grid(session, grids[0], test) == 6
+    assert statements_counter.count == 0
+
+
+async def test_answer_key_follows_the_published_test_version(session: AsyncSession, teacher: User):
+    test = await create_cached_test(session, teacher)
+    grid = {1: [2], 2: [1]}
+    assert await calculate_score_by_answers_grid(session, grid, test) == 3
+    first_version = get_test_version(test)
+    stale_cache_key = get_answer_key_cache_key(test)
+
+    first_question, *_ = await get_test_questions_with_answers(session, test)
+    first_answer, second_answer, _ = first_question.answers
+    await update_answer(session, first_answer, first_answer.content, False)
+    await update_answer(session, second_answer, second_answer.content, True)
+    await session.refresh(test)
+
+    assert test.version == first_version.version + 2
+    assert (await get_published_test_version(test.id)).version == test.version
+    assert get_answer_key_cache_key(test) != stale_cache_key
+    assert await calculate_score_by_answers_grid(session, grid, test) == 5
+
+    test_id, last_version = test.id, get_test_version(test)
+    await delete_test(session, test)
+    assert await get_published_test_version(test_id) is None
+
+    # A request that read the test before it was deleted can not publish it again.
+    await publish_test_version(last_version)
+    await publish_test_version(first_version)
+    assert await get_published_test_version(test_id) is None
@@ -0,0 +1,59 @@
+import io
+import struct
+import zipfile
+
+import pytest
+
+from app.common.services.archives import SubmissionsArchive
+from app.core.config import settings
+
+MAX_ENTRY_SIZE = 64 * 1024
+
+
+@pytest.fixture(autouse=True)
+def max_entry_size(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "submissions_archive_max_entry_size_in_bytes", MAX_ENTRY_SIZE)
+
+
+def build_zip(entries: dict[str, bytes]) -> bytes:
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for name, data in entries.items():
+            zip_file.writestr(name, data)
+    return archive.getvalue()
+
+
+def understate_sizes(archive: bytes, size: int) -> bytes:
+    """
+    Rewrite the uncompressed sizes in the local and central directory headers, as a crafted archive would.
+    """
+    archive = bytearray(archive)
+    for signature, offset in ((b"PK\x03\x04", 22), (b"PK\x01\x02", 24)):
+        position = archive.find(signature)
+        while position != -1:
+            archive[position + offset : position + offset + 4] = struct.pack("<I", size)
+            position = archive.find(signature, position + 1)
+    return bytes(archive)
+
+
+def test_zip_entries_over_the_size_limit_are_skipped():
+    photo = b"\x89PNG" + bytes(1024)
+    archive = SubmissionsArchive(
+        io.BytesIO(build_zip({"first.png": photo, "bomb.png": bytes(MAX_ENTRY_SIZE + 1), "last.png": photo}))
+    )
+
+    assert [(page.name, page.data) for page in archive.iterate_pages()] == [
+        ("first.png", photo),
+        ("bomb.png", None),
+        ("last.png", photo),
+    ]
+
+
+def test_zip_entries_understating_their_size_are_not_read_past_the_limit():
+    archive = SubmissionsArchive(
+        io.BytesIO(understate_sizes(build_zip({"bomb.png": bytes(100 * MAX_ENTRY_SIZE)}), 1024))
+    )
+
+    (page,) = archive.iterate_pages()
+
+    assert page.data is None
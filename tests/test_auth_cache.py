@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.services import (
+    authenticated_users_cache,
+    get_authenticated_user_cache_key,
+    pending_cache_invalidations,
+)
+from app.users.models import User
+from tests.conftest import StatementsCounter
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_warm_authenticated_requests_do_not_query_the_database(
+    api_client: httpx.AsyncClient,
+    teacher: User,
+    teacher_headers: dict[str, str],
+    statements_counter: StatementsCounter,
+):
+    response = await api_client.get("/users/self/", headers=teacher_headers)
+    assert response.status_code == 200
+    assert statements_counter.count == 1
+
+    statements_counter.reset()
+    for _ in range(10):
+        response = await api_client.get("/users/self/", headers=teacher_headers)
+        assert response.json()["username"] == teacher.username
+    assert statements_counter.count == 0
+
+    # Another worker has nothing in its own cache, but finds the user in the shared one.
+    authenticated_users_cache.delete(get_authenticated_user_cache_key(teacher.id))
+    response = await api_client.get("/users/self/", headers=teacher_headers)
+    assert response.json()["username"] == teacher.username
+    assert statements_counter.count == 0
+
+
+async def test_changed_users_are_not_authenticated_from_the_cache(
+    api_client: httpx.AsyncClient, session: AsyncSession, teacher: User, teacher_headers: dict[str, str]
+):
+    assert (await api_client.get("/users/self/", headers=teacher_headers)).status_code == 200
+
+    teacher.username = f"{teacher.username}-renamed"
+    await session.commit()
+    await asyncio.gather(*pending_cache_invalidations)
+    response = await api_client.get("/users/self/", headers=teacher_headers)
+    assert response.json()["username"] == teacher.username
+
+    await session.delete(teacher)
+    await session.commit()
+    await asyncio.gather(*pending_cache_invalidations)
+    response = await api_client.get("/users/self/", headers=teacher_headers)
+    assert response.status_code == 403
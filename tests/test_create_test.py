@@ -0,0 +1,40 @@
+import uuid
+
+import httpx
+import pytest
+
+from tests.conftest import StatementsCounter
+
+pytestmark = pytest.mark.anyio
+
+
+def build_test_data(questions_number: int) -> dict:
+    return {
+        "name": f"Test {uuid.uuid4().hex[:8]}",
+        "questions": [
+            {
+                "content": f"Question {number}",
+                "points": 2,
+                "answers": [{"content": f"Answer {letter}", "is_correct": letter == "A"} for letter in "ABCDE"],
+            }
+            for number in range(questions_number)
+        ],
+    }
+
+
+async def test_creating_a_test_takes_the_same_statements_whatever_its_size(
+    api_client: httpx.AsyncClient, teacher_headers: dict[str, str], statements_counter: StatementsCounter
+):
+    # The first request caches the authenticated teacher, so that it does not count towards the next ones.
+    response = await api_client.post("/tests/", json=build_test_data(1), headers=teacher_headers)
+    assert response.status_code == 200
+
+    statements_counts = []
+    for questions_number in (1, 40):
+        statements_counter.reset()
+        response = await api_client.post("/tests/", json=build_test_data(questions_number), headers=teacher_headers)
+        assert response.status_code == 200
+        assert response.json()["questions_count"] == questions_number
+        statements_counts.append(statements_counter.count)
+
+    assert statements_counts[0] == statements_counts[1]
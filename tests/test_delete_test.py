@@ -0,0 +1,37 @@
+import asyncio
+import uuid
+from unittest import mock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import SessionLocal
+from app.student_tests.models import StudentTestAnswer
+from app.student_tests.services import create_student_answer, create_test, delete_test
+from app.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_deleting_a_test_removes_the_photos_of_submissions_added_meanwhile(
+    session: AsyncSession, teacher: User, queued_tasks: dict[str, mock.MagicMock]
+):
+    test = await create_test(session, teacher, f"Deleted {uuid.uuid4().hex[:8]}", [])
+    await create_student_answer(session, test, "first", f"{test.id}/first.png", "A")
+
+    async with SessionLocal() as other_session:
+        other_session.add(
+            StudentTestAnswer(
+                test_id=test.id, student_username="late", results_photo_url=f"{test.id}/late.png", student_group="A"
+            )
+        )
+        # The submission is inserted, but not committed yet when the test is being deleted.
+        await other_session.flush()
+        deleting = asyncio.create_task(delete_test(session, test))
+        await asyncio.sleep(0.2)
+        assert not deleting.done()
+        await other_session.commit()
+    await deleting
+
+    (results_photo_urls,), _ = queued_tasks["delete_results_photos"].delay.call_args
+    assert sorted(results_photo_urls) == [f"{test.id}/first.png", f"{test.id}/late.png"]
@@ -0,0 +1,145 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def build_question(content: str, points: int) -> dict:
+    return {
+        "content": content,
+        "points": points,
+        "answers": [{"content": f"{content}{letter}", "is_correct": letter == "A"} for letter in "ABC"],
+    }
+
+
+async def create_test(api_client: httpx.AsyncClient, headers: dict[str, str], questions_number: int = 4) -> dict:
+    test_data = {
+        "name": f"Edited {uuid.uuid4().hex[:8]}",
+        "questions": [build_question(f"Question {number}", number) for number in range(1, questions_number + 1)],
+    }
+    test_id = (await api_client.post("/tests/", json=test_data, headers=headers)).json()["id"]
+    return (await api_client.get(f"/tests/{test_id}/full/", headers=headers)).json()
+
+
+async def test_reordering_deleting_and_creating_in_one_edit(
+    api_client: httpx.AsyncClient, teacher_headers: dict[str, str]
+):
+    test = await create_test(api_client, teacher_headers)
+    first, second, third, fourth = test["questions"]
+    fourth_answer_ids = [answer["id"] for answer in fourth["answers"]]
+
+    response = await api_client.patch(
+        f"/tests/{test['id']}/",
+        json={
+            "created_questions": [build_question("Question 5", 5)],
+            "updated_questions": [{"id": third["id"], "content": "Question 3, reworded", "points": 10}],
+            "deleted_question_ids": [second["id"]],
+            "created_answers": [{"question_id": fourth["id"], "content": "Question 4D", "is_correct": False}],
+            "deleted_answer_ids": [first["answers"][1]["id"]],
+            "question_ids": [fourth["id"], first["id"], third["id"]],
+            "answers_orders": [{"question_id": fourth["id"], "answer_ids": fourth_answer_ids[::-1]}],
+        },
+        headers=teacher_headers,
+    )
+
+    assert response.status_code == 200
+    edited_test = response.json()
+    assert edited_test == (await api_client.get(f"/tests/{test['id']}/full/", headers=teacher_headers)).json()
+    assert [
+        (question["position_number"], question["content"], [answer["content"] for answer in question["answers"]])
+        for question in edited_test["questions"]
+    ] == [
+        (1, "Question 4", ["Question 4C", "Question 4B", "Question 4A", "Question 4D"]),
+        (2, "Question 1", ["Question 1A", "Question 1C"]),
+        (3, "Question 3, reworded", ["Question 3A", "Question 3B", "Question 3C"]),
+        (4, "Question 5", ["Question 5A", "Question 5B", "Question 5C"]),
+    ]
+    assert edited_test["max_score"] == 4 + 1 + 10 + 5
+    assert edited_test["questions_count"] == 4
+    assert edited_test["version"] == test["version"] + 1
+
+
+@pytest.mark.parametrize(
+    "build_edit",
+    [
+        lambda test, foreign_test: {"deleted_question_ids": [str(uuid.uuid4())]},
+        lambda test, foreign_test: {"deleted_answer_ids": [foreign_test["questions"][0]["answers"][0]["id"]]},
+        lambda test, foreign_test: {
+            "updated_questions": [{"id": foreign_test["questions"][0]["id"], "content": "Foreign", "points": 1}]
+        },
+        lambda test, foreign_test: {
+            "created_answers": [{"question_id": foreign_test["questions"][0]["id"], "content": "X", "is_correct": True}]
+        },
+        lambda test, foreign_test: {
+            "deleted_question_ids": [test["questions"][0]["id"]],
+            "updated_questions": [{"id": test["questions"][0]["id"], "content": "Deleted", "points": 1}],
+        },
+        lambda test, foreign_test: {
+            "deleted_answer_ids": [test["questions"][0]["answers"][0]["id"]],
+            "updated_answers": [{"id": test["questions"][0]["answers"][0]["id"], "content": "X", "is_correct": True}],
+        },
+        lambda test, foreign_test: {
+            "deleted_question_ids": [test["questions"][0]["id"]],
+            "updated_answers": [{"id": test["questions"][0]["answers"][0]["id"], "content": "X", "is_correct": True}],
+        },
+    ],
+    ids=[
+        "unknown question",
+        "foreign answer",
+        "foreign question",
+        "answer of a foreign question",
+        "updated deleted question",
+        "updated deleted answer",
+        "updated answer of a deleted question",
+    ],
+)
+async def test_edits_of_items_outside_the_test_are_rejected(
+    api_client: httpx.AsyncClient, teacher_headers: dict[str, str], build_edit
+):
+    test = await create_test(api_client, teacher_headers, questions_number=2)
+    foreign_test = await create_test(api_client, teacher_headers, questions_number=1)
+
+    response = await api_client.patch(
+        f"/tests/{test['id']}/", json=build_edit(test, foreign_test), headers=teacher_headers
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "test-items-not-found"
+    assert (await api_client.get(f"/tests/{test['id']}/full/", headers=teacher_headers)).json() == test
+
+
+async def test_an_incomplete_order_is_rejected(api_client: httpx.AsyncClient, teacher_headers: dict[str, str]):
+    test = await create_test(api_client, teacher_headers, questions_number=3)
+
+    response = await api_client.patch(
+        f"/tests/{test['id']}/",
+        json={"question_ids": [question["id"] for question in test["questions"][:2]]},
+        headers=teacher_headers,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "invalid-test-items-order"
+
+
+async def test_concurrent_edits_renumber_the_questions_one_after_another(
+    api_client: httpx.AsyncClient, teacher_headers: dict[str, str]
+):
+    test = await create_test(api_client, teacher_headers, questions_number=3)
+    first, second, third = (question["id"] for question in test["questions"])
+
+    responses = await asyncio.gather(
+        api_client.patch(
+            f"/tests/{test['id']}/", json={"question_ids": [third, second, first]}, headers=teacher_headers
+        ),
+        api_client.patch(
+            f"/tests/{test['id']}/", json={"question_ids": [second, first, third]}, headers=teacher_headers
+        ),
+    )
+
+    assert [response.status_code for response in responses] == [200, 200]
+    edited_test = (await api_client.get(f"/tests/{test['id']}/full/", headers=teacher_headers)).json()
+    assert [question["position_number"] for question in edited_test["questions"]] == [1, 2, 3]
+    assert edited_test["version"] == test["version"] + 2
@@ -0,0 +1,34 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pytest
+
+from app.common.exceptions import RenderingPoolBusyException
+from app.common.services.executors import BoundedExecutor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cancelled_job_keeps_its_place_until_the_worker_is_done_with_it():
+    pool = BoundedExecutor(
+        name="test",
+        create_executor=partial(ThreadPoolExecutor, max_workers=1),
+        max_workers=1,
+        max_queue_size=0,
+        busy_exception=RenderingPoolBusyException,
+    )
+    try:
+        job = asyncio.create_task(pool.run("sleep", time.sleep, 0.5))
+        await asyncio.sleep(0.1)
+        job.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await job
+
+        with pytest.raises(RenderingPoolBusyException):
+            await pool.run("sleep", time.sleep, 0)
+        await asyncio.sleep(0.5)
+        await pool.run("sleep", time.sleep, 0)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,60 @@
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.student_tests.schemas import AnswerCreateSchema, QuestionCreateSchema
+from app.student_tests.services import (
+    create_test,
+    delete_test,
+    generate_test_answers_grid,
+    get_test_version,
+    publish_test_version,
+)
+from app.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_grid_test(session: AsyncSession, teacher: User):
+    questions = [
+        QuestionCreateSchema(
+            content=f"Question {number}",
+            points=1,
+            answers=[AnswerCreateSchema(content=f"Answer {letter}", is_correct=letter == "A") for letter in "ABC"],
+        )
+        for number in range(1, 4)
+    ]
+    return await create_test(session, teacher, f"Grid {uuid.uuid4().hex[:8]}", questions)
+
+
+async def test_grid_is_cached_and_revalidated_by_its_etag(
+    api_client: httpx.AsyncClient, session: AsyncSession, teacher: User
+):
+    test = await create_grid_test(session, teacher)
+
+    response = await api_client.get(f"/tests/{test.id}/grid/")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+
+    not_modified_response = await api_client.get(
+        f"/tests/{test.id}/grid/", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert not_modified_response.status_code == 304
+
+
+async def test_grid_of_a_deleted_test_is_not_served_after_a_racing_request_cached_it(
+    api_client: httpx.AsyncClient, session: AsyncSession, teacher: User
+):
+    test = await create_grid_test(session, teacher)
+    await api_client.get(f"/tests/{test.id}/grid/")
+
+    # A grid request that loaded the test before it was deleted publishes its version and caches its grid afterwards.
+    test_version = get_test_version(test)
+    await delete_test(session, test)
+    await publish_test_version(test_version)
+    await generate_test_answers_grid(session, test)
+
+    response = await api_client.get(f"/tests/{test.id}/grid/")
+    assert response.status_code == 404
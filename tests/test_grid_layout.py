@@ -0,0 +1,33 @@
+from itertools import combinations
+
+from app.common.services.grid_layout import GridLayout, get_header_checksum
+
+LAYOUTS = [GridLayout(1, 25, 4), GridLayout(26, 25, 4), GridLayout(1001, 1, 63), GridLayout(51, 17, 5)]
+
+
+def test_header_checksum_is_crc_8():
+    bits = [bool(byte >> shift & 1) for byte in b"123456789" for shift in reversed(range(8))]
+
+    assert get_header_checksum(bits) == 0xF4
+
+
+def test_header_is_decoded_as_encoded():
+    for layout in LAYOUTS:
+        assert GridLayout.decode_header(layout.encode_header()) == layout
+
+
+def test_header_with_up_to_three_misread_bits_is_rejected():
+    for layout in LAYOUTS:
+        bits = layout.encode_header()
+        for errors_number in (1, 2, 3):
+            for positions in combinations(range(len(bits)), errors_number):
+                misread_bits = [not bit if position in positions else bit for position, bit in enumerate(bits)]
+                assert GridLayout.decode_header(misread_bits) is None, positions
+
+
+def test_header_with_cancelling_field_errors_is_rejected():
+    # One question more and one row less kept the sum of the fields, and so the old checksum.
+    bits = GridLayout(26, 25, 4).encode_header()
+    misread_bits = GridLayout(27, 24, 4).encode_header()[:24] + bits[24:]
+
+    assert GridLayout.decode_header(misread_bits) is None
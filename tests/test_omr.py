@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from app.common.services.omr import (
+    get_ink_mask,
+    load_grayscale_image,
+    read_answer_grid,
+    read_framed_grid,
+)
+from app.testing.answer_sheets import (
+    cover_fiducial,
+    get_grid_page_layout,
+    mark_cells,
+    render_grid_page,
+    take_photo,
+)
+
+# The last page of a 30 question grid starts from its 24th question.
+ROWS_NUMBER = 30
+COLUMNS_NUMBER = 4
+
+
+@pytest.fixture(scope="module")
+def grid_page():
+    return render_grid_page(ROWS_NUMBER, COLUMNS_NUMBER)
+
+
+@pytest.fixture(scope="module")
+def layout():
+    return get_grid_page_layout(ROWS_NUMBER, COLUMNS_NUMBER)
+
+
+@pytest.fixture(scope="module")
+def marked_grid(layout):
+    generator = random.Random(0)
+    grid = {}
+    for question_number in range(layout.first_question_number, layout.first_question_number + layout.rows_number):
+        answers_number = generator.choice((0, 1, 1, 2))
+        if answers_number:
+            grid[question_number] = sorted(generator.sample(range(1, COLUMNS_NUMBER + 1), answers_number))
+    return grid
+
+
+@pytest.mark.parametrize("angle, keystone", [(0, 0), (4, 0), (-7, 0.05), (12, 0.1)])
+def test_marked_cells_are_read_from_photos(grid_page, layout, marked_grid, angle, keystone):
+    photo = take_photo(mark_cells(grid_page, layout, marked_grid), angle, keystone, seed=abs(angle))
+
+    assert layout.first_question_number > 1
+    assert read_answer_grid(photo, ROWS_NUMBER, COLUMNS_NUMBER) == marked_grid
+
+
+@pytest.mark.parametrize("angle, keystone", [(0, 0), (-7, 0.05)])
+def test_blank_grid_is_read_as_empty(grid_page, angle, keystone):
+    assert read_answer_grid(take_photo(grid_page, angle, keystone), ROWS_NUMBER, COLUMNS_NUMBER) == {}
+
+
+def test_stray_dots_are_not_read_as_marks(grid_page, layout, marked_grid):
+    photo = take_photo(mark_cells(grid_page, layout, marked_grid, radius=0.6), 4, 0.05)
+
+    assert read_answer_grid(photo, ROWS_NUMBER, COLUMNS_NUMBER) == {}
+
+
+@pytest.mark.parametrize("fiducial_index", range(4))
+def test_grid_with_a_missing_fiducial_is_not_read_by_its_frame(grid_page, layout, marked_grid, fiducial_index):
+    page = cover_fiducial(mark_cells(grid_page, layout, marked_grid), layout, fiducial_index)
+
+    assert read_framed_grid(get_ink_mask(load_grayscale_image(take_photo(page, 4)))) is None
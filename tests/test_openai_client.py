@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import openai
+import pytest
+from openai.types.chat import ChatCompletion
+
+from app.common.services.openai import AsyncVisionClient
+from app.testing.openai_stub import OpenAIStub, run_openai_stub
+
+pytestmark = pytest.mark.anyio
+
+
+@asynccontextmanager
+async def serve_vision_client(stub: OpenAIStub, **options: Any) -> AsyncIterator[AsyncVisionClient]:
+    with run_openai_stub(stub) as base_url:
+        client = AsyncVisionClient(api_key="test", base_url=base_url, **options)
+        try:
+            yield client
+        finally:
+            await client.client.close()
+
+
+async def create_chat_completion(client: AsyncVisionClient) -> ChatCompletion:
+    return await client.create_chat_completion(model="gpt-4o", messages=[{"role": "user", "content": "Grade it."}])
+
+
+async def test_concurrent_calls_are_bounded_by_the_semaphore():
+    stub = OpenAIStub(delay_in_seconds=0.1)
+    async with serve_vision_client(stub, max_concurrent_requests=3) as client:
+        completions = await asyncio.gather(*(create_chat_completion(client) for _ in range(12)))
+
+    assert all(completion.id == "chatcmpl-stub" for completion in completions)
+    assert stub.calls_number == 12
+    assert stub.max_in_flight == 3
+
+
+async def test_calls_above_the_requests_quota_wait_for_the_bucket_to_refill():
+    # 120 requests per minute is a burst of 120 calls, then one more call every half a second.
+    stub = OpenAIStub()
+    async with serve_vision_client(
+        stub, max_concurrent_requests=200, requests_per_minute=120, tokens_per_minute=1_000_000
+    ) as client:
+        created_at = time.monotonic()
+        await asyncio.gather(*(create_chat_completion(client) for _ in range(122)))
+
+    assert stub.calls_times[120] - created_at >= 0.5
+    assert 1 <= stub.calls_times[121] - created_at < 2
+
+
+async def test_calls_above_the_tokens_quota_wait_for_the_bucket_to_refill():
+    # 1200 tokens per minute at 20 tokens per call is a burst of 60 calls, then one more call a second.
+    stub = OpenAIStub()
+    async with serve_vision_client(
+        stub, max_concurrent_requests=100, tokens_per_minute=1200, estimated_tokens_per_request=20
+    ) as client:
+        created_at = time.monotonic()
+        await asyncio.gather(*(create_chat_completion(client) for _ in range(61)))
+
+    assert 1 <= stub.calls_times[60] - created_at < 2
+
+
+async def test_rate_limited_calls_are_retried_after_the_retry_after_header():
+    stub = OpenAIStub(failures=[429, 429], retry_after="0.2")
+    async with serve_vision_client(stub, max_retries=2) as client:
+        completion = await create_chat_completion(client)
+
+    assert completion.id == "chatcmpl-stub"
+    assert stub.calls_number == 3
+    assert stub.calls_times[1] - stub.calls_times[0] >= 0.2
+    assert stub.calls_times[2] - stub.calls_times[1] >= 0.2
+
+
+async def test_retry_after_header_is_capped_by_the_max_backoff():
+    stub = OpenAIStub(failures=[429], retry_after="3600")
+    async with serve_vision_client(stub, max_retries=1, backoff_max_in_seconds=0.2) as client:
+        completion = await create_chat_completion(client)
+
+    assert completion.id == "chatcmpl-stub"
+    assert 0.2 <= stub.calls_times[1] - stub.calls_times[0] < 1
+
+
+async def test_server_errors_are_retried_until_the_retries_run_out():
+    stub = OpenAIStub(failures=[500, 503, 500])
+    async with serve_vision_client(stub, max_retries=2, backoff_base_in_seconds=0.01) as client:
+        with pytest.raises(openai.InternalServerError):
+            await create_chat_completion(client)
+
+    assert stub.calls_number == 3
+
+
+async def test_calls_over_the_deadline_are_cancelled():
+    stub = OpenAIStub(delay_in_seconds=2)
+    async with serve_vision_client(stub, deadline_in_seconds=0.2, max_retries=0) as client:
+        started_at = time.monotonic()
+        with pytest.raises((openai.APITimeoutError, TimeoutError)):
+            await create_chat_completion(client)
+        assert time.monotonic() - started_at < 1
@@ -0,0 +1,78 @@
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.services import JWTTokenType, create_jwt_token
+from app.student_tests import schemas
+from app.student_tests.services import create_test, get_test_questions_with_answers
+from app.users.models import User
+from tests.conftest import StatementsCounter
+
+pytestmark = pytest.mark.anyio
+
+# The ownership check is a single statement, the rest are the queries of the route itself.
+ROUTES_STATEMENTS_NUMBERS = {
+    ("GET", "/tests/{test_id}/questions/"): 3,
+    ("GET", "/tests/questions/{question_id}/answers/"): 3,
+    ("PUT", "/tests/questions/{question_id}/"): 4,
+    ("PUT", "/tests/questions/answers/{answer_id}/"): 4,
+    ("GET", "/tests/{test_id}/variants/"): 3,
+}
+ROUTES_BODIES = {
+    "/tests/questions/{question_id}/": {"content": "Question 1, reworded", "points": 2},
+    "/tests/questions/answers/{answer_id}/": {"content": "Answer A, reworded", "is_correct": True},
+}
+
+
+@pytest.fixture
+async def objects_ids(session: AsyncSession, teacher: User) -> dict[str, uuid.UUID]:
+    questions = [
+        schemas.QuestionCreateSchema(
+            content=f"Question {number}",
+            points=1,
+            answers=[
+                schemas.AnswerCreateSchema(content=f"Answer {letter}", is_correct=letter == "A") for letter in "ABC"
+            ],
+        )
+        for number in range(1, 4)
+    ]
+    test = await create_test(session, teacher, f"Ownership {uuid.uuid4().hex[:8]}", questions)
+    question = (await get_test_questions_with_answers(session, test))[0]
+    return {"test_id": test.id, "question_id": question.id, "answer_id": question.answers[0].id}
+
+
+@pytest.fixture
+async def other_teacher_headers(session: AsyncSession) -> dict[str, str]:
+    other_teacher = User(username=f"teacher-{uuid.uuid4().hex[:8]}", password="unused")
+    session.add(other_teacher)
+    await session.commit()
+    return {"Authorization": f"Bearer {create_jwt_token(other_teacher.id, JWTTokenType.access)}"}
+
+
+@pytest.mark.parametrize(("method", "path"), ROUTES_STATEMENTS_NUMBERS)
+async def test_owned_object_routes_take_a_fixed_number_of_statements(
+    api_client: httpx.AsyncClient,
+    teacher_headers: dict[str, str],
+    other_teacher_headers: dict[str, str],
+    statements_counter: StatementsCounter,
+    objects_ids: dict[str, uuid.UUID],
+    method: str,
+    path: str,
+):
+    # The first requests cache the authenticated teachers, so that they do not count towards the next ones.
+    for headers in (teacher_headers, other_teacher_headers):
+        assert (await api_client.get("/tests/", headers=headers)).status_code == 200
+
+    url = path.format(**objects_ids)
+    missing_url = path.format(**{name: uuid.uuid4() for name in objects_ids})
+    for headers, request_url, status_code, statements_number in (
+        (other_teacher_headers, url, 403, 1),
+        (teacher_headers, missing_url, 404, 1),
+        (teacher_headers, url, 200, ROUTES_STATEMENTS_NUMBERS[method, path]),
+    ):
+        statements_counter.reset()
+        response = await api_client.request(method, request_url, json=ROUTES_BODIES.get(path), headers=headers)
+        assert response.status_code == status_code
+        assert statements_counter.count == statements_number
@@ -0,0 +1,102 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.student_tests.models import StudentTestAnswer, Test
+from app.student_tests.services import create_test
+from app.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def read_all_pages(api_client: httpx.AsyncClient, url: str, headers: dict[str, str], page_size: int) -> list:
+    pages = []
+    params = {"page_size": page_size}
+    while True:
+        response = await api_client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        pages.append(page["items"])
+        if page["next_cursor"] is None:
+            return pages
+        params = {"page_size": page_size, "cursor": page["next_cursor"]}
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 7, 8])
+async def test_submissions_pages_follow_the_keyset_through_created_at_ties(
+    api_client: httpx.AsyncClient, teacher_headers: dict[str, str], session: AsyncSession, teacher: User, page_size: int
+):
+    test = await create_test(session, teacher, f"Paginated {uuid.uuid4().hex[:8]}", [])
+    # Three submissions share one creation time and two another, so only the id orders them.
+    created_at = datetime(2026, 1, 1, 12)
+    creation_times = [created_at] * 3 + [created_at - timedelta(seconds=1)] * 2 + [created_at + timedelta(seconds=1)]
+    answers = [
+        StudentTestAnswer(
+            test_id=test.id,
+            student_username=f"student-{index}",
+            results_photo_url=f"{test.id}/{index}.png",
+            student_group="A",
+            created_at=answer_created_at,
+        )
+        for index, answer_created_at in enumerate(creation_times)
+    ]
+    session.add_all(answers)
+    await session.commit()
+
+    pages = await read_all_pages(api_client, f"/tests/{test.id}/student-answers/", teacher_headers, page_size)
+
+    expected_ids = [str(answer.id) for answer in sorted(answers, key=lambda answer: (answer.created_at, answer.id))]
+    assert [item["id"] for page in pages for item in page] == expected_ids[::-1]
+    # A last page that is full does not leave an empty page behind it.
+    assert [len(page) for page in pages] == [page_size] * (len(answers) // page_size) + (
+        [len(answers) % page_size] if len(answers) % page_size else []
+    )
+
+
+async def test_tests_pages_list_only_the_teacher_tests(
+    api_client: httpx.AsyncClient, teacher_headers: dict[str, str], session: AsyncSession, teacher: User
+):
+    other_teacher = User(username=f"teacher-{uuid.uuid4().hex[:8]}", password="unused")
+    session.add(other_teacher)
+    await session.commit()
+    tests = [await create_test(session, teacher, f"Listed {number}", []) for number in range(5)]
+    await create_test(session, other_teacher, "Not listed", [])
+    await session.execute(
+        update(Test).where(Test.id.in_([test.id for test in tests])).values(created_at=datetime(2026, 1, 1, 12))
+    )
+    await session.commit()
+
+    pages = await read_all_pages(api_client, "/tests/", teacher_headers, 2)
+
+    assert [item["id"] for page in pages for item in page] == sorted((str(test.id) for test in tests), reverse=True)
+
+
+def encode(value: object) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        encode({"created_at": "2026-01-01T12:00:00"}),
+        encode(["2026-01-01T12:00:00"]),
+        encode(["yesterday", str(uuid.uuid4())]),
+        encode(["2026-01-01T12:00:00", "not a uuid"]),
+        encode([1, 2]),
+    ],
+)
+async def test_invalid_cursors_are_rejected(
+    api_client: httpx.AsyncClient, teacher_headers: dict[str, str], cursor: str
+):
+    response = await api_client.get("/tests/", params={"cursor": cursor}, headers=teacher_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "invalid-cursor"
@@ -0,0 +1,79 @@
+import io
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from fpdf import FPDF
+from fpdf.fonts import TTFFont
+from pypdf import PdfReader
+
+from app.common.constants import QUESTIONS_FONT_FAMILY, QUESTIONS_FONT_PATH
+from app.common.services.pdf import (
+    add_questions_font,
+    create_grid_pdf,
+    load_questions_fonts,
+)
+
+
+def extract_text(pdf: bytes) -> str:
+    return "\n".join(page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages)
+
+
+def test_grid_pdfs_share_the_parsed_questions_font():
+    # The parsed font is shared between documents, while every document embeds the subset of its own glyphs.
+    load_questions_fonts()
+    first_pdf = create_grid_pdf(4, 2, [("Скільки буде 2 + 2?", ["Чотири", "П'ять"]), ("Größe?", ["Groß"])])
+    second_pdf = create_grid_pdf(4, 1, [("Ça va?", ["Très bien"])])
+
+    first_text = extract_text(first_pdf)
+    second_text = extract_text(second_pdf)
+    assert "Скільки буде 2 + 2?" in first_text
+    assert "Größe?" in first_text
+    assert "Ça va?" in second_text
+    assert "Très bien" in second_text
+    assert len(second_pdf) < len(first_pdf)
+
+
+def render_text_pdf(add_font: Callable[[FPDF], None], text: str) -> bytes:
+    document = FPDF()
+    document.set_creation_date(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    add_font(document)
+    document.add_page()
+    document.set_font(QUESTIONS_FONT_FAMILY, size=12)
+    document.cell(text=text)
+    return bytes(document.output())
+
+
+def test_shared_questions_font_is_set_up_as_add_font_sets_it_up():
+    # `add_questions_font` sets the fpdf2 font internals directly, a new fpdf2 version that changes them must fail here.
+    shared_font_document = FPDF()
+    add_questions_font(shared_font_document)
+    file_font_document = FPDF()
+    file_font_document.add_font(QUESTIONS_FONT_FAMILY, "", QUESTIONS_FONT_PATH)
+    shared_font = shared_font_document.fonts[QUESTIONS_FONT_FAMILY.lower()]
+    file_font = file_font_document.fonts[QUESTIONS_FONT_FAMILY.lower()]
+
+    assert type(shared_font) is type(file_font) is TTFFont
+    assert TTFFont.__slots__ == (
+        "i",
+        "type",
+        "name",
+        "desc",
+        "glyph_ids",
+        "hbfont",
+        "up",
+        "ut",
+        "cw",
+        "ttffile",
+        "fontkey",
+        "emphasis",
+        "scale",
+        "subset",
+        "cmap",
+        "ttfont",
+        "missing_glyphs",
+    )
+    # A document rendered before must not leave its glyphs in the subset of the next one.
+    render_text_pdf(add_questions_font, "Größe, ça va")
+    assert render_text_pdf(add_questions_font, "Скільки буде 2 + 2?") == render_text_pdf(
+        lambda document: document.add_font(QUESTIONS_FONT_FAMILY, "", QUESTIONS_FONT_PATH), "Скільки буде 2 + 2?"
+    )
@@ -0,0 +1,26 @@
+import io
+
+from pypdf import PdfReader
+
+from app.common.services.pdf import create_answer_sheets_contents
+from app.common.services.pdf_writer import (
+    StreamingPDFWriter,
+    get_embedded_questions_font,
+)
+
+
+def test_answer_sheets_text_is_extracted_as_written():
+    students = [("Олена Коваль-Шевчук", "10-А"), ("Jean-Luc O'Neil", "11 B")]
+    writer = StreamingPDFWriter(get_embedded_questions_font())
+    pdf = writer.start()
+    for content in create_answer_sheets_contents("test-id", "Final exam - part 1", 10, 4, students):
+        pdf += writer.add_page(content)
+    pdf += writer.finish()
+
+    pages_texts = [page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages]
+
+    assert len(pages_texts) == len(students)
+    for page_text, (student_name, student_group) in zip(pages_texts, students):
+        assert "Final exam - part 1" in page_text
+        assert student_name in page_text
+        assert student_group in page_text
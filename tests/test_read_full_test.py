@@ -0,0 +1,65 @@
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.student_tests import schemas
+from app.student_tests.models import Test
+from app.student_tests.services import create_test
+from app.users.models import User
+from tests.conftest import StatementsCounter
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_test_with_questions(session: AsyncSession, teacher: User, questions_number: int) -> Test:
+    questions = [
+        schemas.QuestionCreateSchema(
+            content=f"Question {number}",
+            points=2,
+            answers=[
+                schemas.AnswerCreateSchema(content=f"Answer {number}{letter}", is_correct=letter == "A")
+                for letter in "ABCDE"
+            ],
+        )
+        for number in range(1, questions_number + 1)
+    ]
+    return await create_test(session, teacher, f"Read {uuid.uuid4().hex[:8]}", questions)
+
+
+async def test_reading_a_full_test_takes_the_same_statements_whatever_its_size(
+    session: AsyncSession,
+    teacher: User,
+    api_client: httpx.AsyncClient,
+    teacher_headers: dict[str, str],
+    statements_counter: StatementsCounter,
+):
+    tests = [await create_test_with_questions(session, teacher, questions_number) for questions_number in (1, 40)]
+    # The first request caches the authenticated teacher, so that it does not count towards the next ones.
+    assert (await api_client.get("/tests/", headers=teacher_headers)).status_code == 200
+
+    statements_counts = []
+    for test in tests:
+        statements_counter.reset()
+        response = await api_client.get(f"/tests/{test.id}/full/", headers=teacher_headers)
+        assert response.status_code == 200
+        assert len(response.json()["questions"]) == test.questions_count
+        statements_counts.append(statements_counter.count)
+
+    assert statements_counts == [3, 3]
+
+
+async def test_a_full_test_matches_the_questions_and_answers_read_one_by_one(
+    session: AsyncSession, teacher: User, api_client: httpx.AsyncClient, teacher_headers: dict[str, str]
+):
+    test = await create_test_with_questions(session, teacher, 5)
+
+    full_test = (await api_client.get(f"/tests/{test.id}/full/", headers=teacher_headers)).json()
+    questions = (await api_client.get(f"/tests/{test.id}/questions/", headers=teacher_headers)).json()
+    for question in questions:
+        question["answers"] = (
+            await api_client.get(f"/tests/questions/{question['id']}/answers/", headers=teacher_headers)
+        ).json()
+
+    assert full_test["questions"] == questions
@@ -0,0 +1,82 @@
+import uuid
+from unittest import mock
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.student_tests import schemas
+from app.student_tests.models import StudentTestAnswer, Test
+from app.student_tests.services import (
+    create_student_answer,
+    create_test,
+    encode_answers_grid,
+    get_test_questions_with_answers,
+    regrade_student_answers,
+)
+from app.student_tests.tasks import grade_student_answer
+from app.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+CORRECT_GRID = {1: [1], 2: [1]}
+
+
+async def create_graded_test(session: AsyncSession, teacher: User) -> tuple[Test, list[StudentTestAnswer]]:
+    questions = [
+        schemas.QuestionCreateSchema(
+            content=f"Question {number}",
+            points=1,
+            answers=[
+                schemas.AnswerCreateSchema(content=f"Answer {letter}", is_correct=letter == "A") for letter in "AB"
+            ],
+        )
+        for number in (1, 2)
+    ]
+    test = await create_test(session, teacher, f"Regraded {uuid.uuid4().hex[:8]}", questions)
+    answers = []
+    for student_username in ("automatic", "manual"):
+        answer = await create_student_answer(session, test, student_username, f"{test.id}/{student_username}.png", "A")
+        answer.answers_masks = encode_answers_grid(CORRECT_GRID)
+        answer.score = 2
+        answers.append(answer)
+    await session.commit()
+    return test, answers
+
+
+async def test_regrading_keeps_the_scores_set_by_the_teacher(
+    session: AsyncSession, teacher: User, teacher_headers: dict[str, str], api_client: httpx.AsyncClient
+):
+    test, (automatic_answer, manual_answer) = await create_graded_test(session, teacher)
+
+    response = await api_client.put(
+        f"/tests/student-answers/{manual_answer.id}/", json={"score": 1}, headers=teacher_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["is_score_manual"] is True
+    first_question = (await get_test_questions_with_answers(session, test))[0]
+    response = await api_client.put(
+        f"/tests/questions/{first_question.id}/", json={"content": "Question 1", "points": 5}, headers=teacher_headers
+    )
+    assert response.status_code == 200
+    await session.refresh(test)
+    await regrade_student_answers(session, test)
+
+    await session.refresh(automatic_answer)
+    await session.refresh(manual_answer)
+    assert automatic_answer.score == 6
+    assert manual_answer.score == 1
+
+
+async def test_grading_keeps_the_score_set_by_the_teacher(session: AsyncSession, teacher: User):
+    test, (_, manual_answer) = await create_graded_test(session, teacher)
+    manual_answer.score = 1
+    manual_answer.is_score_manual = True
+    await session.commit()
+
+    with mock.patch("app.student_tests.tasks.get_student_answer_grid", return_value=CORRECT_GRID):
+        await grade_student_answer(str(test.id), str(manual_answer.id))
+
+    await session.refresh(manual_answer)
+    assert manual_answer.score == 1
+    assert manual_answer.answers_masks == encode_answers_grid(CORRECT_GRID)
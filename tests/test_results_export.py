@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.student_tests import schemas
+from app.student_tests.constants import RESULTS_EXPORT_COLUMNS
+from app.student_tests.models import StudentTestAnswer, Test
+from app.student_tests.services import create_test, create_test_variants
+from app.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+STARTED_AT = datetime(2026, 3, 1, 9)
+
+
+@pytest.fixture
+async def exported_test(session: AsyncSession, teacher: User) -> Test:
+    questions = [
+        schemas.QuestionCreateSchema(
+            content=f"Question {number}",
+            points=number,
+            answers=[
+                schemas.AnswerCreateSchema(content=f"Answer {number}{letter}", is_correct=letter == "A")
+                for letter in "AB"
+            ],
+        )
+        for number in (1, 2)
+    ]
+    test = await create_test(session, teacher, f"Exported {uuid.uuid4().hex[:8]}", questions)
+    (variant,) = await create_test_variants(session, test, 1)
+    # One submission an hour, the groups alternate and the last one is scored on the variant.
+    session.add_all(
+        StudentTestAnswer(
+            test_id=test.id,
+            student_username=f"Student, {index}",
+            results_photo_url=f"{test.id}/{index}.png",
+            student_group="A" if index % 2 == 0 else "B",
+            score=index if index < 4 else None,
+            variant_id=variant.id if index == 4 else None,
+            created_at=STARTED_AT + timedelta(hours=index),
+        )
+        for index in range(5)
+    )
+    await session.commit()
+    return test
+
+
+async def export(api_client: httpx.AsyncClient, test: Test, headers: dict[str, str], **params: str) -> httpx.Response:
+    response = await api_client.get(f"/tests/{test.id}/student-answers/export/", params=params, headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+async def test_csv_export_has_a_header_and_a_row_per_submission_oldest_first(
+    api_client: httpx.AsyncClient, teacher_headers: dict[str, str], exported_test: Test
+):
+    # Batches smaller than the submissions number make the export read several of them.
+    with mock.patch.object(settings, "results_export_batch_size", 2):
+        response = await export(api_client, exported_test, teacher_headers)
+
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert tuple(header) == RESULTS_EXPORT_COLUMNS
+    records = [dict(zip(header, row)) for row in rows]
+    assert [record["student_username"] for record in records] == [f"Student, {index}" for index in range(5)]
+    assert [record["created_at"] for record in records] == [
+        (STARTED_AT + timedelta(hours=index)).isoformat() for index in range(5)
+    ]
+    assert [record["score"] for record in records] == ["0", "1", "2", "3", ""]
+    assert {record["max_score"] for record in records} == {"3"}
+    assert [record["variant_number"] for record in records] == ["", "", "", "", "1"]
+    assert records[0]["results_photo_url"] == f"{exported_test.id}/0.png"
+
+
+@pytest.mark.parametrize(
+    "params, expected_indexes",
+    [
+        ({"created_from": (STARTED_AT + timedelta(hours=1)).isoformat()}, [1, 2, 3, 4]),
+        ({"created_to": (STARTED_AT + timedelta(hours=3)).isoformat()}, [0, 1, 2]),
+        (
+            {
+                "created_from": (STARTED_AT + timedelta(hours=1)).isoformat(),
+                "created_to": (STARTED_AT + timedelta(hours=3)).isoformat(),
+            },
+            [1, 2],
+        ),
+        ({"created_from": (STARTED_AT + timedelta(hours=1)).isoformat(), "student_group": "A"}, [2, 4]),
+        ({"created_from": (STARTED_AT + timedelta(days=1)).isoformat()}, []),
+    ],
+)
+async def test_export_is_filtered_by_the_creation_time_from_inclusive_to_exclusive(
+    api_client: httpx.AsyncClient,
+    teacher_headers: dict[str, str],
+    exported_test: Test,
+    params: dict[str, str],
+    expected_indexes: list[int],
+):
+    response = await export(api_client, exported_test, teacher_headers, format="ndjson", **params)
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["student_username"] for record in records] == [f"Student, {index}" for index in expected_indexes]
+    assert all(tuple(record) == RESULTS_EXPORT_COLUMNS for record in records)
@@ -0,0 +1,75 @@
+import asyncio
+import uuid
+from collections.abc import Iterator
+from unittest import mock
+
+import boto3
+import httpx
+import pytest
+from moto.server import ThreadedMotoServer
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common import storage
+from app.core.config import settings
+from app.student_tests.models import StudentTestAnswer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def bucket() -> Iterator[None]:
+    # A local stand-in for S3, which the storage client and the presigned forms are pointed at.
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+    client = boto3.session.Session().client(
+        "s3", region_name="us-east-1", endpoint_url=endpoint, aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    client.create_bucket(Bucket=settings.test_results_bucket_name)
+    with mock.patch.object(storage, "client", client), mock.patch.object(settings, "bucket_endpoint", endpoint):
+        yield
+    server.stop()
+
+
+async def test_finalizing_an_uploaded_photo_records_one_submission(
+    api_client: httpx.AsyncClient,
+    teacher_headers: dict[str, str],
+    session: AsyncSession,
+    bucket: None,
+    queued_tasks: dict[str, mock.MagicMock],
+):
+    test_data = {"name": f"Uploaded {uuid.uuid4().hex[:8]}", "questions": []}
+    test_id = (await api_client.post("/tests/", json=test_data, headers=teacher_headers)).json()["id"]
+
+    upload_form = (
+        await api_client.post(
+            f"/tests/{test_id}/submit/upload-form/", json={"filename": "photo.jpg", "content_type": "image/jpeg"}
+        )
+    ).json()
+    async with httpx.AsyncClient() as bucket_client:
+        upload_response = await bucket_client.post(
+            upload_form["url"], data=upload_form["fields"], files={"file": ("photo.jpg", b"photo", "image/jpeg")}
+        )
+    assert upload_response.is_success
+
+    submission = {"key": upload_form["key"], "student_username": "student", "student_group": "A"}
+    # A double submit sends both requests at once, a retry sends the next one after the first has been recorded.
+    responses = await asyncio.gather(
+        *(api_client.post(f"/tests/{test_id}/submit/finalize/", json=submission) for _ in range(2))
+    )
+    responses.append(await api_client.post(f"/tests/{test_id}/submit/finalize/", json=submission))
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert responses[0].json()["results_photo_url"].endswith(upload_form["key"])
+    query = select(func.count()).select_from(StudentTestAnswer).where(StudentTestAnswer.test_id == test_id)
+    assert await session.scalar(query) == 1
+    queued_tasks["grade_test"].delay.assert_called_once()
+
+    missing_submission = {**submission, "key": f"{test_id}/{uuid.uuid4()}-photo.jpg"}
+    missing_response = await api_client.post(f"/tests/{test_id}/submit/finalize/", json=missing_submission)
+
+    assert missing_response.status_code == 400
+    assert missing_response.json()["detail"]["code"] == "results-photo-not-uploaded"
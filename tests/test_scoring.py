@@ -0,0 +1,32 @@
+import random
+import uuid
+
+from app.student_tests.services import encode_answers_grid, score_answers_masks
+from app.student_tests.types import AnswerKey
+
+ANSWER_KEY = AnswerKey(
+    test_id=uuid.uuid4(),
+    version=1,
+    correct_answers={1: frozenset({1}), 2: frozenset({2, 4}), 4: frozenset({5})},
+    points={1: 1, 2: 3, 4: 2},
+)
+
+
+def test_vectorized_scores_match_the_exact_match_rule():
+    grids = [
+        {},
+        {1: [1], 2: [2, 4], 4: [5]},
+        {1: [1, 1], 2: [4, 2], 3: [1], 4: []},
+        {1: [2], 2: [2], 4: [5, 1]},
+        {2: [2, 4], 7: [1], 12: [3]},
+        {0: [1], 1: [1], 4: [5]},
+    ]
+    random.seed(0)
+    grids += [
+        {position: random.sample(range(1, 6), random.randint(0, 2)) for position in range(1, random.randint(1, 8))}
+        for _ in range(200)
+    ]
+
+    scores = score_answers_masks(ANSWER_KEY, [encode_answers_grid(grid) for grid in grids])
+
+    assert scores.tolist() == [ANSWER_KEY.score(grid) for grid in grids]
@@ -0,0 +1,100 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import SessionLocal
+from app.student_tests import schemas
+from app.student_tests.models import Question, Test
+from app.student_tests.services import (
+    create_answer,
+    create_question,
+    create_test,
+    delete_answer,
+    delete_question,
+    edit_test_content,
+    get_test_questions_with_answers,
+    update_answer,
+    update_question,
+    update_test,
+)
+from app.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+def build_question(number: int, points: int) -> schemas.QuestionCreateSchema:
+    return schemas.QuestionCreateSchema(
+        content=f"Question {number}",
+        points=points,
+        answers=[
+            schemas.AnswerCreateSchema(content=f"Answer {number}{letter}", is_correct=letter == "A") for letter in "AB"
+        ],
+    )
+
+
+async def assert_totals_match_questions(session: AsyncSession, test: Test) -> None:
+    totals = (await session.execute(select(Test.max_score, Test.questions_count).where(Test.id == test.id))).one()
+    questions_totals = (
+        await session.execute(
+            select(func.coalesce(func.sum(Question.points), 0), func.count(Question.id)).where(
+                Question.test_id == test.id
+            )
+        )
+    ).one()
+    assert tuple(totals) == tuple(questions_totals)
+
+
+async def test_test_totals_follow_every_change_of_the_questions(session: AsyncSession, teacher: User):
+    test = await create_test(
+        session, teacher, f"Totals {uuid.uuid4().hex[:8]}", [build_question(1, 2), build_question(2, 3)]
+    )
+    await assert_totals_match_questions(session, test)
+
+    await create_question(session, test, "Question 3", 4, build_question(3, 4).answers, position_number=3)
+    await assert_totals_match_questions(session, test)
+
+    first, second, third = await get_test_questions_with_answers(session, test)
+    second_id, third_id = second.id, third.id
+    await update_question(session, second, "Question 2, reworded", 7)
+    await assert_totals_match_questions(session, test)
+
+    await delete_question(session, first)
+    await assert_totals_match_questions(session, test)
+
+    answer = await create_answer(session, third, "Answer 3C", False)
+    await update_answer(session, answer, "Answer 3C, reworded", True)
+    await delete_answer(session, answer)
+    await update_test(session, test, test.name, [third_id, second_id])
+    await assert_totals_match_questions(session, test)
+
+    await edit_test_content(
+        session,
+        test,
+        schemas.TestBatchEditSchema(
+            created_questions=[build_question(4, 5), build_question(5, 1)],
+            updated_questions=[schemas.QuestionBatchUpdateSchema(id=third_id, content="Question 3", points=10)],
+            deleted_question_ids=[second_id],
+        ),
+    )
+    await assert_totals_match_questions(session, test)
+    assert (await session.execute(select(Test.max_score, Test.questions_count).where(Test.id == test.id))).one() == (
+        16,
+        3,
+    )
+
+
+async def test_test_totals_add_up_concurrent_changes(session: AsyncSession, teacher: User):
+    test = await create_test(session, teacher, f"Totals {uuid.uuid4().hex[:8]}", [build_question(1, 1)])
+
+    async def add_question(number: int) -> None:
+        async with SessionLocal() as other_session:
+            await create_question(
+                other_session, test, f"Question {number}", number, build_question(number, number).answers, number
+            )
+
+    await asyncio.gather(*(add_question(number) for number in range(2, 8)))
+
+    await assert_totals_match_questions(session, test)
@@ -0,0 +1,111 @@
+import uuid
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.student_tests import schemas
+from app.student_tests.models import TestVariant
+from app.student_tests.services import (
+    compile_answer_key,
+    compile_variant_answer_key,
+    create_student_answer,
+    create_test,
+    create_test_variants,
+    edit_test_content,
+    encode_answers_mask,
+    get_test_questions_with_answers,
+    get_variant_questions_contents,
+    regrade_student_answers,
+)
+from app.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+def build_answers(question_number: int) -> list[schemas.AnswerCreateSchema]:
+    return [
+        schemas.AnswerCreateSchema(content=f"Answer {question_number}{letter}", is_correct=letter == "A")
+        for letter in "ABCD"
+    ]
+
+
+async def test_editing_a_test_keeps_the_order_of_its_variants(session: AsyncSession, teacher: User):
+    questions = [
+        schemas.QuestionCreateSchema(content=f"Question {number}", points=1, answers=build_answers(number))
+        for number in range(1, 9)
+    ]
+    test = await create_test(session, teacher, f"Variants {uuid.uuid4().hex[:8]}", questions)
+    (variant,) = await create_test_variants(session, test, 1)
+    test_questions = await get_test_questions_with_answers(session, test)
+    variant_questions = get_variant_questions_contents(variant, test_questions)
+
+    remaining_questions = test_questions[1:]
+    test = await edit_test_content(
+        session,
+        test,
+        schemas.TestBatchEditSchema(
+            created_questions=[schemas.QuestionCreateSchema(content="Question 9", points=1, answers=build_answers(9))],
+            updated_questions=[
+                schemas.QuestionBatchUpdateSchema(id=test_questions[1].id, content="Question 2, reworded", points=2)
+            ],
+            deleted_question_ids=[test_questions[0].id],
+            created_answers=[
+                schemas.AnswerBatchCreateSchema(question_id=test_questions[2].id, content="Answer 3E", is_correct=False)
+            ],
+            question_ids=[question.id for question in reversed(remaining_questions)],
+            answers_orders=[
+                schemas.AnswersOrderSchema(
+                    question_id=test_questions[3].id,
+                    answer_ids=[answer.id for answer in reversed(test_questions[3].answers)],
+                )
+            ],
+        ),
+    )
+
+    edited_variant_questions = get_variant_questions_contents(
+        variant, await get_test_questions_with_answers(session, test)
+    )
+    expected_variant_questions = []
+    for content, answers_contents in variant_questions:
+        if content == "Question 1":
+            continue
+        if content == "Question 2":
+            content = "Question 2, reworded"
+        if content == "Question 3":
+            answers_contents = [*answers_contents, "Answer 3E"]
+        expected_variant_questions.append((content, answers_contents))
+    expected_variant_questions.append(("Question 9", [answer.content for answer in build_answers(9)]))
+    assert edited_variant_questions == expected_variant_questions
+
+    answer_key = await compile_variant_answer_key(session, test, variant.questions_order)
+    assert answer_key.correct_answers == {
+        number: frozenset({answers_contents.index(f"Answer {content.split()[1].strip(',')}A") + 1})
+        for number, (content, answers_contents) in enumerate(expected_variant_questions, start=1)
+    }
+
+
+async def test_answers_of_a_deleted_variant_are_regraded_in_the_variant_order(session: AsyncSession, teacher: User):
+    questions = [
+        schemas.QuestionCreateSchema(content=f"Question {number}", points=1, answers=build_answers(number))
+        for number in range(1, 9)
+    ]
+    test = await create_test(session, teacher, f"Variants {uuid.uuid4().hex[:8]}", questions)
+    (variant,) = await create_test_variants(session, test, 1)
+    variant_answer_key = await compile_variant_answer_key(session, test, variant.questions_order)
+    assert variant_answer_key.correct_answers != (await compile_answer_key(session, test)).correct_answers
+    answer = await create_student_answer(
+        session, test, "student", f"{test.id}/results.png", "A", variant_number=variant.number
+    )
+    answer.answers_masks = [
+        encode_answers_mask(variant_answer_key.correct_answers[number]) for number in range(1, len(questions) + 1)
+    ]
+    await session.commit()
+
+    await session.execute(delete(TestVariant).where(TestVariant.id == variant.id))
+    await session.commit()
+    await regrade_student_answers(session, test)
+
+    await session.refresh(answer)
+    assert answer.variant_id is None
+    assert answer.score == len(questions)